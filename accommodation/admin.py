@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.contrib import messages
 from django.db import connection
-from .models import Accommodation, AccommodationRating, University, AccommodationUniversity, UniversityAPIKey, ReservationPeriod
+from .models import Accommodation, AccommodationRating, University, Campus, AccommodationUniversity, UniversityAPIKey, ReservationPeriod, ChangeEvent, WebhookEndpoint, WebhookDelivery, WebhookDeadLetter
+from .search import search_accommodations
+from .utils import reset_id_sequence
 
 class AccommodationUniversityInline(admin.TabularInline):
     model = AccommodationUniversity
@@ -47,14 +49,18 @@ class AccommodationAdmin(admin.ModelAdmin):
         
         # reset the ID sequence to 1
         db_engine = connection.vendor
-        with connection.cursor() as cursor:
-            cursor.execute("DELETE FROM accommodation_accommodation;")
-            cursor.execute("DELETE FROM sqlite_sequence WHERE name='accommodation_accommodation';")
-                
+        reset_id_sequence(Accommodation)
+
         messages.success(request, f"The ID sequence has been reset (database type: {db_engine})")
     
     reset_ids.short_description = "Reset all records and reset the ID sequence to 1"
 
+    def get_search_results(self, request, queryset, search_term):
+        """Use the full-text index instead of LIKE '%term%' scans over search_fields"""
+        if not search_term:
+            return queryset, False
+        return search_accommodations(queryset, search_term), False
+
     def get_universities(self, obj):
         return ", ".join([u.code for u in obj.affiliated_universities.all()])
     get_universities.short_description = "Universities"
@@ -70,6 +76,12 @@ class UniversityAdmin(admin.ModelAdmin):
     has_api_key.boolean = True
     has_api_key.short_description = "API Key"
 
+@admin.register(Campus)
+class CampusAdmin(admin.ModelAdmin):
+    list_display = ('code', 'name', 'university', 'latitude', 'longitude')
+    list_filter = ('university',)
+    search_fields = ('code', 'name')
+
 @admin.register(AccommodationRating)
 class AccommodationRatingAdmin(admin.ModelAdmin):
     list_display = ('id', 'accommodation', 'user_identifier', 'rating', 'created_at')
@@ -110,3 +122,40 @@ class ReservationPeriodAdmin(admin.ModelAdmin):
         """Optimize queryset by prefetching related accommodation"""
         return super().get_queryset(request).select_related('accommodation')
 
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(admin.ModelAdmin):
+    """Read-only view of the change feed log"""
+    list_display = ('id', 'university', 'model', 'action', 'object_id', 'accommodation_id', 'created_at')
+    list_filter = ('model', 'action', 'university')
+    list_select_related = ('university',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    """The secret is generated on save and only shown masked, like the webhook listing API"""
+    list_display = ('id', 'university', 'url', 'is_active', 'created_at')
+    list_filter = ('is_active', 'university')
+    list_select_related = ('university',)
+    exclude = ('secret',)
+    readonly_fields = ('masked_secret', 'created_at')
+
+    def masked_secret(self, obj):
+        return '*' * 8 + obj.secret[-4:] if obj.secret else "-"
+    masked_secret.short_description = "Secret"
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'endpoint', 'event_type', 'attempts', 'next_attempt_at', 'last_error')
+    list_filter = ('event_type',)
+    list_select_related = ('endpoint__university',)
+
+@admin.register(WebhookDeadLetter)
+class WebhookDeadLetterAdmin(admin.ModelAdmin):
+    list_display = ('id', 'endpoint', 'event_type', 'attempts', 'last_error', 'failed_at')
+    list_filter = ('event_type',)
+    list_select_related = ('endpoint__university',)
@@ -1,13 +1,33 @@
 from django.apps import AppConfig
+from django.conf import settings
 from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 def register_sqlite_functions(sender, connection, **kwargs):
     if connection.vendor == 'sqlite':
         connection.connection.create_function("POW", 2, lambda x, y: x ** y)
 
+def configure_sqlite_pragmas(sender, connection, **kwargs):
+    """Apply settings.SQLITE_PRAGMAS to a new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    cursor = connection.connection.cursor()
+    try:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
 class AccommodationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accommodation"
     
     def ready(self):
-        connection_created.connect(register_sqlite_functions)
\ No newline at end of file
+        connection_created.connect(register_sqlite_functions)
+        connection_created.connect(configure_sqlite_pragmas)
+        from . import signals  # noqa: F401  registers the change feed receivers
+        from . import autocomplete  # noqa: F401  keeps the autocomplete index current
+        from . import listing_cache  # noqa: F401  invalidates cached listing data
+        from . import campuses  # noqa: F401  keeps the campus cache current
+        from .search import restore_search_triggers
+        post_migrate.connect(restore_search_triggers, sender=self)
\ No newline at end of file
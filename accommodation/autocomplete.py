@@ -0,0 +1,192 @@
+"""
+In-memory prefix index for the /autocomplete/ endpoint.
+
+Holds the distinct building_name, estate_name and geo_address values as one
+sorted list of (casefolded value, field, value) entries, so a lookup is one
+binary search and a short scan. Each process builds its index from the database
+on first use and then keeps it current from Accommodation save and delete
+signals (applied once the transaction commits). Bulk writes send no signals,
+so the index is also rebuilt when it is older than AUTOCOMPLETE_REFRESH_SECONDS.
+
+That rebuild runs in a background thread while lookups keep using the current
+contents, which are swapped for the new ones under the lock. Updates that
+arrive while the rows are read are applied to the current contents and also
+replayed onto the new ones, so a save that commits after the rebuild's query
+started is not lost. Only the first build (or one after invalidate()) makes
+a lookup wait.
+"""
+import bisect
+import threading
+import time
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Accommodation
+
+FIELDS = ('building_name', 'estate_name', 'geo_address')
+
+def _values(building_name, estate_name, geo_address):
+    """The (field, value) pairs an accommodation contributes to the index"""
+    return tuple(
+        (field, value.strip())
+        for field, value in zip(FIELDS, (building_name, estate_name, geo_address))
+        if value and value.strip()
+    )
+
+class PrefixIndex:
+    """Sorted array of distinct values with a reference count per value"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []   # sorted (key, field, value)
+        self._counts = {}    # (field, value) -> number of accommodations with it
+        self._by_accommodation = {}  # accommodation id -> its (field, value) pairs
+        self._pending = None  # (accommodation id, pairs or None for removed) recorded during a build
+        self._build_lock = threading.Lock()
+        self.built_at = None
+
+    def build(self, rows):
+        """
+        Replace the contents with (id, building_name, estate_name, geo_address) rows.
+
+        `rows` may be a lazy iterator over a query: updates and removals made
+        while it is consumed are replayed onto the new contents.
+        """
+        with self._build_lock:
+            with self._lock:
+                self._pending = []
+            try:
+                by_accommodation = {row[0]: _values(*row[1:]) for row in rows}
+            except BaseException:
+                with self._lock:
+                    self._pending = None
+                raise
+            counts = {}
+            for pairs in by_accommodation.values():
+                for pair in pairs:
+                    counts[pair] = counts.get(pair, 0) + 1
+            entries = sorted((value.casefold(), field, value) for field, value in counts)
+            with self._lock:
+                self._entries, self._counts, self._by_accommodation = entries, counts, by_accommodation
+                pending, self._pending = self._pending, None
+                for accommodation_id, pairs in pending:
+                    self._apply(accommodation_id, pairs)
+                self.built_at = time.monotonic()
+
+    def invalidate(self):
+        """Drop the contents; the next get_index() rebuilds from the database"""
+        with self._lock:
+            self.built_at = None
+
+    def _add(self, pair):
+        count = self._counts.get(pair, 0)
+        self._counts[pair] = count + 1
+        if not count:
+            field, value = pair
+            bisect.insort(self._entries, (value.casefold(), field, value))
+
+    def _remove(self, pair):
+        count = self._counts.get(pair, 0)
+        if count > 1:
+            self._counts[pair] = count - 1
+        elif count == 1:
+            del self._counts[pair]
+            field, value = pair
+            entry = (value.casefold(), field, value)
+            position = bisect.bisect_left(self._entries, entry)
+            if position < len(self._entries) and self._entries[position] == entry:
+                del self._entries[position]
+
+    def _apply(self, accommodation_id, pairs):
+        """Replace an accommodation's pairs (None removes it); the caller holds the lock"""
+        for pair in self._by_accommodation.pop(accommodation_id, ()):
+            self._remove(pair)
+        if pairs is not None:
+            for pair in pairs:
+                self._add(pair)
+            self._by_accommodation[accommodation_id] = pairs
+
+    def _record(self, accommodation_id, pairs):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((accommodation_id, pairs))
+            if self.built_at is not None:
+                self._apply(accommodation_id, pairs)
+            # otherwise not built yet; the first lookup reads the current rows
+
+    def update(self, accommodation_id, building_name, estate_name, geo_address):
+        """Record an accommodation's current values, replacing the ones it had before"""
+        self._record(accommodation_id, _values(building_name, estate_name, geo_address))
+
+    def remove(self, accommodation_id):
+        self._record(accommodation_id, None)
+
+    def search(self, prefix, limit=10, fields=FIELDS):
+        """
+        Values starting with `prefix` (case-insensitive), in alphabetical order.
+
+        Returns:
+            list: dicts with value, field and count (the number of accommodations with the value)
+        """
+        key = prefix.strip().casefold()
+        results = []
+        if not key:
+            return results
+        with self._lock:
+            position = bisect.bisect_left(self._entries, (key,))
+            while position < len(self._entries) and len(results) < limit:
+                entry_key, field, value = self._entries[position]
+                if not entry_key.startswith(key):
+                    break
+                if field in fields:
+                    results.append({'value': value, 'field': field, 'count': self._counts[(field, value)]})
+                position += 1
+        return results
+
+    def __len__(self):
+        return len(self._entries)
+
+index = PrefixIndex()
+_refreshing = threading.Lock()
+
+def _rows():
+    return Accommodation.objects.values_list('id', *FIELDS).iterator(chunk_size=10000)
+
+def _refresh():
+    try:
+        index.build(_rows())
+    finally:
+        _refreshing.release()
+        connections.close_all()  # this thread's connections
+
+def get_index():
+    """
+    The process-wide index, built from the database when missing.
+
+    A stale index is returned as it is and rebuilt in a background thread
+    (one at a time); a missing one is built before returning.
+    """
+    max_age = getattr(settings, 'AUTOCOMPLETE_REFRESH_SECONDS', 300)
+    if index.built_at is None:
+        index.build(_rows())
+    elif max_age and time.monotonic() - index.built_at > max_age and _refreshing.acquire(blocking=False):
+        threading.Thread(target=_refresh, name='autocomplete-refresh', daemon=True).start()
+    return index
+
+def index_on_commit(accommodations, using=None):
+    """Record the accommodations' current values once the transaction commits; bulk writers call this too"""
+    rows = [(a.pk, a.building_name, a.estate_name, a.geo_address) for a in accommodations]
+
+    def apply():
+        for row in rows:
+            index.update(*row)
+    transaction.on_commit(apply, using=using)
+
+@receiver(post_save, sender=Accommodation)
+def accommodation_saved(sender, instance, **kwargs):
+    index_on_commit([instance], kwargs.get('using'))
+
+@receiver(post_delete, sender=Accommodation)
+def accommodation_deleted(sender, instance, **kwargs):
+    accommodation_id = instance.pk
+    transaction.on_commit(lambda: index.remove(accommodation_id), using=kwargs.get('using'))
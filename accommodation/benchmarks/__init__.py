@@ -0,0 +1,10 @@
+"""
+Endpoint benchmarks.
+
+The run_benchmarks management command seeds datasets of several sizes with
+accommodation.seeding, drives every public endpoint through the Django test
+client (scenarios.py) and writes latency percentiles and query counts to a
+JSON report (runner.py). A run fails when a scenario exceeds its declared
+query budget, or when its median latency regressed past a threshold compared
+with a baseline report.
+"""
@@ -0,0 +1,64 @@
+"""
+Benchmark of the JSON list serialization: AccommodationListSerializer against values() rows.
+
+Times fast_list.serialize_with_serializer() and fast_list.serialize_list()
+over every accommodation in the database, annotated with the campus distance
+as list_accommodation does, after checking that both return the same rows.
+Query time is measured separately, so the per-row cost is the Python work of
+building the dicts.
+"""
+import time
+
+from django.db import connection
+
+from accommodation.campuses import DEFAULT_CAMPUS, get_campus
+from accommodation.fast_list import serialize_list, serialize_with_serializer
+from accommodation.geo import distance_expression
+from accommodation.middleware import QueryTimer
+from accommodation.models import Accommodation
+
+def _time(serialize, queryset, fields, repeat):
+    """Best of `repeat` runs: (seconds, query seconds, query count, rows)"""
+    best = None
+    for _ in range(repeat):
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            start = time.perf_counter()
+            data = serialize(queryset.all(), fields)
+            elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, timer.duration, timer.count, data)
+    return best
+
+def _summary(seconds, query_seconds, queries, rows):
+    return {
+        'total_ms': round(seconds * 1000, 2),
+        'db_ms': round(query_seconds * 1000, 2),
+        'queries': queries,
+        'python_us_per_row': round((seconds - query_seconds) * 1e6 / rows, 2) if rows else None,
+    }
+
+def compare_list_serialization(repeat=5, fields=None):
+    """
+    Serialize every accommodation with both paths.
+
+    Returns:
+        dict: rows, a summary per path (total and query time, query count, Python time per row),
+        the per-row speed-up and whether both paths returned the same rows
+    """
+    campus = get_campus(DEFAULT_CAMPUS)
+    queryset = Accommodation.objects.annotate(
+        distance=distance_expression(campus['latitude'], campus['longitude'])
+    ).order_by('id')
+    serializer_seconds, serializer_db, serializer_queries, reference = _time(serialize_with_serializer, queryset, fields, repeat)
+    values_seconds, values_db, values_queries, data = _time(serialize_list, queryset, fields, repeat)
+    rows = len(data)
+    serializer_row, values_row = serializer_seconds - serializer_db, values_seconds - values_db
+    return {
+        'rows': rows,
+        'fields': fields,
+        'serializer': _summary(serializer_seconds, serializer_db, serializer_queries, rows),
+        'values': _summary(values_seconds, values_db, values_queries, rows),
+        'speedup_per_row': round(serializer_row / values_row, 1) if values_row > 0 else None,
+        'same_output': [dict(item) for item in reference] == data,
+    }
@@ -0,0 +1,235 @@
+"""
+Concurrent load test for the reservation flow.
+
+A pool of worker threads replays a weighted mix of list, detail, availability
+and reserve calls against a running server over real HTTP. Reservations target
+a small "hot" set of accommodations so that concurrent requests compete for the
+same dates. Afterwards the database is checked for overlapping reservation
+periods (double bookings) and for reserve calls whose outcome does not match
+the rows written.
+"""
+import random
+import secrets
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.db.models import Exists, OuterRef
+
+from accommodation.models import AccommodationUniversity, ReservationPeriod
+from accommodation.campuses import DEFAULT_CAMPUS, get_campuses
+from .runner import percentile
+
+DEFAULT_MIX = {'list': 1, 'detail': 4, 'availability': 4, 'reserve': 3}
+
+def parse_mix(value):
+    """Parse "list=1,detail=4,availability=4,reserve=3" into a weight dict"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation '{name}', expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("At least one operation needs a positive weight")
+    return mix
+
+def select_targets(count, seed=0):
+    """
+    Pick `count` accommodations with an availability window and a university.
+
+    Returns:
+        list: dicts with id, university code and the availability window
+    """
+    candidates = list(
+        AccommodationUniversity.objects
+        .filter(accommodation__available_from__isnull=False, accommodation__available_to__isnull=False)
+        .order_by('accommodation_id')
+        .values_list('accommodation_id', 'university__code',
+                     'accommodation__available_from', 'accommodation__available_to')
+    )
+    # One university per accommodation is enough to build eligible user IDs
+    by_accommodation = {}
+    for accommodation_id, code, available_from, available_to in candidates:
+        by_accommodation.setdefault(accommodation_id, (code, available_from, available_to))
+    ids = sorted(by_accommodation)
+    chosen = random.Random(seed).sample(ids, min(count, len(ids)))
+    return [
+        {'id': accommodation_id, 'university': by_accommodation[accommodation_id][0],
+         'available_from': by_accommodation[accommodation_id][1],
+         'available_to': by_accommodation[accommodation_id][2]}
+        for accommodation_id in chosen
+    ]
+
+def find_overlaps(accommodation_ids):
+    """Reservation pairs on the same accommodation whose periods overlap (the later one of each pair)"""
+    earlier_overlapping = ReservationPeriod.objects.filter(
+        accommodation=OuterRef('accommodation'),
+        id__lt=OuterRef('id'),
+        start_date__lte=OuterRef('end_date'),
+        end_date__gte=OuterRef('start_date'),
+    )
+    return list(
+        ReservationPeriod.objects
+        .filter(accommodation_id__in=accommodation_ids)
+        .filter(Exists(earlier_overlapping))
+        .order_by('id')
+        .values('id', 'accommodation_id', 'start_date', 'end_date', 'user_id')
+    )
+
+class _Worker:
+    """Builds and sends requests for one thread; each worker has its own session and RNG"""
+    def __init__(self, base_url, targets, campuses, mix, seed, tag, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.targets = targets
+        self.campuses = campuses
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.rng = random.Random(seed)
+        self.tag = tag
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.sequence = 0
+
+    def request(self, operation):
+        target = self.rng.choice(self.targets)
+        if operation == 'list':
+            campus = self.rng.choice(self.campuses)
+            return 'GET', '/api/list-accommodation/', {'format': 'json', 'campus': campus, 'distance': 1}
+        if operation == 'detail':
+            return 'GET', f"/api/accommodation_detail/{target['id']}/", {'format': 'json'}
+        start, end = self.random_period(target)
+        if operation == 'availability':
+            return 'GET', '/api/check_availability/', {'id': target['id'], 'start_date': start, 'end_date': end}
+        self.sequence += 1
+        return 'POST', '/api/reserve_accommodation/', {
+            'id': target['id'],
+            'User ID': f"{target['university']}_{self.tag}{self.sequence}",
+            'contact_number': '91234567',
+            'start_date': start,
+            'end_date': end,
+        }
+
+    def random_period(self, target):
+        window = (target['available_to'] - target['available_from']).days
+        start = target['available_from'] + timedelta(days=self.rng.randint(0, max(0, window - 8)))
+        return str(start), str(start + timedelta(days=self.rng.randint(1, 7)))
+
+    def run(self, deadline, remaining, lock):
+        samples = []
+        while time.perf_counter() < deadline:
+            with lock:
+                if remaining[0] is not None:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            method, path, params = self.request(operation)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, self.base_url + path, params=params, timeout=self.timeout)
+                outcome = response.status_code
+            except requests.RequestException as e:
+                outcome = type(e).__name__
+            samples.append((operation, outcome, time.perf_counter() - start))
+        return samples
+
+def run_load_test(base_url, targets, mix=None, workers=8, duration=10.0, total_requests=None,
+                  seed=0, timeout=30.0):
+    """
+    Replay the request mix against `base_url` and check reservation integrity.
+
+    Args:
+        base_url (str): server root, e.g. http://127.0.0.1:8000
+        targets (list): accommodations from select_targets()
+        mix (dict): operation -> weight (default DEFAULT_MIX)
+        workers (int): concurrent client threads
+        duration (float): stop after this many seconds
+        total_requests (int): or stop after this many requests, whichever comes first
+        seed (int): seed for the request inputs
+        timeout (float): per-request timeout in seconds
+
+    Returns:
+        dict: throughput, latency percentiles, outcome counts, error classes and integrity findings
+    """
+    if not targets:
+        raise ValueError("No accommodations to target; seed the database first")
+    mix = mix or DEFAULT_MIX
+    target_ids = [target['id'] for target in targets]
+    tag = f"lt{secrets.token_hex(3)}"  # marks this run's user IDs, unique across runs
+    campuses = sorted(get_campuses()) or [DEFAULT_CAMPUS]
+    reservations_before = ReservationPeriod.objects.filter(accommodation_id__in=target_ids).count()
+    overlaps_before = len(find_overlaps(target_ids))
+
+    lock = threading.Lock()
+    remaining = [total_requests]
+    started = time.perf_counter()
+    deadline = started + (duration if duration else float('inf'))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_Worker(base_url, targets, campuses, mix, seed * 1000 + n, f"{tag}w{n}s", timeout).run,
+                        deadline, remaining, lock)
+            for n in range(workers)
+        ]
+        samples = [sample for future in futures for sample in future.result()]
+    elapsed = time.perf_counter() - started
+
+    operations = {}
+    error_classes = {}
+    for operation, outcome, latency in samples:
+        stats = operations.setdefault(operation, {'latencies': [], 'outcomes': {}})
+        stats['latencies'].append(latency * 1000)
+        stats['outcomes'][str(outcome)] = stats['outcomes'].get(str(outcome), 0) + 1
+        if not isinstance(outcome, int) or outcome >= 500:
+            key = f"HTTP {outcome}" if isinstance(outcome, int) else outcome
+            error_classes[key] = error_classes.get(key, 0) + 1
+
+    report_operations = {}
+    for operation, stats in sorted(operations.items()):
+        latencies = sorted(stats['latencies'])
+        report_operations[operation] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / elapsed, 2),
+            'outcomes': stats['outcomes'],
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50), 2),
+                'p95': round(percentile(latencies, 0.95), 2),
+                'p99': round(percentile(latencies, 0.99), 2),
+                'mean': round(statistics.fmean(latencies), 2),
+                'max': round(latencies[-1], 2),
+            },
+        }
+
+    reserved_ok = operations.get('reserve', {'outcomes': {}})['outcomes'].get('200', 0)
+    created = ReservationPeriod.objects.filter(
+        accommodation_id__in=target_ids, user_id__contains=f"_{tag}"
+    ).count()
+    overlaps = find_overlaps(target_ids)
+    return {
+        'base_url': base_url,
+        'workers': workers,
+        'duration_s': round(elapsed, 2),
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'reservations_per_s': round(reserved_ok / elapsed, 2) if elapsed else 0.0,
+        'operations': report_operations,
+        'error_classes': error_classes,
+        'integrity': {
+            'target_accommodations': len(target_ids),
+            'reservations_before': reservations_before,
+            'reservations_confirmed': reserved_ok,
+            'reservations_created': created,
+            # Rows written for requests that did not report success (or the other way round)
+            'unconfirmed_difference': created - reserved_ok,
+            'overlaps_before': overlaps_before,
+            'overlapping_periods': len(overlaps) - overlaps_before,
+            'overlap_samples': [
+                {key: str(value) for key, value in overlap.items()} for overlap in overlaps[:10]
+            ],
+        },
+        'user_id_tag': f"_{tag}",
+    }
@@ -0,0 +1,88 @@
+"""
+Microbenchmark of JSON rendering: DRF's JSONRenderer against FastJSONRenderer.
+
+Renders one in-memory list response shaped like the JSON list endpoint's, so
+only encoding is measured. The values have the types the endpoint hands to the
+renderer: AccommodationListSerializer output for the accommodation fields
+(price and available_from/to are already strings) and date objects in the
+available periods and reservations added by fast_list.serialize_list().
+"""
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from rest_framework.renderers import JSONRenderer
+
+from accommodation.renderers import FastJSONRenderer, orjson
+
+def sample_rows(count, seed=0):
+    """`count` list rows with the field types the list endpoint emits"""
+    rng = random.Random(seed)
+    base = date(2030, 1, 1)
+    rows = []
+    for n in range(count):
+        available_from = base + timedelta(days=rng.randint(0, 90))
+        available_to = available_from + timedelta(days=rng.randint(60, 300))
+        start = available_from + timedelta(days=rng.randint(0, 30))
+        end = start + timedelta(days=rng.randint(1, 14))
+        rows.append({
+            'id': n + 1,
+            'title': f"Flat {n}",
+            'building_name': f"BUILDING {n % 700}",
+            'description': "Bright flat close to the MTR. " * 3,
+            'type': rng.choice(['APARTMENT', 'HOUSE', 'HOSTEL']),
+            'price': f"{rng.randint(3000, 25000)}.00",
+            'beds': rng.randint(1, 4),
+            'bedrooms': rng.randint(0, 3),
+            'available_from': available_from.isoformat(),
+            'available_to': available_to.isoformat(),
+            'region': rng.choice(['HK', 'KL', 'NT']),
+            'latitude': 22.2 + rng.random() * 0.3,
+            'longitude': 114.0 + rng.random() * 0.3,
+            'distance': rng.random() * 10,
+            'reserved': False,
+            'room_number': "",
+            'floor_number': str(rng.randint(1, 40)),
+            'flat_number': rng.choice("ABCDEFGH"),
+            'contact_name': "Owner",
+            'contact_phone': "91234567",
+            'contact_email': "owner@example.com",
+            'rating': round(rng.random() * 5, 1),
+            'rating_count': rng.randint(0, 50),
+            'rating_sum': float(rng.randint(0, 250)),
+            'available_periods': [{'start_date': available_from, 'end_date': start - timedelta(days=1)},
+                                  {'start_date': end + timedelta(days=1), 'end_date': available_to}],
+            'reservations': [{'id': n + 1, 'start_date': start, 'end_date': end,
+                              'user_id': f"HKU_{n:08d}", 'contract_status': False}],
+        })
+    return rows
+
+def _time(renderer, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = renderer.render(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings), output
+
+def compare_renderers(rows=10000, repeat=5, seed=0):
+    """
+    Render the same list response with both renderers.
+
+    Returns:
+        dict: rows, bytes, best time in ms per renderer, the speed-up, whether orjson was used
+        and whether both renderers produced the same JSON values
+    """
+    data = {'accommodations': sample_rows(rows, seed)}
+    standard_seconds, standard = _time(JSONRenderer(), data, repeat)
+    fast_seconds, fast = _time(FastJSONRenderer(), data, repeat)
+    return {
+        'rows': rows,
+        'bytes': len(fast),
+        'orjson': orjson is not None,
+        'json_renderer_ms': round(standard_seconds * 1000, 2),
+        'fast_json_renderer_ms': round(fast_seconds * 1000, 2),
+        'speedup': round(standard_seconds / fast_seconds, 1) if fast_seconds else None,
+        'same_output': json.loads(standard) == json.loads(fast),
+    }
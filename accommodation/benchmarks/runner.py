@@ -0,0 +1,171 @@
+"""
+Run the benchmark scenarios and check the results.
+
+run_benchmarks() expects an empty, migrated database (the management command
+creates a throwaway test database) and replaces its contents for every size.
+"""
+import io
+import random
+import statistics
+import time
+from contextlib import redirect_stdout
+from datetime import date
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from accommodation.middleware import QueryTimer
+from accommodation.campuses import load_campuses
+from accommodation.models import Campus, University, UniversityAPIKey
+from accommodation.seeding import generate_load_data
+from .scenarios import SCENARIOS, BenchmarkContext
+
+def fake_als_lookup(url, *args, **kwargs):
+    """Stand-in for the ALS geocoder so the add scenario measures UniHaven, not the network"""
+    query = url.split('q=', 1)[1].split('&', 1)[0]
+    response = mock.Mock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = {"SuggestedAddress": [{"Address": {"PremisesAddress": {
+        "GeoAddress": f"BENCH-{query}",
+        "GeospatialInformation": {"Latitude": 22.28, "Longitude": 114.14},
+        "EngPremisesAddress": {"BuildingName": query.upper(), "Region": "HK"},
+    }}}]}
+    return response
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(durations, query_counts, query_durations, status_codes):
+    durations = sorted(d * 1000 for d in durations)
+    codes = {}
+    for code in status_codes:
+        codes[str(code)] = codes.get(str(code), 0) + 1
+    return {
+        'iterations': len(durations),
+        'status_codes': codes,
+        'latency_ms': {
+            'p50': round(percentile(durations, 0.50), 3),
+            'p90': round(percentile(durations, 0.90), 3),
+            'p95': round(percentile(durations, 0.95), 3),
+            'p99': round(percentile(durations, 0.99), 3),
+            'mean': round(statistics.fmean(durations), 3),
+            'max': round(durations[-1], 3),
+        },
+        'queries': {
+            'min': min(query_counts),
+            'max': max(query_counts),
+            'mean': round(statistics.fmean(query_counts), 2),
+        },
+        'db_ms_mean': round(statistics.fmean(query_durations) * 1000, 3),
+    }
+
+def seed_dataset(size, seed, base_date):
+    """Replace the database contents with a dataset of `size` accommodations; returns an HKU API key"""
+    # flush empties the campus table too; the seeder and the distance scenarios need the campuses back
+    campuses = list(Campus.objects.values('code', 'name', 'latitude', 'longitude', 'university__code'))
+    call_command('flush', interactive=False, verbosity=0)
+    Campus.objects.bulk_create([
+        Campus(code=row['code'], name=row['name'], latitude=row['latitude'], longitude=row['longitude'])
+        for row in campuses
+    ])
+    load_campuses()
+    generate_load_data(universities=3, accommodations=size, reservations=size * 5, ratings=size * 2,
+                       seed=seed, base_date=base_date)
+    universities = {university.code: university for university in University.objects.all()}
+    for row in campuses:
+        if row['university__code'] in universities:
+            Campus.objects.filter(code=row['code']).update(university=universities[row['university__code']])
+    # Specialist and student requests act for the first seeded university (HKU)
+    return UniversityAPIKey.objects.create(university=University.objects.get(code='HKU'))
+
+def run_benchmarks(sizes, iterations=5, seed=0, scenario_names=None, stdout=None):
+    """
+    Seed each dataset size and time every scenario.
+
+    Args:
+        sizes (list): numbers of accommodations to seed
+        iterations (int): timed requests per scenario (after one warm-up request)
+        seed (int): seed for the dataset and the request inputs
+        scenario_names (list): run only these scenarios (default: all)
+        stdout: optional stream for progress messages
+
+    Returns:
+        dict: the report, with one result per (scenario, size)
+    """
+    scenarios = [s for s in SCENARIOS if not scenario_names or s.name in scenario_names]
+    base_date = date.today()
+    report = {
+        'generated_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'sizes': list(sizes),
+        'iterations': iterations,
+        'seed': seed,
+        'results': [],
+    }
+    client = Client()
+    # Views print debug output and send mail on reservations; keep both out of the measurements' way
+    with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'), \
+            mock.patch('accommodation.views.requests.get', side_effect=fake_als_lookup), \
+            redirect_stdout(io.StringIO()):
+        for size in sizes:
+            api_key = seed_dataset(size, seed, base_date)
+            context = BenchmarkContext(size, random.Random(seed), base_date, api_key.university, api_key.key)
+            for scenario in scenarios:
+                durations, query_counts, query_durations, status_codes = [], [], [], []
+                for iteration in range(iterations + 1):
+                    send = scenario.request(client, context)
+                    timer = QueryTimer()
+                    with connection.execute_wrapper(timer):
+                        start = time.perf_counter()
+                        response = send()
+                        elapsed = time.perf_counter() - start
+                    if iteration == 0:
+                        continue  # warm-up
+                    durations.append(elapsed)
+                    query_counts.append(timer.count)
+                    query_durations.append(timer.duration)
+                    status_codes.append(response.status_code)
+                result = {'scenario': scenario.name, 'size': size, 'query_budget': scenario.query_budget(size)}
+                result.update(summarize(durations, query_counts, query_durations, status_codes))
+                report['results'].append(result)
+                if stdout is not None:
+                    stdout.write(
+                        f"{scenario.name:<28} size={size:<7} p50={result['latency_ms']['p50']:>9.2f}ms "
+                        f"p95={result['latency_ms']['p95']:>9.2f}ms queries={result['queries']['max']}"
+                    )
+    return report
+
+def check_report(report, baseline=None, max_regression=0.5, min_delta_ms=1.0):
+    """
+    Compare a report with the query budgets and, optionally, a baseline report.
+
+    A scenario regressed when its median latency grew by more than
+    `max_regression` (a fraction) and by more than `min_delta_ms`, which keeps
+    sub-millisecond noise from failing the run.
+
+    Returns:
+        list: human-readable failure descriptions (empty when everything passed)
+    """
+    failures = []
+    baseline_results = {}
+    if baseline:
+        baseline_results = {(r['scenario'], r['size']): r for r in baseline['results']}
+
+    for result in report['results']:
+        name = f"{result['scenario']} (size {result['size']})"
+        errors = sum(count for code, count in result['status_codes'].items() if code.startswith('5'))
+        if errors:
+            failures.append(f"{name}: {errors} server errors")
+        if result['queries']['max'] > result['query_budget']:
+            failures.append(f"{name}: {result['queries']['max']} queries, budget {result['query_budget']}")
+        previous = baseline_results.get((result['scenario'], result['size']))
+        if previous:
+            before, after = previous['latency_ms']['p50'], result['latency_ms']['p50']
+            if after > before * (1 + max_regression) and after - before > min_delta_ms:
+                failures.append(f"{name}: median latency {after:.2f}ms, baseline {before:.2f}ms")
+    return failures
@@ -0,0 +1,166 @@
+"""
+Benchmark scenarios: one per endpoint and list filter/order.
+
+A scenario's prepare(context) picks the inputs for one request outside the
+timed section and returns the request to send. query_budget(size) is the
+maximum number of SQL queries a single request may run on a dataset with
+`size` accommodations.
+"""
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from accommodation.models import Accommodation, ReservationPeriod
+
+class BenchmarkContext:
+    """State shared by the scenarios of one dataset size"""
+    def __init__(self, size, rng, base_date, university, api_key):
+        self.size = size
+        self.rng = rng
+        self.base_date = base_date
+        self.university = university
+        self.api_key = api_key
+        self.accommodation_ids = list(Accommodation.objects.values_list('id', flat=True))
+        self.affiliated_ids = list(
+            Accommodation.objects.filter(affiliated_universities=university).values_list('id', flat=True)
+        )
+        self.reserved_user_ids = []  # users the reserve scenario made reservations for
+        self.counter = 0
+
+    def next_number(self):
+        self.counter += 1
+        return self.counter
+
+    def date(self, days):
+        return str(self.base_date + timedelta(days=days))
+
+class Scenario:
+    """
+    Args:
+        name (str): scenario name used in the report
+        method (str): HTTP method
+        prepare (callable): context -> (path, query params, JSON body or None, headers)
+        query_budget (int or callable): maximum queries per request, or a function of the dataset size
+    """
+    def __init__(self, name, method, prepare, query_budget):
+        self.name = name
+        self.method = method
+        self.prepare = prepare
+        self._query_budget = query_budget
+
+    def query_budget(self, size):
+        return self._query_budget(size) if callable(self._query_budget) else self._query_budget
+
+    def request(self, client, context):
+        """Build the request outside the timed section; returns a zero-argument callable that sends it"""
+        path, params, body, headers = self.prepare(context)
+        url = f"{path}?{urlencode(params)}" if params else path
+        send = getattr(client, self.method.lower())
+        if body is None:
+            return lambda: send(url, **headers)
+        return lambda: send(url, data=body, content_type='application/json', **headers)
+
+# The list reads every listing's reservations with one prefetch per pass, so its query count does not grow
+# with the dataset
+LIST_BUDGET = 12
+
+def _list(extra, specialist=False):
+    def prepare(context):
+        params = {'format': 'json'}
+        params.update({key: value(context) if callable(value) else value for key, value in extra.items()})
+        headers = {'HTTP_X_API_KEY': context.api_key} if specialist else {}
+        return '/api/list-accommodation/', params, None, headers
+    return prepare
+
+def _detail(context):
+    accommodation_id = context.rng.choice(context.accommodation_ids)
+    return f'/api/accommodation_detail/{accommodation_id}/', {'format': 'json'}, None, {}
+
+def _check_availability(context):
+    accommodation = Accommodation.objects.get(id=context.rng.choice(context.accommodation_ids))
+    start = accommodation.available_from + timedelta(days=context.rng.randint(0, 60))
+    return '/api/check_availability/', {
+        'id': accommodation.id,
+        'start_date': str(start),
+        'end_date': str(start + timedelta(days=7)),
+    }, None, {}
+
+def _reserve(context):
+    # Pick a listing of the user's university and a free gap, so the reservation succeeds
+    while True:
+        accommodation = Accommodation.objects.get(id=context.rng.choice(context.affiliated_ids))
+        gaps = [(start, end) for start, end in accommodation.get_available_periods() if (end - start).days >= 2]
+        if gaps:
+            break
+    start, _ = gaps[0]
+    user_id = f"{context.university.code}_{90000000 + context.next_number()}"
+    context.reserved_user_ids.append(user_id)
+    return '/api/reserve_accommodation/', {
+        'id': accommodation.id,
+        'User ID': user_id,
+        'contact_number': '91234567',
+        'start_date': str(start),
+        'end_date': str(start + timedelta(days=1)),
+    }, None, {}
+
+def _cancel(context):
+    # Cancel a reservation made by the reserve scenario, which runs first
+    reservation = ReservationPeriod.objects.filter(user_id=context.reserved_user_ids.pop()).first()
+    return '/api/cancel_reservation/', {
+        'id': reservation.accommodation_id,
+        'User ID': reservation.user_id,
+        'reservation_id': reservation.id,
+    }, None, {}
+
+def _rate(context):
+    accommodation_id = context.rng.choice(context.accommodation_ids)
+    return f'/api/rate/{accommodation_id}/', {
+        'userid': f"bench{context.next_number():08d}",
+        'rating': context.rng.randint(0, 5),
+    }, None, {}
+
+def _add(context):
+    number = context.next_number()
+    return '/api/add-accommodation/', None, {
+        'title': f"Benchmark Flat {number}",
+        'description': "Added by the benchmark.",
+        'type': 'APARTMENT',
+        'price': 5000,
+        'beds': 2,
+        'bedrooms': 1,
+        'available_from': context.date(0),
+        'available_to': context.date(180),
+        'building_name': f"Benchmark Tower {number}",
+        'room_number': '1',
+        'floor_number': '1',
+        'flat_number': 'A',
+    }, {'HTTP_X_API_KEY': context.api_key, 'HTTP_ACCEPT': 'application/json'}
+
+LIST_FILTERS = [
+    ('list', {}),
+    ('list_type', {'type': 'APARTMENT'}),
+    ('list_region', {'region': 'HK'}),
+    ('list_available_dates', {'available_from': lambda c: c.date(-30), 'available_to': lambda c: c.date(150)}),
+    ('list_min_beds', {'min_beds': 2}),
+    ('list_min_bedrooms', {'min_bedrooms': 2}),
+    ('list_max_price', {'max_price': 6000}),
+    ('list_distance', {'distance': 3}),
+    ('list_campus', {'campus': 'HKUST', 'distance': 5}),
+    ('list_user_id', {'user_id': 'HKU_12345678'}),
+    ('list_reservation_dates', {'reservation_start': lambda c: c.date(10), 'reservation_end': lambda c: c.date(20)}),
+    ('list_order_distance', {'order_by': 'distance'}),
+    ('list_order_price_asc', {'order_by': 'price_asc'}),
+    ('list_order_price_desc', {'order_by': 'price_desc'}),
+    ('list_order_rating', {'order_by': 'rating'}),
+    ('list_order_beds', {'order_by': 'beds'}),
+    ('list_order_by_distance', {'order_by_distance': 'true'}),
+]
+
+SCENARIOS = [Scenario(name, 'GET', _list(extra), LIST_BUDGET) for name, extra in LIST_FILTERS] + [
+    Scenario('list_specialist', 'GET', _list({}, specialist=True), LIST_BUDGET),
+    Scenario('detail', 'GET', _detail, 3),
+    Scenario('check_availability', 'GET', _check_availability, 3),
+    Scenario('reserve', 'POST', _reserve, 19),
+    Scenario('cancel', 'PUT', _cancel, 20),
+    Scenario('rate', 'POST', _rate, 15),
+    Scenario('add', 'POST', _add, 12),
+]
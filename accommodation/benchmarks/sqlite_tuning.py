@@ -0,0 +1,160 @@
+"""
+Before/after benchmark for the SQLite tuning in settings: SQLITE_PRAGMAS and
+the "transaction_mode" database option.
+
+Both runs work on their own copy of the same database file and use plain
+sqlite3 connections, so the only difference is the tuning. Reader threads
+run what the detail page runs (the accommodation row plus its reservation
+periods). Writer threads run what the reserve flow does: in a transaction,
+check for an overlapping period, then insert one.
+"""
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from accommodation.models import Accommodation, ReservationPeriod
+from .runner import percentile
+
+# What Django's SQLite backend uses when no PRAGMAs are set
+DEFAULT_TIMEOUT = 5.0
+
+def copy_database(source, target):
+    """Copy a SQLite database with the backup API (safe while it is in use or in WAL mode)"""
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+def _set_journal_mode(path, journal_mode):
+    """journal_mode is stored in the file; set it once before the threads connect"""
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(f"PRAGMA journal_mode = {journal_mode}")
+    finally:
+        connection.close()
+
+def _connect(path, pragmas):
+    """A connection configured like Django's: SQLite defaults when `pragmas` is None"""
+    connection = sqlite3.connect(path, timeout=DEFAULT_TIMEOUT, isolation_level=None, check_same_thread=False)
+    for name, value in (pragmas or {}).items():
+        if name != 'journal_mode':
+            connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
+def _worker(path, pragmas, transaction_mode, kind, accommodation_ids, deadline, seed, results):
+    rng = random.Random(seed)
+    accommodation_table = Accommodation._meta.db_table
+    reservation_table = ReservationPeriod._meta.db_table
+    connection = _connect(path, pragmas)
+    latencies, errors = [], {}
+    try:
+        while time.perf_counter() < deadline:
+            accommodation_id = rng.choice(accommodation_ids)
+            start = time.perf_counter()
+            try:
+                if kind == 'read':
+                    connection.execute(f"SELECT * FROM {accommodation_table} WHERE id = ?", (accommodation_id,)).fetchone()
+                    connection.execute(
+                        f"SELECT * FROM {reservation_table} WHERE accommodation_id = ? ORDER BY start_date",
+                        (accommodation_id,)
+                    ).fetchall()
+                else:
+                    day = f"2040-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                    connection.execute(f"BEGIN {transaction_mode or ''}")
+                    try:
+                        overlapping = connection.execute(
+                            f"SELECT 1 FROM {reservation_table} WHERE accommodation_id = ? "
+                            f"AND start_date <= ? AND end_date >= ? LIMIT 1",
+                            (accommodation_id, day, day)
+                        ).fetchone()
+                        if not overlapping:
+                            connection.execute(
+                                f"INSERT INTO {reservation_table} (accommodation_id, user_id, contact_number, "
+                                f"start_date, end_date, created_at, contract_status) "
+                                f"VALUES (?, 'HKU_bench', '91234567', ?, ?, '2040-01-01 00:00:00', 0)",
+                                (accommodation_id, day, day)
+                            )
+                        connection.execute("COMMIT")
+                    except BaseException:
+                        connection.execute("ROLLBACK")
+                        raise
+            except sqlite3.OperationalError as e:
+                errors[str(e)] = errors.get(str(e), 0) + 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection.close()
+    results.append((kind, latencies, errors))
+
+def run_mixed_workload(path, pragmas, transaction_mode=None, readers=8, writers=2, duration=5.0, seed=0):
+    """
+    Run reader and writer threads against `path` for `duration` seconds.
+
+    Args:
+        pragmas (dict): PRAGMAs for every connection, or None for SQLite's defaults
+        transaction_mode (str): DEFERRED, IMMEDIATE or EXCLUSIVE for the write transactions (default DEFERRED)
+
+    Returns:
+        dict: operations per second, latency percentiles and lock errors for reads and writes
+    """
+    connection = sqlite3.connect(path)
+    try:
+        accommodation_ids = [row[0] for row in connection.execute(f"SELECT id FROM {Accommodation._meta.db_table}")]
+    finally:
+        connection.close()
+    if not accommodation_ids:
+        raise ValueError("The database has no accommodations; run seed_load_data first")
+
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_worker, args=(path, pragmas, transaction_mode, kind, accommodation_ids,
+                                             deadline, seed + n, results))
+        for n, kind in enumerate(['read'] * readers + ['write'] * writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = {}
+    for kind in ('read', 'write'):
+        latencies = sorted(l for k, values, _ in results if k == kind for l in values)
+        errors = {}
+        for k, _, worker_errors in results:
+            if k == kind:
+                for message, count in worker_errors.items():
+                    errors[message] = errors.get(message, 0) + count
+        summary[kind] = {
+            'operations': len(latencies),
+            'per_second': round(len(latencies) / duration, 1),
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50), 3) if latencies else None,
+                'p99': round(percentile(latencies, 0.99), 3) if latencies else None,
+                'mean': round(statistics.fmean(latencies), 3) if latencies else None,
+            },
+            'errors': errors,
+        }
+    return summary
+
+def compare_settings(source, pragmas, transaction_mode=None, readers=8, writers=2, duration=5.0, seed=0):
+    """Run the workload on two copies of `source`: with SQLite's defaults, then with the tuning"""
+    workdir = tempfile.mkdtemp(prefix='unihaven-sqlite-bench-')
+    try:
+        report = {'pragmas': pragmas, 'transaction_mode': transaction_mode,
+                  'readers': readers, 'writers': writers, 'duration_s': duration}
+        for label, mode, begin in (('before', None, None), ('after', pragmas, transaction_mode)):
+            path = os.path.join(workdir, f'{label}.sqlite3')
+            copy_database(source, path)
+            _set_journal_mode(path, (mode or {}).get('journal_mode', 'DELETE'))
+            report[label] = run_mixed_workload(path, mode, begin, readers, writers, duration, seed)
+        return report
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,83 @@
+"""
+In-process cache of the Campus table, used to measure distances.
+
+There are only a handful of campuses, so each process loads them all on first
+use and serves every lookup from memory. Saving or deleting a Campus reloads
+the cache once the transaction commits and invalidates the cached listing data
+that depends on campus distances (see listing_cache.py). Changes made by other
+processes are picked up when the copy is older than CAMPUS_REFRESH_SECONDS.
+
+Renamed codes keep working through DEPRECATED_CODES for a deprecation period.
+"""
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .listing_cache import bump_listing_version
+from .models import Campus
+
+DEFAULT_CAMPUS = "HKU_main"
+
+# Old code -> current code. The hard-coded campus list spelled HKU_kadoorie as
+# KHU_kadoorie until migration 0022; remove the alias once clients have moved.
+DEPRECATED_CODES = {
+    "KHU_kadoorie": "HKU_kadoorie",
+}
+
+_lock = threading.Lock()
+_campuses = {}
+_loaded_at = None
+
+def load_campuses():
+    """Replace the cached campuses with the current rows"""
+    global _campuses, _loaded_at
+    campuses = {
+        campus.code: {
+            'code': campus.code,
+            'name': campus.name,
+            'university': campus.university.code if campus.university else None,
+            'latitude': campus.latitude,
+            'longitude': campus.longitude,
+        }
+        for campus in Campus.objects.select_related('university')
+    }
+    with _lock:
+        _campuses, _loaded_at = campuses, time.monotonic()
+    return campuses
+
+def invalidate():
+    """Drop the cached campuses; the next lookup reloads them"""
+    global _loaded_at
+    with _lock:
+        _loaded_at = None
+
+def get_campuses():
+    """All campuses by code, reloaded when missing or stale"""
+    max_age = getattr(settings, 'CAMPUS_REFRESH_SECONDS', 300)
+    loaded_at = _loaded_at
+    if loaded_at is None or (max_age and time.monotonic() - loaded_at > max_age):
+        return load_campuses()
+    return _campuses
+
+def get_campus(code):
+    """
+    The campus with this code (or the deprecated code of one), falling back to DEFAULT_CAMPUS for unknown codes.
+
+    Returns:
+        dict: code, name, university, latitude and longitude, or None when there are no campuses at all
+    """
+    campuses = get_campuses()
+    return (campuses.get(code) or campuses.get(DEPRECATED_CODES.get(code)) or campuses.get(DEFAULT_CAMPUS)
+            or next(iter(campuses.values()), None))
+
+def campuses_changed():
+    invalidate()
+    # Cached facet counts include distance filters measured from the old coordinates
+    bump_listing_version()
+
+@receiver(post_save, sender=Campus)
+@receiver(post_delete, sender=Campus)
+def campus_saved(sender, **kwargs):
+    transaction.on_commit(campuses_changed, using=kwargs.get('using'))
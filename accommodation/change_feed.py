@@ -0,0 +1,72 @@
+"""
+Commit-safe cursors for the /changes/ feed.
+
+A client that has read up to a cursor must never later be handed an event
+that sorts before it. Event ids are allocated at insert time, so on
+PostgreSQL a transaction can commit a lower id after a higher one has been
+read. There every event records the transaction that wrote it (a trigger
+from migration 0023) and the feed is ordered by (transaction, id). It only
+returns events of transactions older than the oldest one still running
+(pg_snapshot_xmin()). Every event that commits later belongs to a running or
+newer transaction, which has a higher number and sorts after the cursor.
+Events behind a long-running transaction are held back until it ends.
+
+SQLite has one writer at a time, and its transaction holds the write lock
+until it commits, so ids commit in order and the feed is ordered by id.
+
+Cursors are opaque strings: "<transaction>:<id>" on PostgreSQL and "<id>"
+elsewhere. A bare event id, as returned before migration 0023, is accepted
+on every backend.
+"""
+from django.db import connections
+from django.db.models import Q
+
+def parse_cursor(value):
+    """
+    (transaction or None, event id) for a cursor.
+
+    Raises:
+        ValueError: the cursor is malformed
+    """
+    transaction, _, event_id = str(value).strip().rpartition(':')
+    return (int(transaction) if transaction else None), int(event_id)
+
+def format_cursor(event):
+    if event.transaction_id is None:
+        return str(event.id)
+    return f"{event.transaction_id}:{event.id}"
+
+def _oldest_running_transaction(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+def feed_page(queryset, cursor, limit):
+    """
+    The events of `queryset` after `cursor`, in feed order.
+
+    Returns:
+        tuple: (up to `limit` events, the cursor to resume from, whether more events follow)
+
+    Raises:
+        ValueError: the cursor is malformed
+    """
+    transaction, event_id = parse_cursor(cursor)
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        if transaction is None:
+            # A bare id: resume after that event's position in the feed
+            transaction = queryset.model.objects.using(queryset.db).filter(id=event_id).values_list(
+                'transaction_id', flat=True).first() or 0
+        queryset = queryset.filter(
+            Q(transaction_id__gt=transaction) | Q(transaction_id=transaction, id__gt=event_id),
+            transaction_id__lt=_oldest_running_transaction(connection),
+        ).order_by('transaction_id', 'id')
+    else:
+        queryset = queryset.filter(id__gt=event_id).order_by('id')
+
+    # Fetch one extra row to know whether another page follows
+    events = list(queryset[:limit + 1])
+    has_more = len(events) > limit
+    events = events[:limit]
+    return events, (format_cursor(events[-1]) if events else str(cursor)), has_more
@@ -0,0 +1,61 @@
+"""
+Streaming exports of accommodations and reservations for university systems.
+
+Rows are read with values_list().iterator() and encoded one at a time, so
+memory use does not grow with the number of rows exported.
+"""
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Accommodation, ReservationPeriod
+
+EXPORT_CHUNK_SIZE = 2000
+
+ACCOMMODATION_EXPORT_FIELDS = [
+    'id', 'title', 'type', 'price', 'beds', 'bedrooms', 'available_from', 'available_to',
+    'building_name', 'estate_name', 'street_name', 'building_no', 'district', 'region',
+    'room_number', 'floor_number', 'flat_number', 'geo_address', 'latitude', 'longitude',
+    'contact_name', 'contact_phone', 'contact_email', 'rating', 'rating_count',
+]
+
+RESERVATION_EXPORT_FIELDS = [
+    'id', 'accommodation_id', 'accommodation__title', 'user_id', 'contact_number',
+    'start_date', 'end_date', 'contract_status', 'created_at',
+]
+
+class _Echo:
+    """File-like object whose write() hands the encoded line back to the csv writer's caller"""
+    def write(self, value):
+        return value
+
+def stream_csv(fields, rows):
+    """Yield a CSV header line followed by one line per row tuple"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+def stream_ndjson(fields, rows):
+    """Yield one JSON object per line for each row tuple"""
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n"
+
+def accommodation_export_rows(university, chunk_size=EXPORT_CHUNK_SIZE):
+    """Rows of the accommodations affiliated with the university, ordered by ID"""
+    return (
+        Accommodation.objects
+        .filter(affiliated_universities=university)
+        .order_by('id')
+        .values_list(*ACCOMMODATION_EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+def reservation_export_rows(university, chunk_size=EXPORT_CHUNK_SIZE):
+    """Rows of the reservations on accommodations affiliated with the university, ordered by ID"""
+    return (
+        ReservationPeriod.objects
+        .filter(accommodation__affiliated_universities=university)
+        .order_by('id')
+        .values_list(*RESERVATION_EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
@@ -0,0 +1,95 @@
+"""
+Facet counts for the search sidebar: per type, region, bedroom bucket and price band.
+
+All four facets come from one GROUP BY query over the filtered listing. Each
+facet's counts ignore that facet's own filter (the type counts show how many
+listings every type would have with the other filters applied), so the query
+groups by the four facet values plus whether each row passes the bedroom and
+price filters, and the combinations are added up in Python.
+"""
+from django.db.models import BooleanField, Case, CharField, Count, Q, Value, When
+from .models import Accommodation
+
+TYPES = [value for value, _ in Accommodation.TYPE_CHOICES]
+
+# Listings with at least this many bedrooms share the last bucket
+BEDROOM_BUCKETS = ['0', '1', '2', '3', '4+']
+
+# Lower bounds of the price bands in HKD; the last band is open-ended
+PRICE_BANDS = [0, 5000, 10000, 15000, 20000]
+
+def _price_band_label(index):
+    low = PRICE_BANDS[index]
+    if index + 1 < len(PRICE_BANDS):
+        return f"{low}-{PRICE_BANDS[index + 1]}"
+    return f"{low}+"
+
+def _bedroom_bucket():
+    last = len(BEDROOM_BUCKETS) - 1
+    return Case(
+        *[When(bedrooms__lte=n, then=Value(BEDROOM_BUCKETS[n])) for n in range(last)],
+        default=Value(BEDROOM_BUCKETS[last]),
+        output_field=CharField(),
+    )
+
+def _price_band():
+    return Case(
+        *[When(price__lt=PRICE_BANDS[n + 1], then=Value(_price_band_label(n))) for n in range(len(PRICE_BANDS) - 1)],
+        default=Value(_price_band_label(len(PRICE_BANDS) - 1)),
+        output_field=CharField(),
+    )
+
+def _flag(condition):
+    return Case(When(condition, then=Value(True)), default=Value(False), output_field=BooleanField())
+
+def compute_facets(queryset, accommodation_type=None, region=None, min_bedrooms=None, max_price=None):
+    """
+    Count the listings of `queryset` per facet value.
+
+    `queryset` carries every filter except the faceted ones, which are passed
+    separately so that each facet can leave its own filter out.
+
+    Returns:
+        dict: total (listings matching all filters) and facets: lists of {value, count} per facet
+    """
+    annotations = {'bedroom_bucket': _bedroom_bucket(), 'price_band': _price_band()}
+    groups = ['type', 'region', 'bedroom_bucket', 'price_band']
+    if min_bedrooms is not None:
+        annotations['bedrooms_ok'] = _flag(Q(bedrooms__gte=min_bedrooms))
+        groups.append('bedrooms_ok')
+    if max_price is not None:
+        annotations['price_ok'] = _flag(Q(price__lte=max_price))
+        groups.append('price_ok')
+    rows = queryset.annotate(**annotations).values(*groups).annotate(count=Count('id')).order_by()
+
+    counts = {'type': {}, 'region': {}, 'bedrooms': {}, 'price': {}}
+    total = 0
+    for row in rows:
+        passes = {
+            'type': not accommodation_type or row['type'] == accommodation_type,
+            'region': not region or row['region'] == region,
+            'bedrooms': row.get('bedrooms_ok', True),
+            'price': row.get('price_ok', True),
+        }
+        values = {'type': row['type'], 'region': row['region'],
+                  'bedrooms': row['bedroom_bucket'], 'price': row['price_band']}
+        for facet, value in values.items():
+            if all(passed for other, passed in passes.items() if other != facet):
+                counts[facet][value] = counts[facet].get(value, 0) + row['count']
+        if all(passes.values()):
+            total += row['count']
+
+    return {
+        'total': total,
+        'facets': {
+            'type': [{'value': value, 'count': counts['type'].get(value, 0)} for value in TYPES],
+            'region': [{'value': value, 'count': count} for value, count in sorted(counts['region'].items()) if value],
+            'bedrooms': [{'value': value, 'count': counts['bedrooms'].get(value, 0)} for value in BEDROOM_BUCKETS],
+            'price': [
+                {'value': _price_band_label(n), 'min': low,
+                 'max': PRICE_BANDS[n + 1] if n + 1 < len(PRICE_BANDS) else None,
+                 'count': counts['price'].get(_price_band_label(n), 0)}
+                for n, low in enumerate(PRICE_BANDS)
+            ],
+        },
+    }
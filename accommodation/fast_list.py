@@ -0,0 +1,143 @@
+"""
+Read-only serialization of the accommodation list straight from QuerySet.values().
+
+AccommodationListSerializer runs get_attribute() and to_representation() for
+every field of every model instance, which dominates the JSON list endpoint
+once it returns thousands of rows. serialize_list() produces the same dicts
+without model instances or serializer calls per row: the accommodation
+columns come from one values() query, the reservations from one
+values_list() query, and each field is converted with a function chosen once
+per fieldset from the serializer's own fields (nothing for str and int
+columns, float() for floats, date.isoformat() for ISO dates and the field's
+to_representation() for the rest, such as the Decimal price).
+
+serialize_with_serializer() is the ModelSerializer path it replaces, kept
+for FAST_LIST_SERIALIZATION = False and as the reference in the parity test
+and the benchmark (accommodation/benchmarks/list_serialization.py).
+"""
+import datetime
+from functools import lru_cache
+
+from rest_framework import serializers
+from rest_framework.settings import ISO_8601, api_settings
+
+from .fieldsets import columns_for, needs_any
+from .models import Accommodation, ReservationPeriod, free_periods
+from .serializers import AccommodationListSerializer
+
+# Added to each accommodation after the serializer fields; both are read from its reservations
+EXTRA_FIELDS = ['available_periods', 'reservations']
+FIELDS = AccommodationListSerializer.Meta.fields + EXTRA_FIELDS
+SOURCES = dict(AccommodationListSerializer.SOURCES, available_periods=('available_from', 'available_to'))
+PERIOD_FIELDS = ['reserved'] + EXTRA_FIELDS
+
+def _converter(field):
+    """The function the serializer field applies to a non-None database value, or None for the value itself"""
+    if isinstance(field, (serializers.CharField, serializers.IntegerField, serializers.SerializerMethodField)):
+        # str and int columns are returned as they are; reserved is computed below as a bool
+        return None
+    if isinstance(field, serializers.FloatField):
+        return float
+    if isinstance(field, serializers.DateField):
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format and output_format.lower() == ISO_8601:
+            return datetime.date.isoformat
+    return field.to_representation
+
+@lru_cache(maxsize=128)
+def _plan(fields):
+    """
+    The values() columns and the (field name, converter) pairs, in output order, for a fieldset.
+
+    `fields` is a frozenset (or None), so the same selection in any order
+    shares one entry; the output follows FIELDS order either way, which is
+    the order select_fields() returns.
+    """
+    if fields is not None:
+        fields = [name for name in FIELDS if name in fields]
+    serializer = AccommodationListSerializer(fields=fields)
+    converters = tuple((name, _converter(field)) for name, field in serializer.fields.items())
+    columns = columns_for(Accommodation, FIELDS if fields is None else fields, SOURCES)
+    if 'distance' in serializer.fields:
+        columns.append('distance')
+    return columns, converters
+
+def serialize_list(queryset, fields=None):
+    """
+    The list endpoint's accommodations for `queryset`, without model instances.
+
+    Args:
+        queryset: Accommodation queryset with the `distance` annotation when distance is selected
+        fields: the names chosen with fieldsets.select_fields() from FIELDS, or None for every field
+
+    Returns:
+        list: the same dicts as serialize_with_serializer()
+    """
+    columns, converters = _plan(None if fields is None else frozenset(fields))
+    rows = list(queryset.prefetch_related(None).values(*columns))
+    with_free = needs_any(fields, ['reserved', 'available_periods'])
+    with_periods = needs_any(fields, ['available_periods'])
+    with_reservations = needs_any(fields, ['reservations'])
+
+    # (start_date, end_date, ...) per accommodation, in the order of the reservation_periods prefetch
+    reservations = {}
+    if rows and needs_any(fields, PERIOD_FIELDS):
+        period_columns = ['start_date', 'end_date']
+        if with_reservations:
+            period_columns += ['id', 'user_id', 'contract_status']
+        for accommodation_id, *period in ReservationPeriod.objects.filter(
+            accommodation_id__in=[row['id'] for row in rows]
+        ).values_list('accommodation_id', *period_columns):
+            reservations.setdefault(accommodation_id, []).append(period)
+
+    data = []
+    for row in rows:
+        periods = reservations.get(row['id'], ())
+        if with_free:
+            free = free_periods(row['available_from'], row['available_to'], [period[:2] for period in periods])
+            row['reserved'] = not free
+        item = {}
+        for name, convert in converters:
+            value = row[name]
+            item[name] = value if value is None or convert is None else convert(value)
+        if with_periods:
+            item['available_periods'] = [{'start_date': start, 'end_date': end} for start, end in free]
+        if with_reservations:
+            item['reservations'] = [
+                {'id': reservation_id, 'start_date': start, 'end_date': end, 'user_id': user_id,
+                 'contract_status': contract_status}
+                for start, end, reservation_id, user_id, contract_status in periods
+            ]
+        data.append(item)
+    return data
+
+def serialize_with_serializer(queryset, fields=None):
+    """The list endpoint's accommodations for `queryset` through AccommodationListSerializer and model instances"""
+    if fields is not None:
+        queryset = queryset.only(*columns_for(Accommodation, fields, SOURCES))
+    # Periods are read for reserved and both extra fields; fetch them all at once
+    if needs_any(fields, PERIOD_FIELDS):
+        queryset = queryset.prefetch_related('reservation_periods')
+    serializer = AccommodationListSerializer(queryset, many=True, fields=fields)
+    with_periods, with_reservations = needs_any(fields, ['available_periods']), needs_any(fields, ['reservations'])
+    # serializer.data evaluated the queryset; iterating it again reuses the rows and their periods
+    for accommodation, acc_data in zip(queryset, serializer.data):
+        # 添加可用期间
+        if with_periods:
+            acc_data['available_periods'] = [
+                {'start_date': period[0], 'end_date': period[1]}
+                for period in accommodation.get_available_periods()
+            ]
+        if not with_reservations:
+            continue
+        # 添加预订信息
+        acc_data['reservations'] = []
+        for period in accommodation.reservation_periods.all():
+            acc_data['reservations'].append({
+                'id': period.id,
+                'start_date': period.start_date,
+                'end_date': period.end_date,
+                'user_id': period.user_id,
+                'contract_status': period.contract_status
+            })
+    return serializer.data
@@ -0,0 +1,57 @@
+"""
+Sparse fieldsets: the fields= and exclude= query parameters of the list and detail endpoints.
+
+fields=id,latitude,longitude,price keeps only those fields of each
+accommodation and exclude=description,reservations drops fields. Both take
+comma-separated names and can be combined (exclude applies after fields); id
+is always kept. The selection also trims what is read from the database: the
+views load only the columns behind the selected fields (QuerySet.only()) and
+fetch reservation rows only when a selected field is computed from them.
+"""
+
+def _names(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+def select_fields(query_params, available, always=('id',)):
+    """
+    The names in `available` selected by the fields and exclude parameters, in `available` order.
+
+    Returns:
+        list or None: the selected names, or None when neither parameter is given (every field)
+
+    Raises:
+        ValueError: a parameter names a field that is not in `available`
+    """
+    requested = _names(query_params.get('fields'))
+    excluded = _names(query_params.get('exclude')) or set()
+    if requested is None and not excluded:
+        return None
+    unknown = sorted(((requested or set()) | excluded) - set(available))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(available)}.")
+    return [
+        name for name in available
+        if name in always or ((requested is None or name in requested) and name not in excluded)
+    ]
+
+def columns_for(model, names, sources=None):
+    """
+    The model columns to load (QuerySet.only()) to output the fields `names`.
+
+    `sources` maps computed fields to the columns they read; any other name that
+    is a concrete model field reads its own column. Annotations and related
+    rows need no columns.
+    """
+    concrete = {field.name for field in model._meta.concrete_fields}
+    result = []
+    for name in names:
+        for column in (sources or {}).get(name, (name,)):
+            if column in concrete and column not in result:
+                result.append(column)
+    return result
+
+def needs_any(names, fields):
+    """Whether any of `fields` is selected (`names` None means every field is)"""
+    return names is None or any(field in names for field in fields)
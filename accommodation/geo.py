@@ -0,0 +1,204 @@
+"""
+Distance and geohash helpers shared by the listing and map endpoints.
+
+Every accommodation stores the geohash of its coordinates (Accommodation.geohash,
+GEOHASH_PRECISION characters). Listings in the same geohash cell share a prefix,
+so the map clusters are one GROUP BY over a prefix of that indexed column.
+"""
+import math
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Func, Min
+from django.db.models.functions import Substr
+
+EARTH_RADIUS_KM = 6371
+
+def distance_expression(latitude, longitude):
+    """
+    Distance in km from (latitude, longitude) to each row, for annotate().
+
+    Uses the equirectangular approximation of the Haversine formula, which is
+    accurate to well under 1% at Hong Kong scales. POW is registered for
+    SQLite in apps.py.
+    """
+    return ExpressionWrapper(
+        Func(
+            Func(
+                (F('longitude') - longitude) * math.pi / 180 *
+                Func((F('latitude') + latitude) / 2 * math.pi / 180, function='COS'),
+                function='POW',
+                template="%(function)s(%(expressions)s, 2)"
+            ) + Func(
+                (F('latitude') - latitude) * math.pi / 180,
+                function='POW',
+                template="%(function)s(%(expressions)s, 2)"
+            ),
+            function='SQRT',
+        ) * EARTH_RADIUS_KM,
+        output_field=FloatField(),
+    )
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Stored precision: cells of about 5 m x 5 m
+GEOHASH_PRECISION = 9
+
+# Sorts after every geohash character, for prefix range lookups
+_PREFIX_END = "~"
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """The geohash of a point, `precision` characters long"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Even bits split the longitude, odd bits the latitude
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+def precision_for_zoom(zoom):
+    """
+    Geohash length for clusters at a web map zoom level.
+
+    A 256 px tile is 40 000 km / 2**zoom wide and every two characters divide
+    a cell by 32, so this gives a few clusters across each tile.
+    """
+    return max(1, min((zoom + 1) // 2, GEOHASH_PRECISION))
+
+def _common_prefix(first, second):
+    length = 0
+    while length < min(len(first), len(second)) and first[length] == second[length]:
+        length += 1
+    return first[:length]
+
+def distance_km(latitude1, longitude1, latitude2, longitude2):
+    """The distance_expression() formula in Python, so both order listings the same way"""
+    x = math.radians(longitude2 - longitude1) * math.cos(math.radians((latitude1 + latitude2) / 2))
+    y = math.radians(latitude2 - latitude1)
+    return math.sqrt(x * x + y * y) * EARTH_RADIUS_KM
+
+def box_around(latitude, longitude, radius_km):
+    """
+    A (min_lat, min_lon, max_lat, max_lon) box holding every point within radius_km.
+
+    The longitude span is measured at the box edge nearest a pole, where a
+    degree is shortest, so the circle fits at every latitude of the box.
+    """
+    lat_span = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(latitude - lat_span, -90.0), min(latitude + lat_span, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    lon_span = 360.0 if cos_lat < 1e-6 else math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    return min_lat, max(longitude - lon_span, -180.0), max_lat, min(longitude + lon_span, 180.0)
+
+def in_bbox(queryset, min_lat, min_lon, max_lat, max_lon):
+    """
+    Restrict an Accommodation queryset to a bounding box.
+
+    Geohash cells are rectangles, so the box lies in the cell named by the
+    common prefix of its south-west and north-east corners. That prefix is a
+    range lookup on the geohash index; the exact bounds are checked on the
+    same index entries.
+    """
+    prefix = _common_prefix(encode_geohash(min_lat, min_lon), encode_geohash(max_lat, max_lon))
+    if prefix:
+        queryset = queryset.filter(geohash__gte=prefix, geohash__lt=prefix + _PREFIX_END)
+    return queryset.filter(
+        latitude__gte=min_lat, latitude__lte=max_lat, longitude__gte=min_lon, longitude__lte=max_lon
+    )
+
+def cluster_queryset(queryset, min_lat, min_lon, max_lat, max_lon, zoom):
+    """The GROUP BY behind cluster_accommodations(): one row per geohash cell"""
+    return (
+        in_bbox(queryset, min_lat, min_lon, max_lat, max_lon)
+        .annotate(cell=Substr('geohash', 1, precision_for_zoom(zoom)))
+        .values('cell')
+        .annotate(count=Count('id'), latitude=Avg('latitude'), longitude=Avg('longitude'),
+                  min_price=Min('price'), first_id=Min('id'))
+        .order_by('cell')
+    )
+
+def cluster_accommodations(queryset, min_lat, min_lon, max_lat, max_lon, zoom):
+    """
+    Group the listings of `queryset` inside a bounding box into geohash cells.
+
+    Returns:
+        list: dicts with geohash, count, latitude and longitude (the centroid), min_price,
+        and id (the listing's id when the cluster holds only one listing, otherwise None)
+    """
+    rows = cluster_queryset(queryset, min_lat, min_lon, max_lat, max_lon, zoom)
+    return [
+        {
+            'geohash': row['cell'],
+            'count': row['count'],
+            'latitude': row['latitude'],
+            'longitude': row['longitude'],
+            'min_price': float(row['min_price']),
+            'id': row['first_id'] if row['count'] == 1 else None,
+        }
+        for row in rows
+    ]
+
+# First search radius of nearest_ids(); doubled until the k nearest are known
+NEAREST_START_KM = 0.5
+
+def _closest(found, k, radius_km, accept, checked):
+    """The ids of up to k accepted candidates within radius_km, nearest first"""
+    while True:
+        result, pending = [], []
+        for distance, pk in found:
+            if distance > radius_km or len(result) + len(pending) >= k:
+                break
+            if pk not in checked:
+                pending.append(pk)
+            elif checked[pk]:
+                result.append(pk)
+        if not pending:
+            return result
+        accepted = accept(pending) if accept else pending
+        checked.update((pk, pk in accepted) for pk in pending)
+
+def nearest_ids(queryset, latitude, longitude, k, max_km=None, accept=None):
+    """
+    The ids of the k rows of `queryset` nearest to a point, nearest first.
+
+    Expanding-ring search: each round reads the rows in a box around the point
+    that were outside the previous box (a geohash range lookup, see in_bbox()),
+    then doubles the box. It stops once k rows lie within the radius the box
+    is known to cover, so only the neighbourhood of the point is read.
+
+    Args:
+        queryset: Accommodation queryset carrying the other filters
+        max_km (float): ignore rows further away than this
+        accept: optional callable taking a list of candidate ids and returning the
+            ones to keep, for checks that cannot be written as a filter. It only
+            sees candidates that would otherwise be returned.
+    """
+    found, checked, searched = [], {}, None
+    radius = NEAREST_START_KM if max_km is None else min(NEAREST_START_KM, max_km)
+    while True:
+        box = box_around(latitude, longitude, radius)
+        rows = in_bbox(queryset, *box)
+        if searched:
+            rows = rows.exclude(latitude__gte=searched[0], longitude__gte=searched[1],
+                                latitude__lte=searched[2], longitude__lte=searched[3])
+        found.extend(
+            (distance_km(latitude, longitude, row_latitude, row_longitude), pk)
+            for pk, row_latitude, row_longitude in rows.values_list('id', 'latitude', 'longitude')
+        )
+        found.sort()
+        whole_world = box == (-90.0, -180.0, 90.0, 180.0)
+        last_round = whole_world or (max_km is not None and radius >= max_km)
+        result = _closest(found, k, math.inf if whole_world else radius, accept, checked)
+        if len(result) == k or last_round:
+            return result
+        searched = box
+        radius = radius * 2 if max_km is None else min(radius * 2, max_km)
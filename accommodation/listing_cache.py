@@ -0,0 +1,60 @@
+"""
+Versioned caching for responses derived from the accommodation listing.
+
+Every cache key includes a listing version number kept in the cache itself.
+Saving or deleting an accommodation, a reservation or a university
+affiliation bumps the version, which orphans all cached listing data at
+once; orphaned entries expire on their own. With a shared cache backend
+(Memcached, Redis) the bump is seen by every process. With the default
+per-process LocMemCache other processes only notice at the entry's timeout.
+
+Bulk writes send no signals; code using them calls bump_listing_version().
+"""
+import hashlib
+import time
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .models import Accommodation, AccommodationUniversity, ReservationPeriod
+
+VERSION_KEY = 'accommodation_listing_version'
+
+def _initial_version():
+    # Starts from the clock, so a version evicted from the cache is never handed out again
+    return int(time.time() * 1000)
+
+def listing_version():
+    return cache.get_or_set(VERSION_KEY, _initial_version, None)
+
+def _bump():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, _initial_version(), None)
+
+def bump_listing_version(using=None):
+    """Invalidate cached listing data now, and again when the current transaction commits"""
+    # The first bump stops readers from caching rows about to change; the second one drops anything
+    # a reader cached from the old rows while the transaction was still open
+    _bump()
+    transaction.on_commit(_bump, using=using)
+
+def cache_key(prefix, params):
+    """A key for `params` (a dict) under the current listing version"""
+    digest = hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()
+    return f"{prefix}:{listing_version()}:{digest}"
+
+@receiver(post_save, sender=Accommodation)
+@receiver(post_delete, sender=Accommodation)
+@receiver(post_save, sender=ReservationPeriod)
+@receiver(post_delete, sender=ReservationPeriod)
+@receiver(post_save, sender=AccommodationUniversity)
+@receiver(post_delete, sender=AccommodationUniversity)
+def listing_changed(sender, **kwargs):
+    bump_listing_version(kwargs.get('using'))
+
+@receiver(m2m_changed, sender=AccommodationUniversity)
+def affiliations_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_listing_version(kwargs.get('using'))
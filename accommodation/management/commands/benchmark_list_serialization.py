@@ -0,0 +1,51 @@
+import io
+import json
+from contextlib import redirect_stdout
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from accommodation.benchmarks.list_serialization import compare_list_serialization
+from accommodation.benchmarks.runner import seed_dataset
+from accommodation.fast_list import FIELDS
+
+class Command(BaseCommand):
+    help = 'Time the JSON list serialization with AccommodationListSerializer and with values() rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=5000, help='Accommodations to seed and serialize')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per path; the best time is reported')
+        parser.add_argument('--fields', type=str, help='Comma-separated fieldset, as in the fields= parameter')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the dataset')
+        parser.add_argument('--output', type=str, help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        fields = None
+        if options['fields']:
+            fields = [name.strip() for name in options['fields'].split(',')]
+            unknown = [name for name in fields if name not in FIELDS]
+            if unknown:
+                raise CommandError(f"Unknown fields: {', '.join(unknown)}")
+            fields = [name for name in FIELDS if name in fields or name == 'id']
+
+        # Run against a throwaway test database, never the configured one
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            with redirect_stdout(io.StringIO()):
+                seed_dataset(options['size'], options['seed'], date.today())
+            report = compare_list_serialization(repeat=options['repeat'], fields=fields)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        for label in ('serializer', 'values'):
+            result = report[label]
+            self.stdout.write(
+                f"{label:<11} {report['rows']} rows: {result['total_ms']}ms ({result['db_ms']}ms in "
+                f"{result['queries']} queries), {result['python_us_per_row']}us per row"
+            )
+        self.stdout.write(f"Per-row speed-up: {report['speedup_per_row']}x, same output: {report['same_output']}")
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
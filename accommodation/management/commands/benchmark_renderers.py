@@ -0,0 +1,25 @@
+import json
+from django.core.management.base import BaseCommand
+from accommodation.benchmarks.rendering import compare_renderers
+
+class Command(BaseCommand):
+    help = 'Time rendering a large list response with JSONRenderer and with FastJSONRenderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Accommodations in the rendered list')
+        parser.add_argument('--repeat', type=int, default=5, help='Renders per renderer; the best time is reported')
+        parser.add_argument('--output', type=str, help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        report = compare_renderers(rows=options['rows'], repeat=options['repeat'])
+        if not report['orjson']:
+            self.stdout.write("orjson is not installed; FastJSONRenderer falls back to JSONRenderer")
+        self.stdout.write(
+            f"{report['rows']} rows, {report['bytes']} bytes: JSONRenderer {report['json_renderer_ms']}ms, "
+            f"FastJSONRenderer {report['fast_json_renderer_ms']}ms ({report['speedup']}x), "
+            f"same output: {report['same_output']}"
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
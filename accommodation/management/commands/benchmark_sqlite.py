@@ -0,0 +1,48 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from accommodation.benchmarks.sqlite_tuning import compare_settings
+
+class Command(BaseCommand):
+    help = 'Compare a mixed read/write workload with SQLite defaults and with the SQLite tuning in settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', type=str, help='SQLite file to copy for both runs (default: the configured database)')
+        parser.add_argument('--readers', type=int, default=8, help='Reader threads')
+        parser.add_argument('--writers', type=int, default=2, help='Writer threads')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per run')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the accommodations each thread picks')
+        parser.add_argument('--output', type=str, help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if not source:
+            if connection.vendor != 'sqlite':
+                raise CommandError("The configured database is not SQLite; pass --source")
+            source = str(connection.settings_dict['NAME'])
+        pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+        transaction_mode = connection.settings_dict.get('OPTIONS', {}).get('transaction_mode')
+        if not pragmas and not transaction_mode:
+            raise CommandError("Neither SQLITE_PRAGMAS nor a transaction_mode is configured; nothing to compare")
+
+        try:
+            report = compare_settings(source, pragmas, transaction_mode, readers=options['readers'],
+                                      writers=options['writers'], duration=options['duration'],
+                                      seed=options['seed'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"{options['readers']} readers, {options['writers']} writers, {options['duration']}s per run")
+        for kind in ('read', 'write'):
+            for label in ('before', 'after'):
+                stats = report[label][kind]
+                errors = sum(stats['errors'].values())
+                self.stdout.write(
+                    f"  {kind:<5} {label:<6} {stats['per_second']:>10}/s  p50={stats['latency_ms']['p50']}ms "
+                    f"p99={stats['latency_ms']['p99']}ms  lock errors={errors}"
+                )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
@@ -0,0 +1,27 @@
+import time
+from django.core.management.base import BaseCommand
+from accommodation.webhooks import deliver_pending
+
+class Command(BaseCommand):
+    help = 'Deliver queued reservation webhooks to university systems'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Deliver the currently due events and exit')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when nothing is due')
+        parser.add_argument('--limit', type=int, default=1000, help='Maximum events handled per round')
+        parser.add_argument('--batch-size', type=int, default=None, help='Events per POST (default: WEBHOOK_BATCH_SIZE)')
+        parser.add_argument('--workers', type=int, default=None, help='Concurrent POSTs (default: WEBHOOK_MAX_WORKERS)')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = deliver_pending(limit=options['limit'], batch_size=options['batch_size'],
+                                    max_workers=options['workers'])
+            if any(stats.values()):
+                self.stdout.write(
+                    f"delivered={stats['delivered']} retried={stats['retried']} dead_lettered={stats['dead_lettered']}"
+                )
+            if options['once']:
+                break
+            # Keep draining while there is a backlog; otherwise wait for new events
+            if sum(stats.values()) < options['limit']:
+                time.sleep(options['interval'])
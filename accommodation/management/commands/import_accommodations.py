@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from accommodation.models import University
+from accommodation.utils import bulk_import_accommodations, read_import_file
+
+class Command(BaseCommand):
+    help = 'Bulk import accommodations for a university from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file with add-accommodation fields, one accommodation per row')
+        parser.add_argument('--university', type=str, help='University code, e.g. HKU', required=True)
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per INSERT statement')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent address lookups')
+
+    def handle(self, *args, **options):
+        try:
+            university = University.objects.get(code=options['university'])
+        except University.DoesNotExist:
+            raise CommandError(f"The university with the code '{options['university']}' was not found")
+
+        try:
+            rows = read_import_file(options['path'], 'accommodations')
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        results = bulk_import_accommodations(rows, university, batch_size=options['batch_size'],
+                                             max_workers=options['workers'])
+        summary = {}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+            if result['status'] in ('created', 'linked'):
+                continue
+            detail = result.get('errors') or result.get('message')
+            self.stdout.write(self.style.WARNING(f"Row {result['row'] + 1} {result['status']}: {detail}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            "Import finished: " + ", ".join(f"{status}={count}" for status, count in sorted(summary.items()))
+        ))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from accommodation.models import University
+from accommodation.serializers import BulkRatingItemSerializer
+from accommodation.utils import bulk_import_ratings, recompute_rating_aggregates, read_import_file
+
+class Command(BaseCommand):
+    help = 'Bulk import accommodation ratings from a CSV or JSON file and rebuild the rating aggregates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='CSV or JSON file with accommodation_id, userid and rating columns')
+        parser.add_argument('--university', type=str, help='University code; only its affiliated accommodations may be rated', required=False)
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT statement')
+        parser.add_argument('--rebuild-all', action='store_true', help='Recompute rating aggregates for every accommodation')
+
+    def handle(self, *args, **options):
+        path = options.get('path')
+        if not path and not options.get('rebuild_all'):
+            raise CommandError("Either a file path or --rebuild-all is required")
+
+        if path:
+            university = None
+            if options.get('university'):
+                try:
+                    university = University.objects.get(code=options['university'])
+                except University.DoesNotExist:
+                    raise CommandError(f"The university with the code '{options['university']}' was not found")
+
+            try:
+                rows = read_import_file(path, 'ratings')
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {path}: {e}")
+
+            serializer = BulkRatingItemSerializer(data=rows, many=True)
+            if not serializer.is_valid():
+                for index, errors in enumerate(serializer.errors):
+                    if errors:
+                        self.stdout.write(self.style.ERROR(f"Row {index + 1}: {errors}"))
+                raise CommandError("Validation failed, nothing was imported")
+
+            result = bulk_import_ratings(serializer.validated_data, university=university,
+                                         batch_size=options['batch_size'])
+            for index, error in result['errors'].items():
+                self.stdout.write(self.style.WARNING(f"Row {index + 1}: {error}"))
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {result['created']} ratings, skipped {result['duplicates']} duplicates"
+            ))
+
+        if options.get('rebuild_all'):
+            updated = recompute_rating_aggregates()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt rating aggregates for {updated} accommodations"))
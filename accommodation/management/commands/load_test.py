@@ -0,0 +1,111 @@
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from accommodation.benchmarks.loadtest import DEFAULT_MIX, parse_mix, run_load_test, select_targets
+from accommodation.models import ReservationPeriod
+
+class Command(BaseCommand):
+    help = 'Replay a concurrent mix of list, detail, availability and reserve calls and check for double bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', type=str, help='Server to test; by default a local runserver is launched')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent client threads')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+        parser.add_argument('--requests', type=int, default=None, help='Stop after this many requests')
+        parser.add_argument('--mix', type=str, default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                            help='Operation weights, e.g. list=1,detail=4,availability=4,reserve=3')
+        parser.add_argument('--accommodations', type=int, default=20,
+                            help='Size of the hot set of accommodations the requests target')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the target selection and request inputs')
+        parser.add_argument('--output', type=str, help='Also write the JSON report to this file')
+        parser.add_argument('--cleanup', action='store_true', help='Delete the reservations made by this run afterwards')
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        targets = select_targets(options['accommodations'], seed=options['seed'])
+        if not targets:
+            raise CommandError("No accommodations with a university and an availability window; run seed_load_data first")
+
+        server = None
+        base_url = options['url']
+        if not base_url:
+            server, base_url = self.launch_server(options.get('settings'))
+        try:
+            report = run_load_test(base_url, targets, mix=mix, workers=options['workers'],
+                                   duration=options['duration'], total_requests=options['requests'],
+                                   seed=options['seed'])
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+        if options['cleanup']:
+            ReservationPeriod.objects.filter(user_id__contains=report['user_id_tag']).delete()
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+        if report['integrity']['overlapping_periods']:
+            raise CommandError(f"{report['integrity']['overlapping_periods']} overlapping reservation periods created")
+
+    def launch_server(self, settings_module):
+        """Start `manage.py runserver` (threaded, no autoreload) on a free port and wait until it answers"""
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        command = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'runserver', '--noreload', f'127.0.0.1:{port}']
+        if settings_module:
+            command.append(f'--settings={settings_module}')
+        # The server logs every request; send that to a file rather than a pipe nobody drains
+        log = tempfile.TemporaryFile()
+        server = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        base_url = f'http://127.0.0.1:{port}'
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                log.seek(0)
+                output = log.read().decode('utf-8', 'replace').strip().splitlines()
+                raise CommandError(f"The server exited during startup: {output[-1] if output else 'no output'}")
+            try:
+                requests.get(f'{base_url}/api/metrics/', timeout=1)
+                return server, base_url
+            except requests.RequestException:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError("The server did not start within 30 seconds")
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{report['requests']} requests in {report['duration_s']}s with {report['workers']} workers: "
+            f"{report['throughput_rps']} req/s, {report['reservations_per_s']} confirmed reservations/s"
+        )
+        for operation, stats in report['operations'].items():
+            latency = stats['latency_ms']
+            outcomes = " ".join(f"{code}={count}" for code, count in sorted(stats['outcomes'].items()))
+            self.stdout.write(
+                f"  {operation:<13} {stats['requests']:>6} req {stats['throughput_rps']:>8} req/s "
+                f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms  {outcomes}"
+            )
+        if report['error_classes']:
+            self.stdout.write(self.style.WARNING(
+                "Errors: " + ", ".join(f"{name}={count}" for name, count in sorted(report['error_classes'].items()))
+            ))
+        integrity = report['integrity']
+        style = self.style.ERROR if integrity['overlapping_periods'] or integrity['unconfirmed_difference'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Integrity: {integrity['reservations_created']} reservations written, "
+            f"{integrity['reservations_confirmed']} confirmed, "
+            f"{integrity['overlapping_periods']} new overlapping periods"
+        ))
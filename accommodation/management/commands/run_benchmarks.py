@@ -0,0 +1,51 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from accommodation.benchmarks.runner import check_report, run_benchmarks
+
+class Command(BaseCommand):
+    help = 'Benchmark the API endpoints on seeded datasets and check query budgets and latency regressions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='50,200', help='Comma-separated dataset sizes (accommodations)')
+        parser.add_argument('--iterations', type=int, default=5, help='Timed requests per scenario and size')
+        parser.add_argument('--scenario', action='append', dest='scenarios', help='Run only this scenario (repeatable)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the datasets and request inputs')
+        parser.add_argument('--output', type=str, default='benchmark-report.json', help='Where to write the JSON report')
+        parser.add_argument('--baseline', type=str, help='Earlier report to compare median latencies with')
+        parser.add_argument('--max-regression', type=float, default=0.5,
+                            help='Allowed median latency growth over the baseline, as a fraction')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers")
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read the baseline {options['baseline']}: {e}")
+
+        # Run against a throwaway test database, never the configured one
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            report = run_benchmarks(sizes, iterations=options['iterations'], seed=options['seed'],
+                                    scenario_names=options['scenarios'], stdout=self.stdout)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report['failures'] = check_report(report, baseline, max_regression=options['max_regression'])
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(f"Report written to {options['output']}")
+
+        if report['failures']:
+            for failure in report['failures']:
+                self.stdout.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(report['failures'])} benchmark checks failed")
+        self.stdout.write(self.style.SUCCESS("All benchmark checks passed"))
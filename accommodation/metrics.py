@@ -0,0 +1,78 @@
+"""
+In-process request metrics rendered in the Prometheus text exposition format.
+
+Each worker process keeps its own histograms; Prometheus aggregates across
+processes when it scrapes every worker. Observing a request is a few dict
+lookups and integer increments under a lock.
+"""
+import bisect
+import threading
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, one series per label value"""
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, label, value):
+        counts = self.series.get(label)
+        if counts is None:
+            # per-bucket counts (+Inf last), then sum
+            counts = self.series[label] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def render(self, label_name):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label, counts in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_name}="{label}"}} {counts[-1]}')
+            lines.append(f'{self.name}_count{{{label_name}="{label}"}} {cumulative}')
+        return lines
+
+class MetricsRegistry:
+    """Per-view request metrics"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.duration = Histogram('unihaven_request_duration_seconds', 'Wall time spent handling the request.', DURATION_BUCKETS)
+            self.queries = Histogram('unihaven_db_queries', 'SQL queries executed per request.', QUERY_COUNT_BUCKETS)
+            self.db_duration = Histogram('unihaven_db_duration_seconds', 'Total SQL time per request.', DURATION_BUCKETS)
+            self.size = Histogram('unihaven_response_size_bytes', 'Response body size (0 for streaming responses).', SIZE_BUCKETS)
+            self.responses = {}
+
+    def observe(self, view, status_code, duration, query_count, query_duration, size):
+        with self.lock:
+            self.duration.observe(view, duration)
+            self.queries.observe(view, query_count)
+            self.db_duration.observe(view, query_duration)
+            self.size.observe(view, size)
+            key = (view, status_code)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render(self):
+        """Return all metrics in the Prometheus text format"""
+        with self.lock:
+            lines = [
+                "# HELP unihaven_responses_total Responses by view and status code.",
+                "# TYPE unihaven_responses_total counter",
+            ]
+            for (view, status_code), count in sorted(self.responses.items()):
+                lines.append(f'unihaven_responses_total{{view="{view}",status="{status_code}"}} {count}')
+            for histogram in (self.duration, self.queries, self.db_duration, self.size):
+                lines.extend(histogram.render('view'))
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
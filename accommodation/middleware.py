@@ -0,0 +1,57 @@
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from .metrics import registry
+
+class QueryTimer:
+    """connection.execute_wrapper() hook counting queries and their total time"""
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+class RequestMetricsMiddleware:
+    """
+    Record wall time, SQL query count, SQL time and response size per view.
+
+    The data feeds the in-memory histograms served at /api/metrics/. With
+    METRICS_SERVER_TIMING enabled the same numbers are returned in a
+    Server-Timing header. Queries run while a streaming response is being
+    consumed happen after this middleware returns and are not counted.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', False)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(view, response.status_code, duration, timer.count, timer.duration, size)
+
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'app;dur={duration * 1000:.1f}, '
+                f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"'
+            )
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodation', '0016_remove_accommodation_contract_status_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('accommodation', 'Accommodation'), ('reservation', 'Reservation'), ('affiliation', 'Accommodation University')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('accommodation_id', models.BigIntegerField(help_text='Accommodation the changed object belongs to')),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='change_events', to='accommodation.university')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['university', 'id'], name='changeevent_university_cursor')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodation', '0018_webhooks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='accommodation',
+            index=models.Index(fields=['type', 'price'], name='accommodation_type_price'),
+        ),
+        migrations.AddIndex(
+            model_name='accommodation',
+            index=models.Index(fields=['region', 'price'], name='accommodation_region_price'),
+        ),
+        migrations.AddIndex(
+            model_name='accommodation',
+            index=models.Index(fields=['price'], name='accommodation_price'),
+        ),
+        migrations.AddIndex(
+            model_name='accommodation',
+            index=models.Index(fields=['rating'], name='accommodation_rating'),
+        ),
+        migrations.AddIndex(
+            model_name='accommodation',
+            index=models.Index(fields=['available_from', 'available_to'], name='accommodation_availability'),
+        ),
+        migrations.AddIndex(
+            model_name='accommodationuniversity',
+            index=models.Index(fields=['university', 'accommodation'], name='accommodationuni_scope'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationperiod',
+            index=models.Index(fields=['accommodation', 'start_date'], name='reservation_acc_start'),
+        ),
+    ]
@@ -0,0 +1,104 @@
+from django.db import migrations
+
+# SQLite: an external-content FTS5 table over the accommodation columns, kept in sync by triggers
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE accommodation_search USING fts5(
+        title, description, building_name, estate_name, street_name, district,
+        content='accommodation_accommodation', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER accommodation_search_insert AFTER INSERT ON accommodation_accommodation BEGIN
+        INSERT INTO accommodation_search (rowid, title, description, building_name, estate_name, street_name, district)
+        VALUES (new.id, new.title, new.description, new.building_name, new.estate_name, new.street_name, new.district);
+    END
+    """,
+    """
+    CREATE TRIGGER accommodation_search_delete AFTER DELETE ON accommodation_accommodation BEGIN
+        INSERT INTO accommodation_search (accommodation_search, rowid, title, description, building_name, estate_name, street_name, district)
+        VALUES ('delete', old.id, old.title, old.description, old.building_name, old.estate_name, old.street_name, old.district);
+    END
+    """,
+    """
+    CREATE TRIGGER accommodation_search_update
+    AFTER UPDATE OF title, description, building_name, estate_name, street_name, district ON accommodation_accommodation
+    BEGIN
+        INSERT INTO accommodation_search (accommodation_search, rowid, title, description, building_name, estate_name, street_name, district)
+        VALUES ('delete', old.id, old.title, old.description, old.building_name, old.estate_name, old.street_name, old.district);
+        INSERT INTO accommodation_search (rowid, title, description, building_name, estate_name, street_name, district)
+        VALUES (new.id, new.title, new.description, new.building_name, new.estate_name, new.street_name, new.district);
+    END
+    """,
+    "INSERT INTO accommodation_search (accommodation_search) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS accommodation_search_update",
+    "DROP TRIGGER IF EXISTS accommodation_search_delete",
+    "DROP TRIGGER IF EXISTS accommodation_search_insert",
+    "DROP TABLE IF EXISTS accommodation_search",
+]
+
+# PostgreSQL: a weighted tsvector column with a GIN index, filled by a BEFORE trigger
+POSTGRESQL_FORWARD = [
+    "ALTER TABLE accommodation_accommodation ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION accommodation_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.building_name, '') || ' ' || coalesce(NEW.estate_name, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.street_name, '') || ' ' || coalesce(NEW.district, '')), 'C') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER accommodation_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description, building_name, estate_name, street_name, district
+    ON accommodation_accommodation
+    FOR EACH ROW EXECUTE FUNCTION accommodation_search_vector()
+    """,
+    # Fire the trigger once for the existing rows
+    "UPDATE accommodation_accommodation SET title = title",
+    "CREATE INDEX accommodation_search_vector ON accommodation_accommodation USING GIN (search_vector)",
+]
+
+POSTGRESQL_REVERSE = [
+    "DROP INDEX IF EXISTS accommodation_search_vector",
+    "DROP TRIGGER IF EXISTS accommodation_search_vector_update ON accommodation_accommodation",
+    "DROP FUNCTION IF EXISTS accommodation_search_vector()",
+    "ALTER TABLE accommodation_accommodation DROP COLUMN IF EXISTS search_vector",
+]
+
+STATEMENTS = {
+    'sqlite': (SQLITE_FORWARD, SQLITE_REVERSE),
+    'postgresql': (POSTGRESQL_FORWARD, POSTGRESQL_REVERSE),
+}
+
+def _run(schema_editor, index):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return  # other backends fall back to no full-text index; see accommodation/search.py
+    for sql in statements[index]:
+        schema_editor.execute(sql)
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, 0)
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodation', '0019_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
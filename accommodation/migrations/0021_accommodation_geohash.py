@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:38
+
+from django.db import migrations, models
+from accommodation.geo import encode_geohash
+
+BATCH_SIZE = 2000
+
+def fill_geohash(apps, schema_editor):
+    Accommodation = apps.get_model('accommodation', 'Accommodation')
+    rows = (
+        Accommodation.objects.using(schema_editor.connection.alias)
+        .filter(latitude__isnull=False, longitude__isnull=False)
+        .only('id', 'latitude', 'longitude')
+    )
+    batch = []
+    for accommodation in rows.iterator(chunk_size=BATCH_SIZE):
+        accommodation.geohash = encode_geohash(accommodation.latitude, accommodation.longitude)
+        batch.append(accommodation)
+        if len(batch) == BATCH_SIZE:
+            Accommodation.objects.using(schema_editor.connection.alias).bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        Accommodation.objects.using(schema_editor.connection.alias).bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodation', '0020_accommodation_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accommodation',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='accommodation',
+            index=models.Index(fields=['geohash', 'latitude', 'longitude', 'price'], name='accommodation_geohash'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The campuses that were hard-coded in views.CAMPUS_LOCATIONS. That dict spelled HKU_kadoorie as
+# "KHU_kadoorie" and listed CUHK's coordinates under a second "HKUST" key.
+CAMPUSES = [
+    ('HKU_main', 'HKU Main Campus', 'HKU', 22.28405, 114.13784),
+    ('HKU_sassoon', 'HKU Sassoon Road Campus', 'HKU', 22.2675, 114.12881),
+    ('HKU_swire', 'HKU Swire Institute of Marine Science', 'HKU', 22.20805, 114.26021),
+    ('HKU_kadoorie', 'HKU Kadoorie Centre', 'HKU', 22.43022, 114.11429),
+    ('HKU_dentistry', 'HKU Prince Philip Dental Hospital', 'HKU', 22.28649, 114.14426),
+    ('HKUST', 'HKUST Clear Water Bay Campus', 'HKUST', 22.33584, 114.26355),
+    ('CUHK', 'CUHK Sha Tin Campus', 'CUHK', 22.41907, 114.20693),
+]
+
+def create_campuses(apps, schema_editor):
+    Campus = apps.get_model('accommodation', 'Campus')
+    University = apps.get_model('accommodation', 'University')
+    alias = schema_editor.connection.alias
+    universities = {university.code: university for university in University.objects.using(alias).all()}
+    for code, name, university_code, latitude, longitude in CAMPUSES:
+        Campus.objects.using(alias).get_or_create(code=code, defaults={
+            'name': name, 'university': universities.get(university_code),
+            'latitude': latitude, 'longitude': longitude,
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodation', '0021_accommodation_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(help_text='Campus code used in the campus parameter, such as HKU_main', max_length=50, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('university', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='campuses', to='accommodation.university')),
+            ],
+            options={
+                'verbose_name_plural': 'Campuses',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.RunPython(create_campuses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+# PostgreSQL: record the writing transaction of every change event (see accommodation/change_feed.py)
+POSTGRESQL_FORWARD = [
+    # Events written before this migration have all committed; they sort first
+    "UPDATE accommodation_changeevent SET transaction_id = 0",
+    """
+    CREATE FUNCTION accommodation_changeevent_transaction() RETURNS trigger AS $$
+    BEGIN
+        NEW.transaction_id := pg_current_xact_id()::text::bigint;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER accommodation_changeevent_transaction
+    BEFORE INSERT ON accommodation_changeevent
+    FOR EACH ROW EXECUTE FUNCTION accommodation_changeevent_transaction()
+    """,
+]
+
+POSTGRESQL_REVERSE = [
+    "DROP TRIGGER IF EXISTS accommodation_changeevent_transaction ON accommodation_changeevent",
+    "DROP FUNCTION IF EXISTS accommodation_changeevent_transaction()",
+]
+
+def create_transaction_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return  # other backends commit event ids in order; see accommodation/change_feed.py
+    for sql in POSTGRESQL_FORWARD:
+        schema_editor.execute(sql)
+
+def drop_transaction_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRESQL_REVERSE:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accommodation', '0022_campus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changeevent',
+            name='transaction_id',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='changeevent',
+            index=models.Index(fields=['university', 'transaction_id', 'id'], name='changeevent_feed'),
+        ),
+        migrations.RunPython(create_transaction_trigger, drop_transaction_trigger),
+    ]
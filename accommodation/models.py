@@ -1,6 +1,50 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from datetime import timedelta
+from .geo import encode_geohash
+
+# 设置最小可预订时间（天）
+MIN_BOOKING_DAYS = 1
+
+def free_periods(available_from, available_to, reserved_periods):
+    """
+    The free (start_date, end_date) periods between available_from and available_to.
+
+    `reserved_periods` are (start_date, end_date) pairs ordered by start date.
+    Shared by Accommodation.get_available_periods() and the values-based list
+    serialization (see fast_list.py), which has no model instances.
+    """
+    if not available_from or not available_to:
+        return []
+
+    # 如果没有预定，则整个时间段都可用
+    if not reserved_periods:
+        return [(available_from, available_to)]
+
+    available_periods = []
+    current_date = available_from
+
+    # 遍历所有预定期间，找出中间的可用时间段
+    for start_date, end_date in reserved_periods:
+        # 如果当前日期小于预定开始日期，则添加可用时间段
+        # 修复：使用预定开始日期减去1天作为可用时间段的结束日期
+        if current_date < start_date:
+            period_end = start_date - timedelta(days=1)
+            # 检查这个时间段是否至少有MIN_BOOKING_DAYS天
+            days_available = (period_end - current_date).days + 1
+            if days_available >= MIN_BOOKING_DAYS:
+                available_periods.append((current_date, period_end))
+        # 更新当前日期为预定结束日期加1天
+        current_date = end_date + timedelta(days=1)
+
+    # 检查最后一个预定结束日期到可用结束日期是否还有空闲时间段
+    if current_date <= available_to:
+        days_available = (available_to - current_date).days + 1
+        if days_available >= MIN_BOOKING_DAYS:
+            available_periods.append((current_date, available_to))
+
+    return available_periods
 
 class Accommodation(models.Model):
     TYPE_CHOICES = [
@@ -34,6 +78,8 @@ class Accommodation(models.Model):
     latitude = models.FloatField(blank=True)
     longitude = models.FloatField(blank=True)
     geo_address = models.CharField(max_length=200, blank=True)
+    # Derived from latitude/longitude on save; used by the map clusters (see geo.py)
+    geohash = models.CharField(max_length=12, null=True, blank=True, editable=False)
 
     room_number = models.CharField(max_length=20, blank=True, null=True)
     floor_number = models.CharField(max_length=20, blank=True, null=True)
@@ -56,7 +102,16 @@ class Accommodation(models.Model):
         self.floor_number = self.floor_number or ""
         self.flat_number = self.flat_number or ""
         self.geo_address = self.geo_address or ""
-        super().save(*args, **kwargs)
+        self.geohash = self.compute_geohash()
+        # post_save records the change event (see signals.py); commit it with the row
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+    def compute_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            return None
+        return encode_geohash(self.latitude, self.longitude)
 
     def formatted_address(self):
         parts = [
@@ -77,12 +132,20 @@ class Accommodation(models.Model):
             return False
             
         # 检查是否与现有预定时间段重叠
+        if self._reservations_prefetched():
+            return not any(
+                period.start_date <= end_date and period.end_date >= start_date
+                for period in self.reservation_periods.all()
+            )
         overlapping_reservations = self.reservation_periods.filter(
             models.Q(start_date__lte=end_date) & models.Q(end_date__gte=start_date)
         ).exists()
         
         return not overlapping_reservations
 
+    def _reservations_prefetched(self):
+        return 'reservation_periods' in getattr(self, '_prefetched_objects_cache', {})
+
     def get_available_periods(self):
         """
         获取所有可用的时间段，返回一个时间段列表
@@ -90,40 +153,9 @@ class Accommodation(models.Model):
         """
         if not self.available_from or not self.available_to:
             return []
-            
-        # 设置最小可预订时间（天）
-        MIN_BOOKING_DAYS = 1
-        
-        # 获取所有预定期间，按开始日期排序
-        reserved_periods = list(self.reservation_periods.all().order_by('start_date'))
-        
-        # 如果没有预定，则整个时间段都可用
-        if not reserved_periods:
-            return [(self.available_from, self.available_to)]
-            
-        available_periods = []
-        current_date = self.available_from
-        
-        # 遍历所有预定期间，找出中间的可用时间段
-        for period in reserved_periods:
-            # 如果当前日期小于预定开始日期，则添加可用时间段
-            # 修复：使用预定开始日期减去1天作为可用时间段的结束日期
-            if current_date < period.start_date:
-                end_date = period.start_date - timedelta(days=1)
-                # 检查这个时间段是否至少有MIN_BOOKING_DAYS天
-                days_available = (end_date - current_date).days + 1
-                if days_available >= MIN_BOOKING_DAYS:
-                    available_periods.append((current_date, end_date))
-            # 更新当前日期为预定结束日期加1天
-            current_date = period.end_date + timedelta(days=1)
-            
-        # 检查最后一个预定结束日期到可用结束日期是否还有空闲时间段
-        if current_date <= self.available_to:
-            days_available = (self.available_to - current_date).days + 1
-            if days_available >= MIN_BOOKING_DAYS:
-                available_periods.append((current_date, self.available_to))
-            
-        return available_periods
+        # 获取所有预定期间，按开始日期排序 (Meta.ordering; served from prefetch_related when used)
+        reserved_periods = [(period.start_date, period.end_date) for period in self.reservation_periods.all()]
+        return free_periods(self.available_from, self.available_to, reserved_periods)
 
     def is_reserved(self):
         """Check if the accommodation has been fully booked (there are no available time slots)"""
@@ -136,6 +168,16 @@ class Accommodation(models.Model):
             'floor_number',
             'geo_address',
         )
+        # Chosen from the list_accommodation filters and orders (see the benchmark scenarios)
+        indexes = [
+            models.Index(fields=['type', 'price'], name='accommodation_type_price'),
+            models.Index(fields=['region', 'price'], name='accommodation_region_price'),
+            models.Index(fields=['price'], name='accommodation_price'),
+            models.Index(fields=['rating'], name='accommodation_rating'),
+            models.Index(fields=['available_from', 'available_to'], name='accommodation_availability'),
+            # Covers the map cluster query: prefix range, bounding box, centroid and min price
+            models.Index(fields=['geohash', 'latitude', 'longitude', 'price'], name='accommodation_geohash'),
+        ]
 
 class ReservationPeriod(models.Model):
     """Model to store Users' reservation periods for accommodations"""
@@ -153,9 +195,19 @@ class ReservationPeriod(models.Model):
     
     def __str__(self):
         return f"{self.accommodation.title} - {self.start_date} to {self.end_date} by {self.user_id}"
+
+    def save(self, *args, **kwargs):
+        # post_save queues the webhook outbox rows and change events (see signals.py); commit them together
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
     
     class Meta:
         ordering = ['start_date']
+        indexes = [
+            # A listing's periods in date order, and the overlap checks
+            models.Index(fields=['accommodation', 'start_date'], name='reservation_acc_start'),
+        ]
 
 class AccommodationRating(models.Model):
     accommodation = models.ForeignKey(Accommodation, on_delete=models.CASCADE, related_name='ratings')
@@ -181,6 +233,21 @@ class University(models.Model):
     class Meta:
         verbose_name_plural = "Universities"
 
+class Campus(models.Model):
+    """A campus that distances are measured from, such as HKU_main"""
+    university = models.ForeignKey(University, on_delete=models.SET_NULL, null=True, blank=True, related_name='campuses')
+    code = models.CharField(max_length=50, unique=True, help_text="Campus code used in the campus parameter, such as HKU_main")
+    name = models.CharField(max_length=100)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    def __str__(self):
+        return f"{self.name} ({self.code})"
+
+    class Meta:
+        ordering = ['code']
+        verbose_name_plural = "Campuses"
+
 class AccommodationUniversity(models.Model):
     """Many-to-many relationship between Accommodation and University"""
     accommodation = models.ForeignKey(Accommodation, on_delete=models.CASCADE, related_name='universities')
@@ -190,10 +257,20 @@ class AccommodationUniversity(models.Model):
     class Meta:
         unique_together = ('accommodation', 'university')
         verbose_name_plural = "Accommodation Universities"
+        indexes = [
+            # The specialist scope: a university's accommodations
+            models.Index(fields=['university', 'accommodation'], name='accommodationuni_scope'),
+        ]
     
     def __str__(self):
         return f"{self.accommodation.title} - {self.university.code}"
 
+    def save(self, *args, **kwargs):
+        # post_save records the change event (see signals.py); commit it with the row
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
 class UniversityAPIKey(models.Model):
     """Manage the API keys of the university system"""
     university = models.OneToOneField(University, on_delete=models.CASCADE, related_name='api_key')
@@ -211,5 +288,110 @@ class UniversityAPIKey(models.Model):
             self.key = str(uuid.uuid4()).replace('-', '')
         super().save(*args, **kwargs)
 
+class ChangeEvent(models.Model):
+    """
+    Change log of accommodations, reservations and university affiliations.
+
+    One row is written per affected university so that a university system can
+    fetch only its own changes since a cursor (the event ID).
+    """
+    MODEL_CHOICES = [
+        ('accommodation', 'Accommodation'),
+        ('reservation', 'Reservation'),
+        ('affiliation', 'Accommodation University'),
+    ]
+    ACTION_CHOICES = [
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    ]
+    university = models.ForeignKey(University, on_delete=models.CASCADE, related_name='change_events')
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    accommodation_id = models.BigIntegerField(help_text="Accommodation the changed object belongs to")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set by a trigger on PostgreSQL to the writing transaction; orders the feed there (see change_feed.py)
+    transaction_id = models.BigIntegerField(null=True, blank=True, editable=False)
+
+    def __str__(self):
+        return f"#{self.id} {self.action} {self.model} {self.object_id} ({self.university.code})"
+
+    @classmethod
+    def record(cls, model, action, changes):
+        """
+        Record events in one INSERT.
+
+        Args:
+            model (str): one of MODEL_CHOICES
+            action (str): one of ACTION_CHOICES
+            changes (iterable): (object_id, accommodation_id, university_ids) tuples
+        """
+        cls.objects.bulk_create([
+            cls(university_id=university_id, model=model, object_id=object_id,
+                accommodation_id=accommodation_id, action=action)
+            for object_id, accommodation_id, university_ids in changes
+            for university_id in university_ids
+        ])
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['university', 'id'], name='changeevent_university_cursor'),
+            # The PostgreSQL feed order
+            models.Index(fields=['university', 'transaction_id', 'id'], name='changeevent_feed'),
+        ]
 
+class WebhookEndpoint(models.Model):
+    """A university system URL that receives signed reservation event batches"""
+    university = models.ForeignKey(University, on_delete=models.CASCADE, related_name='webhook_endpoints')
+    url = models.URLField(max_length=500, help_text="URL that receives POSTed event batches")
+    secret = models.CharField(max_length=64, help_text="Shared secret used to sign the payloads (HMAC-SHA256)")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
 
+    def __str__(self):
+        return f"{self.university.code} -> {self.url}"
+
+    def save(self, *args, **kwargs):
+        if not self.secret:
+            import secrets
+            self.secret = secrets.token_hex(32)
+        super().save(*args, **kwargs)
+
+class WebhookDelivery(models.Model):
+    """A pending webhook event; rows are deleted once delivered or moved to the dead-letter table"""
+    EVENT_CHOICES = [
+        ('reservation.created', 'Reservation created'),
+        ('reservation.cancelled', 'Reservation cancelled'),
+    ]
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='deliveries')
+    event_type = models.CharField(max_length=50, choices=EVENT_CHOICES)
+    payload = models.JSONField()
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.event_type} to {self.endpoint.url} (attempts: {self.attempts})"
+
+    class Meta:
+        ordering = ['id']
+        verbose_name_plural = "Webhook deliveries"
+        indexes = [
+            models.Index(fields=['next_attempt_at'], name='webhookdelivery_due'),
+        ]
+
+class WebhookDeadLetter(models.Model):
+    """Webhook events that could not be delivered after the maximum number of attempts"""
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='dead_letters')
+    event_type = models.CharField(max_length=50, choices=WebhookDelivery.EVENT_CHOICES)
+    payload = models.JSONField()
+    attempts = models.IntegerField()
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(help_text="When the event was originally queued")
+    failed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.event_type} to {self.endpoint.url} failed at {self.failed_at}"
@@ -0,0 +1,139 @@
+"""
+Opt-in detector for N+1 query patterns and slow queries.
+
+SQL run inside an inspection is grouped by normalized template. When one
+template runs more than `max_repeats` times, or a single query takes longer
+than `slow_ms`, the problem is logged or raised together with the project
+call site that issued it.
+
+Use it per request through QueryInspectorMiddleware (QUERY_INSPECTOR_ENABLED),
+or in tests as a context manager / decorator:
+
+    @inspect_queries(max_repeats=3)
+    def test_list_is_not_n_plus_one(self):
+        ...
+"""
+import logging
+import re
+import time
+import traceback
+from contextlib import ContextDecorator, ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('accommodation.queries')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(sql):
+    """Reduce a SQL statement to a template: literals and IN lists collapse to placeholders"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+def _call_site():
+    """The innermost frames of the current stack that belong to the project (not Django or libraries)"""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and frame.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames[-5:]))
+
+class QueryProblemError(AssertionError):
+    """Raised by inspect_queries(action='raise') when a query problem is found"""
+
+class inspect_queries(ContextDecorator):
+    """
+    Context manager / decorator that watches every SQL query on all connections.
+
+    Args:
+        max_repeats (int): report templates that run more times than this
+        slow_ms (float): report single queries slower than this
+        action (str): 'raise' to raise QueryProblemError, 'log' to log a warning
+        label (str): included in the report, e.g. the view name
+    """
+    def __init__(self, max_repeats=None, slow_ms=None, action='raise', label=''):
+        self.max_repeats = max_repeats if max_repeats is not None else getattr(settings, 'QUERY_INSPECTOR_MAX_REPEATS', 5)
+        self.slow_ms = slow_ms if slow_ms is not None else getattr(settings, 'QUERY_INSPECTOR_SLOW_MS', 100)
+        self.action = action
+        self.label = label
+
+    def __enter__(self):
+        self.templates = {}
+        self.slow = []
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._execute))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stack.close()
+        if exc_type is None:
+            self.report()
+        return False
+
+    def _execute(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            template = normalize_sql(sql)
+            entry = self.templates.get(template)
+            if entry is None:
+                # Capture the stack only once per template to keep the overhead low
+                self.templates[template] = entry = {'count': 0, 'call_site': _call_site()}
+            entry['count'] += 1
+            if elapsed_ms > self.slow_ms:
+                self.slow.append((elapsed_ms, sql, _call_site()))
+
+    @property
+    def problems(self):
+        """Human-readable descriptions of every repeated template and slow query"""
+        problems = []
+        for template, entry in self.templates.items():
+            if entry['count'] > self.max_repeats:
+                problems.append(
+                    f"Query ran {entry['count']} times (limit {self.max_repeats}):\n  {template}\n"
+                    f"First called from:\n{entry['call_site']}"
+                )
+        for elapsed_ms, sql, call_site in self.slow:
+            problems.append(
+                f"Slow query took {elapsed_ms:.1f} ms (limit {self.slow_ms} ms):\n  {sql}\n"
+                f"Called from:\n{call_site}"
+            )
+        return problems
+
+    def report(self):
+        problems = self.problems
+        if not problems:
+            return
+        message = f"Query problems{f' in {self.label}' if self.label else ''}:\n\n" + "\n\n".join(problems)
+        if self.action == 'raise':
+            raise QueryProblemError(message)
+        logger.warning(message)
+
+class QueryInspectorMiddleware:
+    """
+    Run inspect_queries around every request when QUERY_INSPECTOR_ENABLED is set.
+
+    Meant for development and test settings; QUERY_INSPECTOR_ACTION chooses
+    between logging ('log') and failing the request ('raise').
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTOR_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.action = getattr(settings, 'QUERY_INSPECTOR_ACTION', 'log')
+
+    def __call__(self, request):
+        with inspect_queries(action=self.action, label=f"{request.method} {request.path}"):
+            return self.get_response(request)
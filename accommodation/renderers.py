@@ -0,0 +1,63 @@
+import datetime
+import json
+from django.conf import settings
+from rest_framework.utils import encoders
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional; FastJSONRenderer then behaves exactly like JSONRenderer
+    orjson = None
+
+class ExportRenderer(BaseRenderer):
+    """
+    Base renderer for the streaming export views.
+
+    Successful exports return a StreamingHttpResponse that bypasses the renderer;
+    the renderer only selects the output format (?format=... or Accept header)
+    and encodes error responses.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data).encode(self.charset)
+
+class CSVRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+_drf_encoder = encoders.JSONEncoder()
+
+def _orjson_default(obj):
+    """Everything orjson leaves to us, converted the way DRF's JSONEncoder does (Decimal -> float etc.)"""
+    if type(obj) is datetime.date:
+        return obj.isoformat()
+    return _drf_encoder.default(obj)
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    The output is the same as JSONRenderer's: compact, UTF-8, and Decimal,
+    date, datetime, timedelta, UUID and generator values converted the way
+    DRF's JSONEncoder converts them (datetimes are passed through to it so
+    they keep DRF's millisecond precision and "Z" suffix). Falls back to
+    JSONRenderer when orjson is missing, when indented output is requested,
+    or when FAST_JSON_RENDERER is False.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or not getattr(settings, 'FAST_JSON_RENDERER', True) \
+                or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data, default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
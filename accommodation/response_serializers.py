@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .serializers import AccommodationDetailSerializer
+from .serializers import AccommodationDetailSerializer, ChangeEventSerializer
 
 class MessageResponseSerializer(serializers.Serializer):
     """Serializer for simple message responses"""
@@ -52,6 +52,74 @@ class TemplateResponseSerializer(serializers.Serializer):
     """Empty serializer for views that return template responses"""
     pass
 
+class BulkRatingResponseSerializer(serializers.Serializer):
+    """Serializer for bulk rating import responses"""
+    success = serializers.BooleanField()
+    message = serializers.CharField()
+    created = serializers.IntegerField()
+    duplicates = serializers.IntegerField()
+    errors = serializers.DictField(child=serializers.CharField())
+
+class BulkAccommodationResponseSerializer(serializers.Serializer):
+    """Serializer for bulk accommodation import responses"""
+    success = serializers.BooleanField()
+    message = serializers.CharField()
+    summary = serializers.DictField(child=serializers.IntegerField())
+    results = serializers.ListField(child=serializers.DictField())
+
+class ChangeFeedResponseSerializer(serializers.Serializer):
+    """Serializer for change feed responses"""
+    events = ChangeEventSerializer(many=True)
+    next_cursor = serializers.CharField()
+    has_more = serializers.BooleanField()
+
+class AutocompleteSuggestionSerializer(serializers.Serializer):
+    """A building name, estate name or geo address starting with the typed prefix"""
+    value = serializers.CharField()
+    field = serializers.ChoiceField(choices=['building_name', 'estate_name', 'geo_address'])
+    count = serializers.IntegerField(help_text="Number of accommodations with this value")
+
+class AutocompleteResponseSerializer(serializers.Serializer):
+    """Serializer for autocomplete responses"""
+    query = serializers.CharField()
+    suggestions = AutocompleteSuggestionSerializer(many=True)
+
+class FacetCountSerializer(serializers.Serializer):
+    """One facet value and the number of listings with it"""
+    value = serializers.CharField()
+    count = serializers.IntegerField()
+
+class PriceBandCountSerializer(FacetCountSerializer):
+    """A price band [min, max) in HKD; max is null for the open-ended last band"""
+    min = serializers.IntegerField()
+    max = serializers.IntegerField(allow_null=True)
+
+class FacetsSerializer(serializers.Serializer):
+    type = FacetCountSerializer(many=True)
+    region = FacetCountSerializer(many=True)
+    bedrooms = FacetCountSerializer(many=True)
+    price = PriceBandCountSerializer(many=True)
+
+class FacetsResponseSerializer(serializers.Serializer):
+    """Serializer for facet count responses"""
+    total = serializers.IntegerField(help_text="Listings matching all filters")
+    facets = FacetsSerializer()
+
+class MapClusterSerializer(serializers.Serializer):
+    """A geohash cell with the listings inside it"""
+    geohash = serializers.CharField()
+    count = serializers.IntegerField()
+    latitude = serializers.FloatField(help_text="Centroid latitude")
+    longitude = serializers.FloatField(help_text="Centroid longitude")
+    min_price = serializers.FloatField()
+    id = serializers.IntegerField(allow_null=True, help_text="The listing's id when the cell holds one listing")
+
+class MapClustersResponseSerializer(serializers.Serializer):
+    """Serializer for map cluster responses"""
+    zoom = serializers.IntegerField()
+    precision = serializers.IntegerField(help_text="Geohash length of the cells")
+    clusters = MapClusterSerializer(many=True)
+
 class ApiKeyTestResponseSerializer(serializers.Serializer):
     """Serializer for API key test responses"""
     success = serializers.BooleanField()
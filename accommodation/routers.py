@@ -0,0 +1,94 @@
+"""
+Send the read-only API views to a replica database.
+
+ReplicaRoutingMiddleware marks a request as replica-safe when it is a GET or
+HEAD for one of settings.REPLICA_READ_VIEWS; ReplicaRouter then routes that
+request's reads to the REPLICA_DATABASE alias. Everything else, and every
+write, goes to "default".
+
+Replicas lag behind the primary. After a client sends a write request
+(any method other than GET, HEAD or OPTIONS) it gets a cookie, and for the
+next REPLICA_STICKY_SECONDS its reads stay on the primary, so a client
+that reserves and then opens the detail page sees its own reservation.
+
+Reads made while the primary connection is inside an atomic block stay on the
+primary, so a transaction reads its own writes; this also keeps TestCase,
+which wraps every test in a transaction, on the test database.
+
+Both are switched off when no replica alias is configured.
+"""
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_use_replica = ContextVar('use_replica', default=False)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+def replica_alias():
+    """The configured replica alias, or None when there is no replica"""
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+class ReplicaRouter:
+    """Reads of requests marked by ReplicaRoutingMiddleware go to the replica; all writes go to default"""
+    def db_for_read(self, model, **hints):
+        # Inside a transaction on the primary (an atomic view, or a test case) reads must see its writes
+        if _use_replica.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        if db != DEFAULT_DB_ALIAS and db == replica_alias():
+            return False
+        return None
+
+class ReplicaRoutingMiddleware:
+    """Mark read-only views for the replica, and keep clients on the primary for a while after they write"""
+    def __init__(self, get_response):
+        if replica_alias() is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.read_views = set(getattr(settings, 'REPLICA_READ_VIEWS', ()))
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+        self.cookie_name = getattr(settings, 'REPLICA_STICKY_COOKIE', 'unihaven_primary_until')
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, '_replica_token', None)
+            if token is not None:
+                _use_replica.reset(token)
+        if request.method not in SAFE_METHODS and self.sticky_seconds:
+            until = int(time.time() + self.sticky_seconds)
+            response.set_cookie(self.cookie_name, str(until), max_age=self.sticky_seconds,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (request.method in ('GET', 'HEAD') and match and match.url_name in self.read_views
+                and not self.is_sticky(request)):
+            request._replica_token = _use_replica.set(True)
+        return None
+
+    def is_sticky(self, request):
+        """True while the client's last write is younger than the sticky window"""
+        try:
+            return int(request.COOKIES.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
@@ -0,0 +1,138 @@
+"""
+Full-text search over accommodation titles, descriptions and addresses.
+
+The index is maintained by the database itself (migration 0020): on SQLite an
+FTS5 table "accommodation_search" with external content, on PostgreSQL a
+weighted tsvector column "search_vector" with a GIN index. Triggers on the
+accommodation table keep both in sync, including rows written with raw SQL
+or bulk_create.
+
+Every word of the query must match, as a prefix ("harb" finds "Harbour").
+Results are ranked with BM25 on SQLite and ts_rank on PostgreSQL; matches in
+the title count most, then the building and estate names, then the street
+and district, then the description.
+"""
+import re
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'accommodation_search'
+
+# The same triggers as migration 0020. SQLite drops a table's triggers when a migration rebuilds the
+# table (most AddField/AlterField operations do), so they are restored after every migrate.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS accommodation_search_insert AFTER INSERT ON accommodation_accommodation BEGIN
+        INSERT INTO accommodation_search (rowid, title, description, building_name, estate_name, street_name, district)
+        VALUES (new.id, new.title, new.description, new.building_name, new.estate_name, new.street_name, new.district);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS accommodation_search_delete AFTER DELETE ON accommodation_accommodation BEGIN
+        INSERT INTO accommodation_search (accommodation_search, rowid, title, description, building_name, estate_name, street_name, district)
+        VALUES ('delete', old.id, old.title, old.description, old.building_name, old.estate_name, old.street_name, old.district);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS accommodation_search_update
+    AFTER UPDATE OF title, description, building_name, estate_name, street_name, district ON accommodation_accommodation
+    BEGIN
+        INSERT INTO accommodation_search (accommodation_search, rowid, title, description, building_name, estate_name, street_name, district)
+        VALUES ('delete', old.id, old.title, old.description, old.building_name, old.estate_name, old.street_name, old.district);
+        INSERT INTO accommodation_search (rowid, title, description, building_name, estate_name, street_name, district)
+        VALUES (new.id, new.title, new.description, new.building_name, new.estate_name, new.street_name, new.district);
+    END
+    """,
+]
+
+# Column weights for SQLite's bm25(), in the FTS table's column order:
+# title, description, building_name, estate_name, street_name, district
+BM25_WEIGHTS = (10.0, 1.0, 5.0, 5.0, 2.0, 2.0)
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+def restore_search_triggers(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate receiver: recreate the SQLite triggers if a table rebuild dropped them"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        if cursor.fetchone() is None:
+            return  # migration 0020 has not run (yet)
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'accommodation_accommodation' "
+            "AND name LIKE 'accommodation_search_%'"
+        )
+        if cursor.fetchone()[0] == len(SQLITE_TRIGGERS):
+            return
+        for sql in SQLITE_TRIGGERS:
+            cursor.execute(sql)
+        # Rows written while the triggers were missing
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+def search_terms(query):
+    """Split a user query into plain words; everything else (quotes, operators) is dropped"""
+    return _TERM.findall(query or "")[:20]
+
+def _match_expression(terms, building_terms, vendor):
+    """An FTS5 MATCH string or a to_tsquery() string that requires every term as a prefix"""
+    if vendor == 'postgresql':
+        # Building and estate names have weight B in the tsvector
+        return ' & '.join([f"{term}:*" for term in terms] + [f"{term}:*B" for term in building_terms])
+    parts = [f'"{term}"*' for term in terms]
+    if building_terms:
+        parts.append("{building_name estate_name} : (%s)" % ' '.join(f'"{term}"*' for term in building_terms))
+    return ' '.join(parts)
+
+def search_accommodations(queryset, query="", building_name=""):
+    """
+    Restrict an Accommodation queryset to full-text matches and annotate `search_rank`.
+
+    A higher search_rank is a better match. Order by "-search_rank" for relevance.
+
+    Args:
+        queryset: Accommodation queryset, possibly already filtered
+        query (str): words to find in the title, description or address
+        building_name (str): words to find in the building or estate name
+
+    Returns:
+        QuerySet: the matching rows, or the queryset unchanged when there are no words to search for
+    """
+    terms, building_terms = search_terms(query), search_terms(building_name)
+    if not terms and not building_terms:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    table = queryset.model._meta.db_table
+
+    if vendor not in ('sqlite', 'postgresql'):
+        # No full-text index on this backend: every word must appear somewhere, unranked
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(description__icontains=term) | Q(building_name__icontains=term)
+                | Q(estate_name__icontains=term) | Q(street_name__icontains=term) | Q(district__icontains=term)
+            )
+        for term in building_terms:
+            queryset = queryset.filter(Q(building_name__icontains=term) | Q(estate_name__icontains=term))
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    expression = _match_expression(terms, building_terms, vendor)
+    if vendor == 'postgresql':
+        matches = RawSQL(
+            f"SELECT id FROM {table} WHERE search_vector @@ to_tsquery('simple', %s)", (expression,)
+        )
+        rank = RawSQL(f"ts_rank({table}.search_vector, to_tsquery('simple', %s))", (expression,),
+                      output_field=FloatField())
+    else:
+        matches = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (expression,))
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        # bm25() is lower for better matches; negate it so that higher is better on both backends.
+        # The ranks come from one MATCH, materialized once and looked up by rowid for every row: LIMIT -1
+        # stops SQLite from flattening the subquery into a MATCH per row, which made ranking quadratic
+        rank = RawSQL(
+            f"SELECT ranked.search_rank FROM (SELECT rowid AS id, -bm25({FTS_TABLE}, {weights}) AS search_rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT -1) AS ranked WHERE ranked.id = {table}.id",
+            (expression,), output_field=FloatField()
+        )
+    return queryset.filter(id__in=matches).annotate(search_rank=rank)
@@ -0,0 +1,287 @@
+"""
+Synthetic data for load testing.
+
+generate_load_data() fills the database with universities, accommodations
+clustered around the campuses in the Campus table, university affiliations
+(always including the university that owns the listing's nearest campus),
+ratings and non-overlapping reservation periods. All randomness comes from a
+single seeded random.Random, so the same seed and base date always produce the
+same rows. Work is done in chunks of accommodations, which keeps memory flat.
+Universities and accommodations are written with bulk_create (their IDs are
+needed for the child rows); affiliations, ratings and reservations, which make
+up most of the volume, are written as plain executemany() INSERTs because the
+ORM's per-value preparation would dominate the run time. Neither path sends
+signals, so no change events or webhooks are queued for seeded data; cached
+listing data and the autocomplete index are invalidated once at the end.
+"""
+import random
+from datetime import date
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Accommodation, AccommodationRating, AccommodationUniversity, ReservationPeriod, University
+from .geo import distance_km, encode_geohash
+from .campuses import load_campuses
+from .listing_cache import bump_listing_version
+from . import autocomplete
+
+UNIVERSITY_NAMES = [
+    ("HKU", "The University of Hong Kong"),
+    ("HKUST", "Hong Kong University of Science and Technology"),
+    ("CUHK", "The Chinese University of Hong Kong"),
+    ("PolyU", "The Hong Kong Polytechnic University"),
+    ("CityU", "City University of Hong Kong"),
+    ("HKBU", "Hong Kong Baptist University"),
+    ("LingU", "Lingnan University"),
+    ("EdUHK", "The Education University of Hong Kong"),
+    ("HKMU", "Hong Kong Metropolitan University"),
+    ("HKSYU", "Hong Kong Shue Yan University"),
+]
+
+# (district, region, latitude, longitude); a listing gets the district with the nearest centre
+DISTRICTS = [
+    ("CENTRAL & WESTERN DISTRICT", "HK", 22.2830, 114.1420),
+    ("WAN CHAI DISTRICT", "HK", 22.2760, 114.1820),
+    ("EASTERN DISTRICT", "HK", 22.2840, 114.2240),
+    ("SOUTHERN DISTRICT", "HK", 22.2460, 114.1600),
+    ("YAU TSIM MONG DISTRICT", "KLN", 22.3110, 114.1710),
+    ("SHAM SHUI PO DISTRICT", "KLN", 22.3300, 114.1620),
+    ("KOWLOON CITY DISTRICT", "KLN", 22.3280, 114.1910),
+    ("WONG TAI SIN DISTRICT", "KLN", 22.3420, 114.1950),
+    ("KWUN TONG DISTRICT", "KLN", 22.3130, 114.2250),
+    ("KWAI TSING DISTRICT", "NT", 22.3550, 114.1080),
+    ("TSUEN WAN DISTRICT", "NT", 22.3710, 114.1140),
+    ("TUEN MUN DISTRICT", "NT", 22.3910, 113.9770),
+    ("YUEN LONG DISTRICT", "NT", 22.4450, 114.0220),
+    ("NORTH DISTRICT", "NT", 22.4940, 114.1380),
+    ("TAI PO DISTRICT", "NT", 22.4500, 114.1650),
+    ("SHA TIN DISTRICT", "NT", 22.3830, 114.1880),
+    ("SAI KUNG DISTRICT", "NT", 22.3810, 114.2700),
+    ("ISLANDS DISTRICT", "NT", 22.2610, 113.9460),
+]
+
+BUILDING_PREFIXES = ["Harbour", "Peak", "Garden", "Ocean", "Golden", "Jade", "Sun", "Park", "Hill", "Lake",
+                     "Pearl", "Royal", "Grand", "Silver", "Bay", "Cedar", "Maple", "Lotus", "Star", "Kingsway"]
+BUILDING_SUFFIXES = ["Court", "Mansion", "Tower", "Building", "House", "Heights", "Gardens", "Plaza", "Centre", "Villa"]
+STREET_SUFFIXES = ["ROAD", "STREET", "AVENUE", "PATH", "LANE", "TERRACE"]
+TYPES = [choice[0] for choice in Accommodation.TYPE_CHOICES]
+TYPE_WEIGHTS = [6, 2, 2]
+RATING_WEIGHTS = [1, 2, 5, 15, 35, 42]  # rating values 0..5, skewed towards good reviews
+FLATS = "ABCDEFGH"
+
+def _nearest_district(latitude, longitude):
+    return min(DISTRICTS, key=lambda d: (d[2] - latitude) ** 2 + (d[3] - longitude) ** 2)
+
+def _randint(rng, a, b):
+    """rng.randint(a, b) without its argument checks; it is called millions of times"""
+    return a + int(rng.random() * (b - a + 1))
+
+def _count(rng, mean):
+    """A skewed (exponential) non-negative count with the given mean: a few popular listings, a long tail"""
+    if mean <= 0:
+        return 0
+    return int(rng.expovariate(1 / mean) + 0.5)
+
+def seed_universities(count):
+    """Create (or reuse) `count` universities: the real HK institutions first, then synthetic ones"""
+    rows = list(UNIVERSITY_NAMES[:count])
+    for n in range(len(rows), count):
+        rows.append((f"U{n:04d}", f"Synthetic University {n}"))
+    University.objects.bulk_create([
+        University(code=code, name=name, specialist_email=f"housing@{code.lower()}.edu.hk")
+        for code, name in rows
+    ], ignore_conflicts=True)
+    by_code = {u.code: u for u in University.objects.filter(code__in=[code for code, _ in rows])}
+    return [by_code[code] for code, _ in rows]
+
+def _reservation_periods(rng, available_from, available_to, count):
+    """Up to `count` back-to-back, non-overlapping stays inside [available_from, available_to] (ordinals)"""
+    periods = []
+    cursor = available_from + _randint(rng, 0, 14)
+    for _ in range(count):
+        end = cursor + _randint(rng, 3, 30) - 1
+        if end > available_to:
+            break
+        periods.append((cursor, end))
+        cursor = end + 1 + _randint(rng, 0, 10)
+    return periods
+
+def _insert_rows(model, field_names, rows, batch_size=5000):
+    """INSERT plain value tuples into the model's table with executemany()"""
+    columns = ", ".join(connection.ops.quote_name(model._meta.get_field(name).column) for name in field_names)
+    sql = (f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) "
+           f"VALUES ({', '.join(['%s'] * len(field_names))})")
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
+
+def generate_load_data(universities=10, accommodations=10000, reservations=100000, ratings=30000,
+                       seed=0, base_date=None, chunk_size=10000, stdout=None):
+    """
+    Generate a reproducible synthetic dataset.
+
+    Args:
+        universities (int): number of universities
+        accommodations (int): number of accommodations
+        reservations (int): target number of reservation periods
+        ratings (int): target number of ratings
+        seed (int): random seed; also part of every generated geo_address
+        base_date (date): availability windows are placed around this date (default today)
+        chunk_size (int): accommodations generated and written per round
+        stdout: optional stream for progress messages
+
+    Returns:
+        dict: counts of the rows created per model
+    """
+    rng = random.Random(seed)
+    base = (base_date or date.today()).toordinal()
+    campuses = list(load_campuses().values())
+    if not campuses:
+        raise ValueError("No campuses to place accommodations around; run migrate first")
+    reservations_per_listing = reservations / accommodations if accommodations else 0
+    ratings_per_listing = ratings / accommodations if accommodations else 0
+    created = {'universities': 0, 'accommodations': 0, 'affiliations': 0, 'ratings': 0, 'reservations': 0}
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    date_values = {}  # ordinal -> database value; reservations reuse a few thousand distinct dates
+
+    def db_date(ordinal):
+        value = date_values.get(ordinal)
+        if value is None:
+            value = date_values[ordinal] = connection.ops.adapt_datefield_value(date.fromordinal(ordinal))
+        return value
+
+    with transaction.atomic():
+        university_objs = seed_universities(universities)
+        created['universities'] = len(university_objs)
+        # Campuses of universities that were not seeded fall back to one picked by campus position
+        campus_universities = [
+            next((u for u in university_objs if u.code == campus["university"]), university_objs[n % len(university_objs)])
+            for n, campus in enumerate(campuses)
+        ]
+
+        building = None
+        units_left = 0
+        building_index = 0
+        for start in range(0, accommodations, chunk_size):
+            listing_objs, listing_ratings, listing_windows, listing_universities = [], [], [], []
+            for _ in range(min(chunk_size, accommodations - start)):
+                if units_left == 0:
+                    # Listings come in buildings of 1-24 flats that share an address
+                    campus = campuses[rng.randrange(len(campuses))]
+                    latitude = round(rng.gauss(campus["latitude"], 0.012), 5)
+                    longitude = round(rng.gauss(campus["longitude"], 0.012), 5)
+                    district, region, _, _ = _nearest_district(latitude, longitude)
+                    # The scatter can leave a building closer to another campus than the one it was placed around
+                    nearest_campus = min(range(len(campuses)), key=lambda n: distance_km(
+                        latitude, longitude, campuses[n]["latitude"], campuses[n]["longitude"]))
+                    building = {
+                        'index': building_index,
+                        'university': campus_universities[nearest_campus],
+                        'latitude': latitude,
+                        'longitude': longitude,
+                        'district': district,
+                        'region': region,
+                        'building_name': f"{rng.choice(BUILDING_PREFIXES)} {rng.choice(BUILDING_SUFFIXES)}".upper(),
+                        'estate_name': f"{rng.choice(BUILDING_PREFIXES)} ESTATE".upper() if rng.random() < 0.3 else "",
+                        'street_name': f"{rng.choice(BUILDING_PREFIXES).upper()} {rng.choice(STREET_SUFFIXES)}",
+                        'building_no': str(rng.randint(1, 300)),
+                        'geo_address': f"{building_index:010d}S{seed}",
+                        'geohash': encode_geohash(latitude, longitude),
+                        'units': 0,
+                    }
+                    building_index += 1
+                    units_left = rng.randint(1, 24)
+                unit = building['units']
+                building['units'] += 1
+                units_left -= 1
+
+                accommodation_type = rng.choices(TYPES, TYPE_WEIGHTS)[0]
+                bedrooms = rng.choices([1, 2, 3, 4], [40, 35, 20, 5])[0]
+                # Popular listings get a longer availability window so their stays fit
+                stays = _count(rng, reservations_per_listing)
+                available_from = base + rng.randint(-90, 60)
+                available_to = available_from + max(rng.randint(120, 540), stays * 31 + 14)
+                rating_values = rng.choices(range(6), RATING_WEIGHTS, k=_count(rng, ratings_per_listing))
+                rating_sum = sum(rating_values)
+
+                listing_objs.append(Accommodation(
+                    title=f"{building['building_name'].title()} {unit // len(FLATS) + 1}{FLATS[unit % len(FLATS)]}",
+                    description=f"{bedrooms}-bedroom {accommodation_type.lower()} in {building['district'].title()}.",
+                    type=accommodation_type,
+                    beds=bedrooms + rng.randint(0, 2),
+                    bedrooms=bedrooms,
+                    price=rng.randint(20, 60) * 100 * bedrooms,
+                    available_from=date.fromordinal(available_from),
+                    available_to=date.fromordinal(available_to),
+                    contact_name=f"Owner {rng.randint(1, 99999)}",
+                    contact_phone=f"{rng.choice('569')}{rng.randint(0, 9999999):07d}",
+                    contact_email=f"owner{rng.randint(1, 99999)}@example.com",
+                    building_name=building['building_name'],
+                    estate_name=building['estate_name'],
+                    street_name=building['street_name'],
+                    building_no=building['building_no'],
+                    district=building['district'],
+                    region=building['region'],
+                    latitude=building['latitude'],
+                    longitude=building['longitude'],
+                    geo_address=building['geo_address'],
+                    geohash=building['geohash'],
+                    room_number="",
+                    floor_number=str(unit // len(FLATS) + 1),
+                    flat_number=FLATS[unit % len(FLATS)],
+                    rating=round(rating_sum / len(rating_values), 1) if rating_values else 0.0,
+                    rating_sum=rating_sum,
+                    rating_count=len(rating_values),
+                ))
+                listing_ratings.append(rating_values)
+                listing_windows.append((available_from, available_to, stays))
+
+                # The university owning the nearest campus first, plus occasional extra affiliations
+                primary = building['university']
+                affiliated = {primary.id}
+                while rng.random() < 0.25 and len(affiliated) < len(university_objs):
+                    affiliated.add(rng.choice(university_objs).id)
+                listing_universities.append(sorted(affiliated))
+
+            Accommodation.objects.bulk_create(listing_objs)
+
+            affiliation_rows = [
+                (accommodation.id, university_id, now)
+                for accommodation, university_ids in zip(listing_objs, listing_universities)
+                for university_id in university_ids
+            ]
+            _insert_rows(AccommodationUniversity, ['accommodation', 'university', 'date_added'], affiliation_rows)
+            rating_rows = [
+                (accommodation.id, f"user{n:06d}", value, now)
+                for accommodation, values in zip(listing_objs, listing_ratings)
+                for n, value in enumerate(values)
+            ]
+            _insert_rows(AccommodationRating, ['accommodation', 'user_identifier', 'rating', 'created_at'], rating_rows)
+
+            reservation_rows = []
+            for accommodation, (available_from, available_to, stays) in zip(listing_objs, listing_windows):
+                for period_start, period_end in _reservation_periods(rng, available_from, available_to, stays):
+                    reservation_rows.append((
+                        accommodation.id,
+                        f"{_randint(rng, 0, 99999999):08d}",
+                        f"{'569'[_randint(rng, 0, 2)]}{_randint(rng, 0, 9999999):07d}",
+                        db_date(period_start),
+                        db_date(period_end),
+                        now,
+                        rng.random() < 0.6,
+                    ))
+            _insert_rows(ReservationPeriod, ['accommodation', 'user_id', 'contact_number', 'start_date',
+                                             'end_date', 'created_at', 'contract_status'], reservation_rows)
+
+            created['accommodations'] += len(listing_objs)
+            created['affiliations'] += len(affiliation_rows)
+            created['ratings'] += len(rating_rows)
+            created['reservations'] += len(reservation_rows)
+            if stdout is not None:
+                stdout.write(f"{created['accommodations']}/{accommodations} accommodations, "
+                             f"{created['reservations']} reservations")
+
+    bump_listing_version()
+    transaction.on_commit(autocomplete.index.invalidate)
+    return created
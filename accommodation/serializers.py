@@ -2,7 +2,16 @@ from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from drf_spectacular.types import OpenApiTypes
 from typing import List, Dict, Any
-from .models import Accommodation, AccommodationRating
+from .models import Accommodation, AccommodationRating, ChangeEvent, WebhookEndpoint
+from .fieldsets import columns_for
+
+class SparseFieldsMixin:
+    """Serializer mixin: fields=[...] keeps only those of the serializer's fields (see fieldsets.py)"""
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
 class AddAccommodationSerializer(serializers.ModelSerializer):
     """Serializer specifically for creating new accommodation"""
@@ -91,8 +100,28 @@ class AccommodationSerializer(serializers.ModelSerializer):
         }
         return representation
 
-class AccommodationDetailSerializer(serializers.ModelSerializer):
-    """Serializer for accommodation detail view"""
+class AccommodationDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for accommodation detail view.
+
+    Reservation periods, free periods and the reserved flag all come from one
+    list of reservations. Pass a queryset through prefetch() (or call
+    prefetch_related_objects() with PREFETCH on an instance) and any number of
+    accommodations serialize in a constant number of queries.
+    """
+    PREFETCH = ('affiliated_universities', 'reservation_periods')
+    # Computed fields and the columns and related rows they read (see fieldsets.py)
+    SOURCES = {
+        'formatted_address': ('building_name', 'estate_name', 'building_no', 'street_name', 'district', 'region'),
+        'reserved': ('available_from', 'available_to'),
+        'available_periods': ('available_from', 'available_to'),
+    }
+    RELATED = {
+        'university_codes': 'affiliated_universities',
+        'reservation_periods': 'reservation_periods',
+        'reserved': 'reservation_periods',
+        'available_periods': 'reservation_periods',
+    }
     formatted_address = serializers.CharField(read_only=True)
     university_codes = serializers.SerializerMethodField()
     reservation_periods = serializers.SerializerMethodField()  # 修改为SerializerMethodField
@@ -106,11 +135,26 @@ class AccommodationDetailSerializer(serializers.ModelSerializer):
                   'formatted_address', 'rating', 'reserved',
                    'region', 'university_codes',
                   'reservation_periods', 'available_periods']
+
+    @classmethod
+    def prefetch(cls, queryset, fields=None):
+        """The queryset with the related rows this serializer reads; with `fields`, only what those fields read"""
+        if fields is None:
+            return queryset.prefetch_related(*cls.PREFETCH)
+        related = [lookup for lookup in cls.PREFETCH if any(cls.RELATED.get(name) == lookup for name in fields)]
+        return queryset.only(*columns_for(cls.Meta.model, fields, cls.SOURCES)).prefetch_related(*related)
+
+    def _available_periods(self, obj):
+        # Shared by reserved and available_periods; the fields of one object are serialized in a row
+        cached = getattr(self, '_periods_cache', None)
+        if cached is None or cached[0] is not obj:
+            cached = self._periods_cache = (obj, obj.get_available_periods())
+        return cached[1]
     
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_reserved(self, obj):
         """Check whether the accommodation has been booked"""
-        return obj.is_reserved()
+        return not self._available_periods(obj)
         
     @extend_schema_field(serializers.ListField(child=serializers.CharField()))
     def get_university_codes(self, obj):
@@ -133,18 +177,20 @@ class AccommodationDetailSerializer(serializers.ModelSerializer):
     @extend_schema_field(OpenApiTypes.OBJECT)
     def get_available_periods(self, obj) -> List[Dict[str, Any]]:
         """Obtain the available time period"""
-        periods = obj.get_available_periods()
+        periods = self._available_periods(obj)
         return [{'start_date': start_date, 'end_date': end_date} for start_date, end_date in periods]
 
-class AccommodationListSerializer(serializers.ModelSerializer):
+class AccommodationListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for listing accommodations"""
+    # Computed fields and the columns they read (see fieldsets.py)
+    SOURCES = {'reserved': ('available_from', 'available_to')}
     distance = serializers.FloatField(read_only=True)
     reserved = serializers.SerializerMethodField()
     
     class Meta:
         model = Accommodation
         fields = ['id', 'title', 'building_name', 'description', 'type', 'price', 'beds', 'bedrooms',
-                 'available_from', 'available_to', 'region', 'distance', 'reserved', 
+                 'available_from', 'available_to', 'region', 'latitude', 'longitude', 'distance', 'reserved', 
                  'room_number', 'floor_number', 'flat_number', 'contact_name',
                  'contact_phone', 'contact_email','rating', 'rating_count', 'rating_sum']
     
@@ -155,3 +201,46 @@ class AccommodationListSerializer(serializers.ModelSerializer):
 class RatingSerializer(serializers.Serializer):
     """Serializer for validating accommodation rating input"""
     rating = serializers.IntegerField(min_value=0, max_value=5)
+
+class BulkRatingItemSerializer(serializers.Serializer):
+    """Serializer for a single row of a bulk rating import"""
+    accommodation_id = serializers.IntegerField()
+    userid = serializers.CharField(max_length=200, source='user_identifier')
+    rating = serializers.IntegerField(min_value=0, max_value=5)
+
+class BulkRatingSerializer(serializers.Serializer):
+    """Serializer for validating a bulk rating import in one pass"""
+    ratings = BulkRatingItemSerializer(many=True, allow_empty=False)
+
+class BulkAccommodationSerializer(serializers.Serializer):
+    """Serializer for a bulk accommodation import; each row is validated with AddAccommodationSerializer"""
+    accommodations = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        help_text="List of AddAccommodationSerializer payloads"
+    )
+
+class ChangeEventSerializer(serializers.ModelSerializer):
+    """Serializer for change feed events"""
+    class Meta:
+        model = ChangeEvent
+        fields = ['id', 'model', 'action', 'object_id', 'accommodation_id', 'created_at']
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    """Serializer for listing reservation webhooks; the secret is masked except for its last 4 characters"""
+    reveal_secret = False
+
+    class Meta:
+        model = WebhookEndpoint
+        fields = ['id', 'url', 'secret', 'is_active', 'created_at']
+        read_only_fields = ['id', 'secret', 'created_at']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if not self.reveal_secret and data.get('secret'):
+            data['secret'] = '*' * 8 + data['secret'][-4:]
+        return data
+
+class WebhookEndpointCreateSerializer(WebhookEndpointSerializer):
+    """Serializer for registering a reservation webhook; the response is the only one with the full secret"""
+    reveal_secret = True
@@ -0,0 +1,91 @@
+"""
+Signal receivers that populate the ChangeEvent log used by the /changes/ feed
+and queue reservation webhooks.
+
+Events are fanned out to every university affiliated with the accommodation at
+the time of the change. They are written in the same transaction as the change:
+the save() of Accommodation, ReservationPeriod and AccommodationUniversity runs
+in transaction.atomic(), deletes and affiliated_universities.add() are atomic
+in Django, and the rating views wrap their updates in atomic blocks. Bulk operations (bulk_create, QuerySet.update) do not
+send signals; code using them records its events with ChangeEvent.record().
+"""
+from django.db.models.signals import post_save, pre_delete, m2m_changed
+from django.dispatch import receiver
+from .models import Accommodation, AccommodationUniversity, ChangeEvent, ReservationPeriod
+from .webhooks import enqueue_reservation_event
+from .listing_cache import bump_listing_version
+
+def _university_ids(accommodation_id):
+    return list(
+        AccommodationUniversity.objects
+        .filter(accommodation_id=accommodation_id)
+        .values_list('university_id', flat=True)
+    )
+
+def record_accommodation_updates(accommodation_ids):
+    """Record 'update' events for accommodations changed with QuerySet.update()"""
+    bump_listing_version()
+    universities = {}
+    for accommodation_id, university_id in (
+        AccommodationUniversity.objects
+        .filter(accommodation_id__in=list(accommodation_ids))
+        .values_list('accommodation_id', 'university_id')
+    ):
+        universities.setdefault(accommodation_id, []).append(university_id)
+    ChangeEvent.record('accommodation', 'update', [
+        (accommodation_id, accommodation_id, university_ids)
+        for accommodation_id, university_ids in universities.items()
+    ])
+
+@receiver(post_save, sender=Accommodation)
+def accommodation_saved(sender, instance, created, **kwargs):
+    ChangeEvent.record('accommodation', 'create' if created else 'update',
+                       [(instance.pk, instance.pk, _university_ids(instance.pk))])
+
+# pre_delete: for cascades Django sends every pre_delete before deleting any row,
+# so the affiliations needed for the fan-out still exist here
+@receiver(pre_delete, sender=Accommodation)
+def accommodation_deleted(sender, instance, **kwargs):
+    ChangeEvent.record('accommodation', 'delete',
+                       [(instance.pk, instance.pk, _university_ids(instance.pk))])
+
+@receiver(post_save, sender=ReservationPeriod)
+def reservation_saved(sender, instance, created, **kwargs):
+    ChangeEvent.record('reservation', 'create' if created else 'update',
+                       [(instance.pk, instance.accommodation_id, _university_ids(instance.accommodation_id))])
+    if created:
+        enqueue_reservation_event(instance, 'reservation.created')
+
+@receiver(pre_delete, sender=ReservationPeriod)
+def reservation_deleted(sender, instance, **kwargs):
+    ChangeEvent.record('reservation', 'delete',
+                       [(instance.pk, instance.accommodation_id, _university_ids(instance.accommodation_id))])
+    enqueue_reservation_event(instance, 'reservation.cancelled')
+
+@receiver(post_save, sender=AccommodationUniversity)
+def affiliation_saved(sender, instance, created, **kwargs):
+    ChangeEvent.record('affiliation', 'create' if created else 'update',
+                       [(instance.pk, instance.accommodation_id, [instance.university_id])])
+
+@receiver(pre_delete, sender=AccommodationUniversity)
+def affiliation_deleted(sender, instance, **kwargs):
+    ChangeEvent.record('affiliation', 'delete',
+                       [(instance.pk, instance.accommodation_id, [instance.university_id])])
+
+@receiver(m2m_changed, sender=AccommodationUniversity)
+def affiliations_added(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    affiliated_universities.add() inserts the through rows with bulk_create, so
+    post_save is not sent for them. remove() and clear() delete through a
+    queryset and are already covered by pre_delete.
+    """
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        links = AccommodationUniversity.objects.filter(university=instance, accommodation_id__in=pk_set)
+    else:
+        links = AccommodationUniversity.objects.filter(accommodation=instance, university_id__in=pk_set)
+    ChangeEvent.record('affiliation', 'create', [
+        (link_id, accommodation_id, [university_id])
+        for link_id, accommodation_id, university_id in links.values_list('id', 'accommodation_id', 'university_id')
+    ])
@@ -1,4 +1,16 @@
-from .models import University, Accommodation
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, router, transaction
+from django.db.models import Avg, Count, DecimalField, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, Round
+from .models import University, Accommodation, AccommodationRating, AccommodationUniversity, ChangeEvent
+from .serializers import AddAccommodationSerializer
+from .signals import record_accommodation_updates
+from .listing_cache import bump_listing_version
+from .autocomplete import index_on_commit
 
 def get_university_from_user_id(user_id):
     """
@@ -27,6 +39,24 @@ def get_university_from_user_id(user_id):
     except University.DoesNotExist:
         return None
 
+def reset_id_sequence(model, using=DEFAULT_DB_ALIAS):
+    """
+    Restart the primary key sequence of an emptied table at 1, on any database backend.
+
+    Args:
+        model: the model whose table has just been emptied
+        using (str): database alias
+    """
+    connection = connections[using]
+    # PostgreSQL (and Oracle) reset the sequence to the table's current maximum id
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    if not statements:
+        # SQLite and MySQL reset the counter as part of flushing the (already empty) table
+        statements = connection.ops.sql_flush(no_style(), [model._meta.db_table], reset_sequences=True)
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
 def debug_accommodation_dates():
     """
     Debug function to check accommodation dates and availability.
@@ -36,7 +66,7 @@ def debug_accommodation_dates():
     """
     date_info = []
     
-    for acc in Accommodation.objects.all():
+    for acc in Accommodation.objects.prefetch_related('reservation_periods'):
         date_info.append({
             'id': acc.id,
             'title': acc.title,
@@ -45,4 +75,319 @@ def debug_accommodation_dates():
             'is_reserved': acc.is_reserved()  # 使用新的is_reserved方法
         })
     
-    return date_info
\ No newline at end of file
+    return date_info
+
+def recompute_rating_aggregates(accommodation_ids=None):
+    """
+    Recompute rating, rating_sum and rating_count from the stored ratings.
+
+    Uses a single UPDATE with grouped aggregate subqueries, so the cost does not
+    depend on how many ratings were added.
+
+    Args:
+        accommodation_ids (iterable): IDs to recompute, or None for every accommodation
+
+    Returns:
+        int: number of accommodations updated
+    """
+    ratings = (
+        AccommodationRating.objects
+        .filter(accommodation=OuterRef('pk'))
+        .order_by()
+        .values('accommodation')
+    )
+    rating_sum = Subquery(ratings.annotate(total=Sum('rating')).values('total'))
+    rating_count = Subquery(ratings.annotate(total=Count('pk')).values('total'))
+    # Cast to NUMERIC before rounding: PostgreSQL has no ROUND(double precision, int)
+    rating = Subquery(ratings.annotate(
+        average=Round(Cast(Avg('rating'), DecimalField(max_digits=10, decimal_places=6)), 1)
+    ).values('average'))
+
+    accommodations = Accommodation.objects.all()
+    if accommodation_ids is not None:
+        accommodations = accommodations.filter(pk__in=list(accommodation_ids))
+    return accommodations.update(
+        rating_sum=Coalesce(Cast(rating_sum, FloatField()), 0.0),
+        rating_count=Coalesce(rating_count, 0),
+        rating=Coalesce(Cast(rating, FloatField()), 0.0),
+    )
+
+class InsertedRows:
+    """connection.execute_wrapper() hook adding up the rows written by INSERT statements"""
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if sql.lstrip()[:6].upper() == 'INSERT':
+            # INSERT ... ON CONFLICT DO NOTHING / INSERT OR IGNORE report only the rows they wrote
+            self.count += max(context['cursor'].rowcount, 0)
+        return result
+
+def bulk_import_ratings(rows, university=None, batch_size=1000):
+    """
+    Insert many ratings at once and refresh the affected aggregates.
+
+    Duplicates on (accommodation, user_identifier), whether already stored,
+    repeated within the batch or inserted concurrently (via /rate/) while the
+    batch is written, are skipped rather than treated as errors. `created`
+    counts the rows the INSERT statements actually wrote.
+
+    Args:
+        rows (list): dicts with accommodation_id, user_identifier and rating (already validated)
+        university (University): if given, only accommodations affiliated with it may be rated
+        batch_size (int): rows per INSERT statement
+
+    Returns:
+        dict: counts of created and duplicate rows, plus errors keyed by row index
+    """
+    errors = {}
+    accommodation_ids = {row['accommodation_id'] for row in rows}
+    known = Accommodation.objects.filter(pk__in=accommodation_ids)
+    if university is not None:
+        known = known.filter(affiliated_universities=university)
+    known_ids = set(known.values_list('pk', flat=True))
+
+    existing = set(
+        AccommodationRating.objects
+        .filter(accommodation_id__in=known_ids,
+                user_identifier__in={row['user_identifier'] for row in rows})
+        .values_list('accommodation_id', 'user_identifier')
+    )
+
+    new_ratings = []
+    duplicates = 0
+    for index, row in enumerate(rows):
+        key = (row['accommodation_id'], row['user_identifier'])
+        if row['accommodation_id'] not in known_ids:
+            errors[index] = "Accommodation not found."
+            continue
+        if key in existing:
+            duplicates += 1
+            continue
+        existing.add(key)
+        new_ratings.append(AccommodationRating(
+            accommodation_id=row['accommodation_id'],
+            user_identifier=row['user_identifier'],
+            rating=row['rating'],
+        ))
+
+    inserted = InsertedRows()
+    using = router.db_for_write(AccommodationRating)
+    with transaction.atomic(using=using):
+        # ignore_conflicts also covers ratings that arrive concurrently via /rate/;
+        # the rows it drops are missing from inserted.count
+        with connections[using].execute_wrapper(inserted):
+            AccommodationRating.objects.bulk_create(new_ratings, batch_size=batch_size, ignore_conflicts=True)
+        affected_ids = {rating.accommodation_id for rating in new_ratings}
+        recompute_rating_aggregates(affected_ids)
+        record_accommodation_updates(affected_ids)
+
+    return {
+        'created': inserted.count,
+        'duplicates': duplicates + len(new_ratings) - inserted.count,
+        'errors': errors,
+    }
+
+ALS_LOOKUP_URL = "https://www.als.gov.hk/lookup"
+
+def geocode_address(address, timeout=10):
+    """
+    Look up an address with the Hong Kong government Address Lookup Service (ALS).
+
+    Args:
+        address (str): free-text address or building name
+
+    Returns:
+        dict: Accommodation address fields (latitude, longitude, geo_address, building_name, ...),
+              or None if ALS has no match
+
+    Raises:
+        requests.RequestException: if the ALS request fails
+    """
+    response = requests.get(
+        ALS_LOOKUP_URL,
+        params={"q": address, "n": 1},
+        headers={"Accept": "application/json"},
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    data = response.json()
+    if not data or not data.get('SuggestedAddress'):
+        return None
+    result = data['SuggestedAddress'][0]['Address']['PremisesAddress']
+    geospatial_info = result.get("GeospatialInformation", {})
+    eng_address = result.get("EngPremisesAddress", {})
+    return {
+        'latitude': float(geospatial_info.get("Latitude", 0.0)),
+        'longitude': float(geospatial_info.get("Longitude", 0.0)),
+        'geo_address': result.get("GeoAddress", ""),
+        'building_name': eng_address.get("BuildingName", ""),
+        'estate_name': eng_address.get("EngEstate", {}).get("EstateName", ""),
+        'street_name': eng_address.get("EngStreet", {}).get("StreetName", ""),
+        'building_no': eng_address.get("EngStreet", {}).get("BuildingNoFrom", ""),
+        'district': eng_address.get("EngDistrict", {}).get("DcDistrict", ""),
+        'region': eng_address.get("Region", ""),
+    }
+
+def geocode_addresses(addresses, max_workers=8):
+    """
+    Geocode many addresses concurrently, looking each distinct address up only once.
+
+    Returns:
+        dict: address -> geocode_address() result, or the exception raised for that address
+    """
+    def lookup(address):
+        try:
+            return geocode_address(address)
+        except (requests.RequestException, ValueError, KeyError) as e:
+            return e
+
+    unique_addresses = list(dict.fromkeys(addresses))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(unique_addresses, pool.map(lookup, unique_addresses)))
+
+def _write_accommodation_batch(university, to_create, to_link, batch_size):
+    """Create to_create and link it and to_link to university in one transaction (see bulk_import_accommodations)"""
+    with transaction.atomic():
+        Accommodation.objects.bulk_create(to_create.values(), batch_size=batch_size)
+        AccommodationUniversity.objects.bulk_create(
+            [AccommodationUniversity(accommodation=accommodation, university=university)
+             for accommodation in list(to_create.values()) + list(to_link.values())],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        # bulk_create sends no signals: drop the cached listing data, add the new names to the
+        # autocomplete index and record the new affiliations for the change feed
+        bump_listing_version()
+        index_on_commit(to_create.values())
+        ChangeEvent.record('affiliation', 'create', [
+            (link_id, accommodation_id, [university.id])
+            for link_id, accommodation_id in AccommodationUniversity.objects.filter(
+                university=university,
+                accommodation_id__in=[a.id for a in list(to_create.values()) + list(to_link.values())],
+            ).values_list('id', 'accommodation_id')
+        ])
+
+def bulk_import_accommodations(rows, university, batch_size=500, max_workers=8):
+    """
+    Import many accommodations for a university at once.
+
+    Mirrors add_accommodation for each row: an accommodation whose
+    (room_number, flat_number, floor_number, geo_address) key already exists is
+    linked to the university instead of being created again.
+
+    Args:
+        rows (list): raw AddAccommodationSerializer payloads
+        university (University): the university importing the listings
+
+    The batch is written in one transaction. If it hits an IntegrityError, such as
+    a listing with the same key created concurrently, the rows are written one
+    at a time instead and only the failing ones get status 'failed'.
+
+    Returns:
+        list: one result dict per row, indexed by row, with 'row', 'status' and 'id', 'message' or 'errors'
+    """
+    results = [None] * len(rows)
+    validated = {}
+    for index, row in enumerate(rows):
+        serializer = AddAccommodationSerializer(data=row)
+        if serializer.is_valid():
+            validated[index] = serializer.validated_data
+        else:
+            results[index] = {'row': index, 'status': 'invalid', 'errors': serializer.errors}
+
+    geocoded = geocode_addresses(
+        [data['building_name'] for data in validated.values()], max_workers=max_workers
+    )
+
+    candidates = {}
+    for index, data in validated.items():
+        address = geocoded[data['building_name']]
+        if isinstance(address, Exception):
+            results[index] = {'row': index, 'status': 'geocode_failed', 'message': f"Error fetching geolocation: {address}"}
+            continue
+        if address is None:
+            results[index] = {'row': index, 'status': 'geocode_failed',
+                              'message': "Could not geocode the provided address. Please provide a valid Hong Kong address."}
+            continue
+        fields = {**data, **address}
+        # bulk_create bypasses Accommodation.save(), so normalise the unique key here
+        for field in ('room_number', 'floor_number', 'flat_number', 'geo_address'):
+            fields[field] = fields.get(field) or ""
+        candidates[index] = Accommodation(**fields)
+        candidates[index].geohash = candidates[index].compute_geohash()
+
+    def unique_key(accommodation):
+        return (accommodation.room_number, accommodation.flat_number,
+                accommodation.floor_number, accommodation.geo_address)
+
+    # One query for every potential duplicate of the batch
+    existing = {
+        unique_key(accommodation): accommodation
+        for accommodation in Accommodation.objects.filter(
+            geo_address__in={candidate.geo_address for candidate in candidates.values()}
+        ).only('id', 'title', 'room_number', 'flat_number', 'floor_number', 'geo_address')
+    }
+    already_linked = set(
+        AccommodationUniversity.objects
+        .filter(university=university, accommodation__in=existing.values())
+        .values_list('accommodation_id', flat=True)
+    )
+
+    to_create = {}
+    to_link = {}
+    seen = {}
+    for index, candidate in candidates.items():
+        key = unique_key(candidate)
+        if key in seen:
+            results[index] = {'row': index, 'status': 'duplicate',
+                              'message': f"Same accommodation as row {seen[key]}"}
+            continue
+        seen[key] = index
+        match = existing.get(key)
+        if match is None:
+            to_create[index] = candidate
+        elif match.id in already_linked:
+            results[index] = {'row': index, 'status': 'already_associated', 'id': match.id,
+                              'message': f"{university.name} is already associated with this accommodation"}
+        else:
+            to_link[index] = match
+
+    try:
+        _write_accommodation_batch(university, to_create, to_link, batch_size)
+    except IntegrityError:
+        # A listing inserted concurrently since the duplicate check above breaks the whole
+        # batch; write the rows one at a time so that only the conflicting ones fail
+        for accommodation in to_create.values():
+            accommodation.pk, accommodation._state.adding = None, True
+        for index in list(to_create) + list(to_link):
+            row_create = {index: to_create[index]} if index in to_create else {}
+            row_link = {index: to_link[index]} if index in to_link else {}
+            try:
+                _write_accommodation_batch(university, row_create, row_link, batch_size)
+            except IntegrityError as error:
+                to_create.pop(index, None)
+                to_link.pop(index, None)
+                results[index] = {'row': index, 'status': 'failed', 'message': f"Could not save this row: {error}"}
+
+    for index, accommodation in to_create.items():
+        results[index] = {'row': index, 'status': 'created', 'id': accommodation.id}
+    for index, accommodation in to_link.items():
+        results[index] = {'row': index, 'status': 'linked', 'id': accommodation.id,
+                          'message': f"Successfully associated {university.name} with accommodation '{accommodation.title}'"}
+    return results
+
+def read_import_file(path, list_key):
+    """
+    Read import rows from a .json file (a list, or an object holding the list under list_key)
+    or from a CSV file with a header row.
+
+    Raises:
+        OSError, ValueError: if the file cannot be read or parsed
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            data = json.load(f)
+            return data.get(list_key, []) if isinstance(data, dict) else data
+        return list(csv.DictReader(f))
@@ -8,19 +8,22 @@ organized by functional areas:
 - Accommodation management (add, list, search, view)
 - Reservation operations (reserve, cancel)
 """
+import hmac
 import requests
-import math
 from django.shortcuts import render, redirect, get_object_or_404
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.dateparse import parse_date
-from django.db.models import Q, F, Func, FloatField, ExpressionWrapper, Exists, OuterRef
+from django.db import transaction, IntegrityError
+from django.db.models import Q, F, Exists, OuterRef, Prefetch, prefetch_related_objects
 from django.urls import reverse
 from django.core.mail import send_mail
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 
 from rest_framework import status
 from rest_framework.decorators import api_view, parser_classes, renderer_classes, authentication_classes, permission_classes
 from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
-from rest_framework.renderers import JSONRenderer, TemplateHTMLRenderer
+from rest_framework.renderers import TemplateHTMLRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import GenericAPIView
@@ -28,14 +31,18 @@ from rest_framework.generics import GenericAPIView
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 from drf_spectacular.types import OpenApiTypes
 
-from .models import Accommodation, AccommodationRating, UniversityAPIKey, ReservationPeriod
+from .models import Accommodation, AccommodationRating, UniversityAPIKey, ReservationPeriod, ChangeEvent, WebhookEndpoint
 from .forms import AccommodationForm
 from .serializers import (
     AccommodationSerializer, 
     AccommodationDetailSerializer,
-    AccommodationListSerializer,
     RatingSerializer,
-    AddAccommodationSerializer
+    AddAccommodationSerializer,
+    BulkRatingSerializer,
+    BulkAccommodationSerializer,
+    ChangeEventSerializer,
+    WebhookEndpointSerializer,
+    WebhookEndpointCreateSerializer
 )
 from .response_serializers import (
     MessageResponseSerializer,
@@ -48,25 +55,39 @@ from .response_serializers import (
     DuplicateAccommodationResponseSerializer,
     TemplateResponseSerializer,
     LinkAccommodationResponseSerializer,
-    ApiKeyTestResponseSerializer
+    ApiKeyTestResponseSerializer,
+    BulkRatingResponseSerializer,
+    BulkAccommodationResponseSerializer,
+    ChangeFeedResponseSerializer,
+    AutocompleteResponseSerializer,
+    FacetsResponseSerializer,
+    MapClustersResponseSerializer
 )
-from .utils import get_university_from_user_id
+from .utils import get_university_from_user_id, bulk_import_ratings, bulk_import_accommodations
 from .authentication import UniversityAPIKeyAuthentication
 from .permissions import UniversityAccessPermission
+from .renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from .search import search_accommodations
+from .geo import cluster_accommodations, distance_expression, nearest_ids, precision_for_zoom
+from .facets import compute_facets
+from .change_feed import feed_page
+from .fieldsets import select_fields
+from .fast_list import FIELDS as LIST_FIELDS, serialize_list, serialize_with_serializer
+from .listing_cache import cache_key
+from .campuses import DEFAULT_CAMPUS, get_campus, get_campuses
+from .autocomplete import FIELDS as AUTOCOMPLETE_FIELDS, get_index as get_autocomplete_index
+from .metrics import registry as metrics_registry
+from .exports import (
+    ACCOMMODATION_EXPORT_FIELDS,
+    RESERVATION_EXPORT_FIELDS,
+    accommodation_export_rows,
+    reservation_export_rows,
+    stream_csv,
+    stream_ndjson
+)
 
 #------------------------------------------------------------------------------
 # Constants and Configurations
-CAMPUS_LOCATIONS = {
-    "HKU_main": {"latitude": 22.28405, "longitude": 114.13784},
-    "HKU_sassoon": {"latitude": 22.2675, "longitude": 114.12881},
-    "HKU_swire": {"latitude": 22.20805, "longitude": 114.26021},
-    "KHU_kadoorie": {"latitude": 22.43022, "longitude": 114.11429},
-    "HKU_dentistry": {"latitude": 22.28649, "longitude": 114.14426},
-    # other campuses can be added here
-    "HKUST": {"latitude": 22.33584, "longitude": 114.26355},
-    "HKUST": {"latitude": 22.41907, "longitude": 114.20693},
-}
-
 # API Key Parameters for Swagger UI
 API_KEY_PARAMETER = [
     OpenApiParameter(
@@ -94,7 +115,7 @@ API_KEY_PARAMETER = [
     responses={200: MessageResponseSerializer}
 )
 @api_view(['GET'])
-@renderer_classes([JSONRenderer, TemplateHTMLRenderer])
+@renderer_classes([FastJSONRenderer, TemplateHTMLRenderer])
 def index(request):
     """
     Home page view function.
@@ -210,7 +231,7 @@ def lookup_address(request):
 @authentication_classes([UniversityAPIKeyAuthentication])
 @permission_classes([UniversityAccessPermission])
 @parser_classes([JSONParser, FormParser, MultiPartParser])
-@renderer_classes([JSONRenderer, TemplateHTMLRenderer]) 
+@renderer_classes([FastJSONRenderer, TemplateHTMLRenderer]) 
 def add_accommodation(request):
     """
     Add new accommodation information.
@@ -394,6 +415,57 @@ def add_accommodation(request):
         )
 
 
+@extend_schema(
+    summary="Bulk Add Accommodations",
+    description=(
+        "Import many accommodations at once for the university identified by the API key. "
+        "Rows are validated like add-accommodation, distinct addresses are geocoded concurrently, "
+        "and existing accommodations with the same room/flat/floor/address are linked instead of duplicated. "
+        "Returns one result per row."
+    ),
+    request=BulkAccommodationSerializer,
+    parameters=API_KEY_PARAMETER,
+    responses={
+        200: BulkAccommodationResponseSerializer,
+        400: ErrorResponseSerializer,
+        401: OpenApiResponse(description="API key authentication failed")
+    }
+)
+@api_view(['POST'])
+@authentication_classes([UniversityAPIKeyAuthentication])
+@parser_classes([JSONParser])
+@renderer_classes([FastJSONRenderer])
+def bulk_add_accommodation(request):
+    """
+    Add accommodations in bulk.
+
+    Each row is reported as created, linked, already_associated, duplicate,
+    invalid, geocode_failed or failed (the row could not be saved).
+    """
+    if not request.auth:
+        return Response(
+            {"success": False, "message": "API key is required for adding accommodations"},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    serializer = BulkAccommodationSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {"success": False, "errors": serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = bulk_import_accommodations(serializer.validated_data['accommodations'], request.user)
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return Response({
+        "success": True,
+        "message": f"Processed {len(results)} accommodations.",
+        "summary": summary,
+        "results": results
+    })
+
 @extend_schema(
     summary="Delete Accommodation",
     description="Delete an accommodation by ID using POST method or remove university association if multiple universities are linked.",
@@ -409,7 +481,7 @@ def add_accommodation(request):
 )
 @api_view(['POST'])
 @parser_classes([JSONParser])
-@renderer_classes([JSONRenderer])
+@renderer_classes([FastJSONRenderer])
 @authentication_classes([UniversityAPIKeyAuthentication])
 @permission_classes([UniversityAccessPermission])
 def delete_accommodation(request):
@@ -499,6 +571,104 @@ def delete_accommodation(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+NEAREST_DEFAULT_K = 10
+NEAREST_MAX_K = 100
+
+def _for_availability(accommodations):
+    """The accommodations with just the columns and reservation dates that the availability checks read"""
+    return accommodations.only('id', 'available_from', 'available_to').prefetch_related(
+        Prefetch('reservation_periods', queryset=ReservationPeriod.objects.only('accommodation_id', 'start_date', 'end_date'))
+    )
+
+def _with_available_periods(accommodation_ids):
+    """The ids among accommodation_ids that still have a free period (nearest_ids accept callback)"""
+    return {
+        accommodation.id
+        for accommodation in Accommodation.objects.filter(id__in=accommodation_ids).prefetch_related('reservation_periods')
+        if accommodation.get_available_periods()
+    }
+
+LISTING_FILTERS = ["type", "region", "available_from", "available_to", "min_beds", "min_bedrooms", "max_price",
+                   "distance", "campus", "user_id", "reservation_start", "reservation_end", "q", "building_name"]
+USER_ID_PREFIXES = ["HKU", "HKUST", "CUHK"]
+
+def _check_user_id(user_id):
+    """Raise ValueError unless user_id has the HKU_12345678 format"""
+    if not (user_id.count('_') == 1 and any(user_id.upper().startswith(code + "_") for code in USER_ID_PREFIXES)):
+        raise ValueError("Invalid User ID format. Please use format like HKU_12345678.")
+
+def _specialist_university(request):
+    """The university of the active API key in the X-API-Key header or api_key parameter, if any"""
+    api_key = request.META.get('HTTP_X_API_KEY') or request.query_params.get('api_key')
+    if not api_key:
+        return None
+    api_key_obj = UniversityAPIKey.objects.filter(key=api_key, is_active=True).select_related('university').first()
+    return api_key_obj.university if api_key_obj else None
+
+def _filter_listings(params, scope=None, origin=None, skip=()):
+    """
+    The accommodations matching the list and facets filters in params (see LISTING_FILTERS).
+
+    scope limits them to a specialist's university. origin is the (latitude, longitude) that the
+    distance annotation and the distance filter measure from, the campus by default. Filters named
+    in skip are left to the caller. Raises ValueError for numbers or a campus that cannot be used.
+    """
+    accommodations = Accommodation.objects.all()
+    if scope:
+        accommodations = accommodations.filter(affiliated_universities=scope)
+    if params['user_id']:
+        university = get_university_from_user_id(params['user_id'])
+        if university:
+            accommodations = accommodations.filter(affiliated_universities=university)
+    # Full-text search (see search.py); adds a search_rank annotation
+    if params['q'] or params['building_name']:
+        accommodations = search_accommodations(accommodations, params['q'], params['building_name'])
+
+    try:
+        min_beds = int(params['min_beds']) if params['min_beds'] else None
+        min_bedrooms = int(params['min_bedrooms']) if params['min_bedrooms'] else None
+        max_price = float(params['max_price']) if params['max_price'] else None
+        max_distance = float(params['distance']) if params['distance'] else None
+    except ValueError:
+        raise ValueError("min_beds, min_bedrooms, max_price and distance must be numbers.")
+
+    if params['type'] and 'type' not in skip:
+        accommodations = accommodations.filter(type=params['type'])
+    if params['region'] and 'region' not in skip:
+        accommodations = accommodations.filter(region=params['region'])
+    available_from, available_to = parse_date(params['available_from'] or ""), parse_date(params['available_to'] or "")
+    if available_from and available_to:
+        accommodations = accommodations.filter(available_from__lte=available_from, available_to__gte=available_to)
+    if min_beds is not None:
+        accommodations = accommodations.filter(beds__gte=min_beds)
+    if min_bedrooms is not None and 'min_bedrooms' not in skip:
+        accommodations = accommodations.filter(bedrooms__gte=min_bedrooms)
+    if max_price is not None and 'max_price' not in skip:
+        accommodations = accommodations.filter(price__lte=max_price)
+
+    if origin is None and max_distance is not None:
+        campus = get_campus(params['campus'] or DEFAULT_CAMPUS)
+        if campus is None:
+            raise ValueError("No campus is configured.")
+        origin = (campus["latitude"], campus["longitude"])
+    if origin is not None:
+        # Haversine distance in km (see geo.py)
+        accommodations = accommodations.annotate(distance=distance_expression(*origin))
+        if max_distance is not None:
+            accommodations = accommodations.filter(distance__lte=max_distance)
+
+    reservation_start = parse_date(params['reservation_start'] or "")
+    reservation_end = parse_date(params['reservation_end'] or "")
+    if reservation_start and reservation_end:
+        # Same rule as Accommodation.is_available(), in SQL
+        overlapping = ReservationPeriod.objects.filter(
+            accommodation=OuterRef('pk'), start_date__lte=reservation_end, end_date__gte=reservation_start
+        )
+        accommodations = accommodations.filter(
+            available_from__lte=reservation_start, available_to__gte=reservation_end
+        ).exclude(Exists(overlapping))
+    return accommodations
+
 @extend_schema(
     summary="List Accommodations",
     description="List all accommodations with optional filters",
@@ -515,9 +685,8 @@ def delete_accommodation(request):
         OpenApiParameter(
             name="campus",
             description=(
-                "Specify the campus location to calculate distances from. "
-                "Valid values: 'HKU_main', 'HKU_sassoon', 'HKU_swire', 'HKU_kadoorie', 'HKU_dentistry', 'HKUST', 'CUHK'. "
-                "Defaults to 'HKU_main' if not provided."
+                "Code of the campus to calculate distances from, such as 'HKU_main' or 'CUHK' "
+                "(campuses are managed in the admin). Defaults to 'HKU_main' if not provided or unknown."
             ),
             type=OpenApiTypes.STR,
             required=False,
@@ -536,6 +705,37 @@ def delete_accommodation(request):
         ),
         OpenApiParameter(name="reservation_start", description="Reservation start date (yyyy-MM-DD)", type=OpenApiTypes.DATE, required=False),
         OpenApiParameter(name="reservation_end", description="Reservation end date (yyyy-MM-DD)", type=OpenApiTypes.DATE, required=False),
+        OpenApiParameter(
+            name="q",
+            description=(
+                "Full-text search over title, description, building, estate, street and district. "
+                "Every word must match (as a prefix). Results are sorted by relevance unless order_by is given."
+            ),
+            type=OpenApiTypes.STR,
+            required=False,
+        ),
+        OpenApiParameter(name="building_name", description="Words to find in the building or estate name", type=OpenApiTypes.STR, required=False),
+        OpenApiParameter(
+            name="near",
+            description=(
+                "Return the k nearest available accommodations to this point, given as 'latitude,longitude'. "
+                "Distances are measured from it instead of the campus; combines with the other filters."
+            ),
+            type=OpenApiTypes.STR,
+            required=False,
+        ),
+        OpenApiParameter(name="k", description=f"Number of accommodations to return with near (default {NEAREST_DEFAULT_K}, max {NEAREST_MAX_K})", type=int, required=False),
+        OpenApiParameter(
+            name="fields",
+            description=(
+                "Comma-separated fields to return for each accommodation, such as 'id,latitude,longitude,price' "
+                "(id is always returned). Reservations are only read when reserved, available_periods or "
+                f"reservations is among them. Available: {', '.join(LIST_FIELDS)}."
+            ),
+            type=OpenApiTypes.STR,
+            required=False,
+        ),
+        OpenApiParameter(name="exclude", description="Comma-separated fields to leave out of each accommodation", type=OpenApiTypes.STR, required=False),
     ] + API_KEY_PARAMETER,
     responses={
         200: AccommodationListResponseSerializer,
@@ -553,168 +753,91 @@ def list_accommodation(request):
     If user_id is provided, only shows accommodations affiliated with the user's university.
 
     If reservation_start and reservation_end are provided, only shows accommodations available during that period.
-    """
-    accommodations = Accommodation.objects.all()
-    
-    print(f"[DEBUG-Backend] Total number of accommodations before filter: {accommodations.count()}")
-    
-    # Get api from request header or query parameters to identify the specialist user
-    api_key = request.META.get('HTTP_X_API_KEY') or request.query_params.get('api_key')
-    is_specialist = False
-    specialist_university = None
 
-    # Output the where api is sent from
-    if api_key:
-        if 'HTTP_X_API_KEY' in request.META:
-            print(f"[DEBUG-Backend] API Key from header: {api_key}")
-        else:
-            print(f"[DEBUG-Backend] API Key from query_params: {api_key}")
-    
-    if api_key:
-        try:
-            api_key_obj = UniversityAPIKey.objects.get(key=api_key, is_active=True)
-            specialist_university = api_key_obj.university
-            is_specialist = True
-            
-            university_name = specialist_university.name
-            university_id = specialist_university.id
-            print(f"[DEBUG-Backend] Successfully verified the expert's identity: University = {university_name}, ID={university_id}")
-            
-            affiliated_count = Accommodation.objects.filter(affiliated_universities=specialist_university).count()
-            print(f"[DEBUG-Backend] The number of accommodations associated with this university: {affiliated_count}")
-        except UniversityAPIKey.DoesNotExist:
-            print(f"[DEBUG-Backend] Invalid API Key: {api_key}")
-    else:
-        print("[DEBUG-Backend] No API Key is provided. Student user view.")
-    
-    if not is_specialist:
-        print("[DEBUG-Backend] Student User view - show accommodations with available periods")
-    else:
-        print(f"[DEBUG-Backend] Specialist - only show {specialist_university.name}'s accommodations (including reserved)")
-        accommodations = accommodations.filter(affiliated_universities=specialist_university)
-    
-    building_name = request.query_params.get("building_name", "")
-    accommodation_type = request.query_params.get("type", "")
-    region = request.query_params.get("region", "")
-    available_from = request.query_params.get("available_from", "")
-    available_to = request.query_params.get("available_to", "")
-    min_beds = request.query_params.get("min_beds", "")
-    min_bedrooms = request.query_params.get("min_bedrooms", "")
-    max_price = request.query_params.get("max_price", "")
-    max_distance = request.query_params.get("distance", "")
+    If near is provided, shows the k nearest of the matching accommodations to that point (see geo.nearest_ids).
+
+    fields and exclude trim the JSON output to the named fields, and the columns read to those behind them (see fieldsets.py).
+    """
+    print(f"[DEBUG-Backend] Total number of accommodations before filter: {Accommodation.objects.count()}")
+
+    # A valid API key identifies a specialist, who sees only their university's listings (including reserved)
+    specialist_university = _specialist_university(request)
+    is_specialist = specialist_university is not None
+
+    params = {name: request.query_params.get(name, "") for name in LISTING_FILTERS}
+    building_name = params["building_name"]
+    accommodation_type = params["type"]
+    region = params["region"]
+    available_from = params["available_from"]
+    available_to = params["available_to"]
+    min_beds = params["min_beds"]
+    min_bedrooms = params["min_bedrooms"]
+    max_price = params["max_price"]
+    max_distance = params["distance"]
     order_by = request.query_params.get("order_by", "")
     order_by_distance = request.query_params.get("order_by_distance", "false").lower() == "true"
-    campus = request.query_params.get("campus", "HKU_main")  # Default to "HKU_main" campus
-    user_id = request.query_params.get("user_id", "")
-    reservation_start = request.query_params.get("reservation_start", "")
-    reservation_end = request.query_params.get("reservation_end", "")
-        
-    # if user_id is provided, check if it is valid
-    if user_id:
-        # check if the user_id is matching the format
-        if not (user_id.count('_') == 1 and any(user_id.upper().startswith(code.upper() + "_") for code in ["HKU", "HKUST", "CUHK"])):
+    campus = params["campus"] or DEFAULT_CAMPUS
+    user_id = params["user_id"]
+    reservation_start = params["reservation_start"]
+    reservation_end = params["reservation_end"]
+    search_query = params["q"]
+    near = request.query_params.get("near", "")
+
+    near_point = None
+    if near:
+        try:
+            near_point = tuple(float(value) for value in near.split(','))
+            k = int(request.query_params.get("k", NEAREST_DEFAULT_K))
+        except ValueError:
+            near_point = None
+        if not near_point or len(near_point) != 2 or not (-90 <= near_point[0] <= 90 and -180 <= near_point[1] <= 180):
             return Response(
-                {"success": False, "message": "Invalid User ID format. Please use format like HKU_12345678."},
+                {"success": False, "message": "near must be 'latitude,longitude' and k an integer."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        university = get_university_from_user_id(user_id)
-        if university:
-            # only show accommodations affiliated with the user's university
-            accommodations = accommodations.filter(affiliated_universities=university)
-    
-    
-    if campus not in CAMPUS_LOCATIONS:
-        campus = "HKU_main"  # Default to "HKU_main" if campus is invalid
-    # Get selected campus coordinates
-    campus_coords = CAMPUS_LOCATIONS[campus]
-    campus_latitude = campus_coords["latitude"]
-    campus_longitude = campus_coords["longitude"]
-    # print(f"[DEBUG-Backend] Campus Coordinates: {campus_latitude}, {campus_longitude}")
-    
-    if accommodation_type:
-        accommodations = accommodations.filter(type=accommodation_type)
-    
-    if region:
-        accommodations = accommodations.filter(region=region)
-
-    if available_from and available_to:
-        available_from = parse_date(available_from)
-        available_to = parse_date(available_to)
-        
-        print(f"[DEBUG-Backend] User filter with date: from {available_from} to {available_to}")
-                
-        if available_from and available_to:
-            original_count = accommodations.count()
-            
-            accommodations = accommodations.filter(
-                Q(available_from__lte=available_from) & Q(available_to__gte=available_to)
-            )
-            print(f"[DEBUG-Backend] Before Date Filter has {original_count} non-reserved Accommodation, after Date Filter has {accommodations.count()} non-reserved Accommodation")
-            # Debugging information to list all accommodation information
-            from .utils import debug_accommodation_dates
-            date_info = debug_accommodation_dates()
-            print(f"[DEBUG-Backend] Accommodation available date information: {date_info}")
-    if min_beds:
-        accommodations = accommodations.filter(beds__gte=min_beds)
-
-    if min_bedrooms:
-        accommodations = accommodations.filter(bedrooms__gte=min_bedrooms)
-
-    if max_price:
-        accommodations = accommodations.filter(price__lte=max_price)
+        k = max(1, min(k, NEAREST_MAX_K))
 
-    # Calculate distance using Haversine formula
-    accommodations = accommodations.annotate(
-        distance=ExpressionWrapper(
-            Func(
-                Func(
-                    (F('longitude') - campus_longitude) * math.pi / 180 *
-                    Func((F('latitude') + campus_latitude) / 2 * math.pi / 180, function='COS'),
-                    function='POW',
-                    template="%(function)s(%(expressions)s, 2)"
-                ) + Func(
-                    (F('latitude') - campus_latitude) * math.pi / 180,
-                    function='POW',
-                    template="%(function)s(%(expressions)s, 2)"
-                ),
-                function='SQRT',
-            ) * 6371,  # Earth radius (km)
-            output_field=FloatField(),
-        )
-    )
-    if max_distance:
-        max_distance = float(max_distance)
-        accommodations = accommodations.filter(distance__lte=max_distance)
-
-    if reservation_start and reservation_end:
-        reservation_start = parse_date(reservation_start)
-        reservation_end = parse_date(reservation_end)
-        
-        if reservation_start and reservation_end:
-            print(f"[DEBUG-Backend] Filtering reservation date range: {reservation_start} to {reservation_end}")
-            
-            # Get original count
-            original_count = accommodations.count()
-            
-            # Exclude accommodations with overlapping reservations
-            unavailable_accommodation_ids = []
-            for accommodation in accommodations:
-                if not accommodation.is_available(reservation_start, reservation_end):
-                    unavailable_accommodation_ids.append(accommodation.id)
-            
-            accommodations = accommodations.exclude(id__in=unavailable_accommodation_ids)
-            
-            print(f"[DEBUG-Backend] Before date filter: {original_count} accommodations, after filter: {accommodations.count()} accommodations")
+    try:
+        fields = select_fields(request.query_params, LIST_FIELDS)
+        if user_id:
+            _check_user_id(user_id)
+    except ValueError as error:
+        return Response({"success": False, "message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Get selected campus coordinates (unknown codes fall back to the default campus)
+    campus_coords = get_campus(campus)
+    if near_point:
+        # Distances are measured from the requested point instead
+        origin = near_point
+    elif campus_coords:
+        origin = (campus_coords["latitude"], campus_coords["longitude"])
     else:
-        # If no reservation dates are specified, only show accommodations with any available periods
-        if not is_specialist:
-            unavailable_accommodation_ids = []
-            for accommodation in accommodations:
-                if not accommodation.get_available_periods():
-                    unavailable_accommodation_ids.append(accommodation.id)
-            
-            accommodations = accommodations.exclude(id__in=unavailable_accommodation_ids)
-            print(f"[DEBUG-Backend] Filtered out fully booked accommodations, remaining: {accommodations.count()}")
+        return Response({"success": False, "message": "No campus is configured."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        accommodations = _filter_listings(params, scope=specialist_university, origin=origin)
+    except ValueError as error:
+        return Response({"success": False, "message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # The reservation window is filtered in SQL above; without one the student view
+    # only shows accommodations with any available period
+    reservation_window = parse_date(reservation_start) and parse_date(reservation_end)
+    if near_point:
+        # k-nearest mode: only the neighbourhood of the point is read, so the available-period
+        # rule is checked on the candidates only
+        accept = _with_available_periods if not (reservation_window or is_specialist) else None
+        nearest = nearest_ids(accommodations, origin[0], origin[1], k,
+                              max_km=float(max_distance) if max_distance else None, accept=accept)
+        accommodations = accommodations.filter(id__in=nearest)
+    elif not (reservation_window or is_specialist):
+        unavailable_accommodation_ids = []
+        for accommodation in _for_availability(accommodations):
+            if not accommodation.get_available_periods():
+                unavailable_accommodation_ids.append(accommodation.id)
+
+        accommodations = accommodations.exclude(id__in=unavailable_accommodation_ids)
+        print(f"[DEBUG-Backend] Filtered out fully booked accommodations, remaining: {accommodations.count()}")
 
     if order_by:
         if order_by == 'distance':
@@ -727,33 +850,25 @@ def list_accommodation(request):
             accommodations = accommodations.order_by('-rating')
         elif order_by == 'beds':
             accommodations = accommodations.order_by('-beds')
-    elif order_by_distance:
-        accommodations = accommodations.order_by('distance')
+    elif order_by_distance or near_point:
+        accommodations = accommodations.order_by('distance', 'id')
+    elif 'search_rank' in accommodations.query.annotations:
+        accommodations = accommodations.order_by('-search_rank', 'id')
 
     print(f"[DEBUG-Backend] The number of after all filtered accommodations: {accommodations.count()}")
     
     if request.headers.get('Accept') == 'application/json' or request.query_params.get('format') == 'json':
-        serializer = AccommodationListSerializer(accommodations, many=True)
-        for acc_data in serializer.data:
-            accommodation = Accommodation.objects.get(id=acc_data['id'])
-            # 添加可用期间
-            acc_data['available_periods'] = [
-                {'start_date': period[0], 'end_date': period[1]} 
-                for period in accommodation.get_available_periods()
-            ]
-            # 添加预订信息
-            acc_data['reservations'] = []
-            for period in accommodation.reservation_periods.all():
-                acc_data['reservations'].append({
-                    'id': period.id,
-                    'start_date': period.start_date,
-                    'end_date': period.end_date,
-                    'user_id': period.user_id,
-                    'contract_status': period.contract_status
-                })
-        return Response({'accommodations': serializer.data})
+        # Built from values() rows unless switched off (see fast_list.py)
+        if getattr(settings, 'FAST_LIST_SERIALIZATION', True):
+            data = serialize_list(accommodations, fields)
+        else:
+            data = serialize_with_serializer(accommodations, fields)
+        return Response({'accommodations': data})
     return render(request, 'accommodation/accommodation_list.html', {
         "buildingName": building_name,
+        'q': search_query,
+        'near': near,
+        'campus_name': campus_coords['name'] if campus_coords and not near_point else "",
         'accommodations': accommodations,
         'accommodation_type': accommodation_type,
         'region': region,
@@ -786,9 +901,8 @@ def list_accommodation(request):
         OpenApiParameter(
             name="campus",
             description=(
-                "Specify the campus location to calculate distances from. "
-                "Valid values: 'HKU_main', 'HKU_sassoon', 'HKU_swire', 'HKU_kadoorie', 'HKU_dentistry', 'HKUST', 'CUHK'. "
-                "Defaults to 'HKU_main' if not provided."
+                "Code of the campus to calculate distances from, such as 'HKU_main' or 'CUHK' "
+                "(campuses are managed in the admin). Defaults to 'HKU_main' if not provided or unknown."
             ),
             type=OpenApiTypes.STR,
             required=False,
@@ -831,13 +945,85 @@ def search_accommodation(request):
     if request.headers.get('Accept') == 'application/json' or request.query_params.get('format') == 'json':
         return Response({"message": "Use GET with query parameters to search accommodations."})
     
-    return render(request, 'accommodation/search_results.html')
+    return render(request, 'accommodation/search_results.html', {
+        'campuses': get_campuses().values(),
+        'default_campus': DEFAULT_CAMPUS,
+    })
+
+@extend_schema(
+    summary="Facet Counts",
+    description=(
+        "Counts per accommodation type, region, bedroom bucket and price band for the given filters, "
+        "as used by the search sidebar. Takes the same filters as the list endpoint. Each facet ignores "
+        "its own filter, so the type counts show how many listings each type would have. Fully booked "
+        "listings are counted."
+    ),
+    parameters=[
+        OpenApiParameter(name="type", description="Accommodation type", type=str, required=False, enum=["APARTMENT", "HOUSE", "HOSTEL"]),
+        OpenApiParameter(name="region", description="Region", type=str, required=False),
+        OpenApiParameter(name="available_from", description="Available from date (yyyy-MM-DD)", type=OpenApiTypes.DATE, required=False),
+        OpenApiParameter(name="available_to", description="Available to date (yyyy-MM-DD)", type=OpenApiTypes.DATE, required=False),
+        OpenApiParameter(name="min_beds", description="Minimum beds", type=int, required=False),
+        OpenApiParameter(name="min_bedrooms", description="Minimum bedrooms", type=int, required=False),
+        OpenApiParameter(name="max_price", description="Maximum price", type=float, required=False),
+        OpenApiParameter(name="distance", description="Maximum distance from campus", type=float, required=False),
+        OpenApiParameter(name="campus", description="Campus to measure distances from (default HKU_main)", type=str, required=False),
+        OpenApiParameter(name="user_id", description="User ID to filter accommodations by university affiliation", type=str, required=False),
+        OpenApiParameter(name="reservation_start", description="Reservation start date (yyyy-MM-DD)", type=OpenApiTypes.DATE, required=False),
+        OpenApiParameter(name="reservation_end", description="Reservation end date (yyyy-MM-DD)", type=OpenApiTypes.DATE, required=False),
+        OpenApiParameter(name="q", description="Full-text search words", type=str, required=False),
+        OpenApiParameter(name="building_name", description="Words to find in the building or estate name", type=str, required=False),
+    ] + API_KEY_PARAMETER,
+    responses={
+        200: FacetsResponseSerializer,
+        400: ErrorResponseSerializer,
+    }
+)
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def accommodation_facets(request):
+    """
+    Facet counts for the current filter set, computed in one grouped query.
+
+    Responses are cached per filter set and scope until the listing changes (see listing_cache.py).
+    """
+    params = {name: request.query_params.get(name, "") for name in LISTING_FILTERS}
+    # Same scoping and filters as list_accommodation: a specialist sees their university's listings
+    scope = _specialist_university(request)
+    try:
+        if params['user_id']:
+            _check_user_id(params['user_id'])
+    except ValueError as error:
+        return Response({"success": False, "message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+    key = cache_key('facets', dict(params, scope=scope.id if scope else None))
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+
+    # The faceted filters are left to compute_facets so that each facet can ignore its own
+    try:
+        accommodations = _filter_listings(params, scope=scope, skip=('type', 'region', 'min_bedrooms', 'max_price'))
+    except ValueError as error:
+        return Response({"success": False, "message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    min_bedrooms = int(params['min_bedrooms']) if params['min_bedrooms'] else None
+    max_price = float(params['max_price']) if params['max_price'] else None
+    data = compute_facets(accommodations, params['type'] or None, params['region'] or None, min_bedrooms, max_price)
+    cache.set(key, data, getattr(settings, 'FACETS_CACHE_SECONDS', 60))
+    return Response(data)
 
 @extend_schema(
     summary="Accommodation Details",
     description="View accommodation details",
     parameters=[
-        OpenApiParameter(name="id", location=OpenApiParameter.PATH, description="Accommodation ID", type=int, required=True)
+        OpenApiParameter(name="id", location=OpenApiParameter.PATH, description="Accommodation ID", type=int, required=True),
+        OpenApiParameter(
+            name="fields",
+            description=f"Comma-separated fields to return (id is always returned). Available: {', '.join(AccommodationDetailSerializer.Meta.fields)}.",
+            type=OpenApiTypes.STR,
+            required=False,
+        ),
+        OpenApiParameter(name="exclude", description="Comma-separated fields to leave out", type=OpenApiTypes.STR, required=False),
     ],
     responses={
         200: AccommodationDetailSerializer,
@@ -861,13 +1047,21 @@ def accommodation_detail(request, id):
         - 404 error if accommodation not found
     """
     try:
-        accommodation = get_object_or_404(Accommodation, pk=id)
+        json_requested = request.headers.get('Accept') == 'application/json' or request.query_params.get('format') == 'json'
+        fields = None
+        if json_requested:
+            # fields / exclude trim the output and what is read for it (see fieldsets.py)
+            try:
+                fields = select_fields(request.query_params, AccommodationDetailSerializer.Meta.fields)
+            except ValueError as error:
+                return Response({"success": False, "message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        accommodation = get_object_or_404(AccommodationDetailSerializer.prefetch(Accommodation.objects.all(), fields), pk=id)
         
         # save the query string to pass to the template
         query_string = request.META.get('QUERY_STRING', '')
         
-        if request.headers.get('Accept') == 'application/json' or request.query_params.get('format') == 'json':
-            serializer = AccommodationDetailSerializer(accommodation)
+        if json_requested:
+            serializer = AccommodationDetailSerializer(accommodation, fields=fields)
             return Response(serializer.data)
         return render(request, 'accommodation/accommodation_detail.html', {
             'accommodation': accommodation,
@@ -980,16 +1174,18 @@ class ReservationView(GenericAPIView):
                         'message': f'You are not eligible to reserve this accommodation. It is only available to students from: {", ".join(university_codes)}.'
                     }, status=status.HTTP_403_FORBIDDEN)
             
-            # Create new reservation record
-            reservation = ReservationPeriod.objects.create(
-                accommodation=accommodation,
-                user_id=user_id,
-                contact_number=contact_number,
-                start_date=start_date,
-                end_date=end_date
-            )
+            # Create new reservation record; it commits together with the change events and
+            # webhook outbox rows its signals write
+            with transaction.atomic():
+                reservation = ReservationPeriod.objects.create(
+                    accommodation=accommodation,
+                    user_id=user_id,
+                    contact_number=contact_number,
+                    start_date=start_date,
+                    end_date=end_date
+                )
 
-            accommodation.save()
+                accommodation.save()
             
             # Send confirmation emails
             student_name = user_id.split('_')[1]
@@ -1019,6 +1215,7 @@ class ReservationView(GenericAPIView):
             )
             
             # Return success response
+            prefetch_related_objects([accommodation], *AccommodationDetailSerializer.PREFETCH)
             serializer = AccommodationDetailSerializer(accommodation)
             return Response({
                 'success': True,
@@ -1126,17 +1323,18 @@ class CancellationView(GenericAPIView):
             start_date = reservation.start_date
             end_date = reservation.end_date
             
-            # Delete reservation
-            reservation.delete()
+            # Delete reservation, together with the change events and webhook outbox rows its signals write
+            with transaction.atomic():
+                reservation.delete()
+
+                # Check if there are other reservations
+                if not ReservationPeriod.objects.filter(accommodation=accommodation).exists():
+                    accommodation.save()
             
             # Special notifications will be sent for cases where signed reservations are cancelled by experts
             message_suffix = ""
             if reservation.contract_status and is_specialist:
                 message_suffix = " Note: This reservation had a signed contract and was cancelled by housing office."
-            
-            # Check if there are other reservations
-            if not ReservationPeriod.objects.filter(accommodation=accommodation).exists():
-                accommodation.save()
                 
             # Send confirmation email
             student_name = user_id.split('_')[1]
@@ -1164,6 +1362,7 @@ class CancellationView(GenericAPIView):
             )
             
             # Return success response
+            prefetch_related_objects([accommodation], *AccommodationDetailSerializer.PREFETCH)
             serializer = AccommodationDetailSerializer(accommodation)
             return Response({
                 'success': True,
@@ -1233,26 +1432,32 @@ class RatingView(GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         accommodation = get_object_or_404(Accommodation, id=accommodation_id)
-        if AccommodationRating.objects.filter(
-            accommodation=accommodation, user_identifier=user_id
-        ).exists():
-            return Response(
-                {"success": False, "message": "You have already rated this accommodation."},
-                status=status.HTTP_400_BAD_REQUEST
+        with transaction.atomic():
+            # Rely on the unique_together constraint instead of a prior exists() query
+            try:
+                with transaction.atomic():
+                    AccommodationRating.objects.create(
+                        accommodation=accommodation,
+                        user_identifier=user_id,
+                        rating=rating_value
+                    )
+            except IntegrityError:
+                return Response(
+                    {"success": False, "message": "You have already rated this accommodation."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # Increment the aggregates in the database so concurrent raters don't lose updates
+            accommodation.rating_sum = F('rating_sum') + rating_value
+            accommodation.rating_count = F('rating_count') + 1
+            accommodation.save(update_fields=['rating_sum', 'rating_count'])
+            accommodation.refresh_from_db(fields=['rating_sum', 'rating_count'])
+            accommodation.rating = (
+                round(accommodation.rating_sum / accommodation.rating_count, 1)
+                if accommodation.rating_count > 0
+                else 0.0
             )
-        AccommodationRating.objects.create(
-            accommodation=accommodation,
-            user_identifier=user_id,
-            rating=rating_value
-        )
-        accommodation.rating_sum += rating_value
-        accommodation.rating_count += 1
-        accommodation.rating = (
-            round(accommodation.rating_sum / accommodation.rating_count, 1)
-            if accommodation.rating_count > 0
-            else 0.0
-        )
-        accommodation.save()
+            accommodation.save(update_fields=['rating'])
+        prefetch_related_objects([accommodation], *AccommodationDetailSerializer.PREFETCH)
         accommodation_serializer = AccommodationDetailSerializer(accommodation)
         return Response(
             {
@@ -1268,6 +1473,52 @@ reserve_accommodation = ReservationView.as_view()
 cancel_reservation = CancellationView.as_view()
 rate_accommodation = RatingView.as_view()
 
+@extend_schema(
+    summary="Bulk Rate Accommodations",
+    description=(
+        "Import many ratings at once (e.g. end-of-term survey results). Requires API key authentication. "
+        "Ratings for accommodations not affiliated with the caller's university are reported as errors; "
+        "users who already rated an accommodation are skipped."
+    ),
+    request=BulkRatingSerializer,
+    parameters=API_KEY_PARAMETER,
+    responses={
+        200: BulkRatingResponseSerializer,
+        400: ErrorResponseSerializer,
+        401: OpenApiResponse(description="API key authentication failed")
+    }
+)
+@api_view(['POST'])
+@authentication_classes([UniversityAPIKeyAuthentication])
+@parser_classes([JSONParser])
+@renderer_classes([FastJSONRenderer])
+def bulk_rate_accommodation(request):
+    """
+    Import ratings in bulk.
+
+    All rows are validated in one pass, inserted with bulk_create and the affected
+    accommodations' aggregates are recomputed with a single UPDATE.
+    """
+    if not request.auth:
+        return Response(
+            {"success": False, "message": "API key is required for bulk rating import"},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    serializer = BulkRatingSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            {"success": False, "errors": serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    result = bulk_import_ratings(serializer.validated_data['ratings'], university=request.user)
+    return Response({
+        "success": True,
+        "message": f"Imported {result['created']} ratings, skipped {result['duplicates']} duplicates.",
+        **result
+    })
+
 @api_view(['GET'])
 @extend_schema(responses=TemplateResponseSerializer)
 @renderer_classes([TemplateHTMLRenderer])
@@ -1488,8 +1739,10 @@ def view_reservations(request):
             return Response({'error': 'User ID is required'}, template_name='accommodation/view_reservations.html')
         
         # Validate user ID format
-        if not (user_id.count('_') == 1 and any(user_id.upper().startswith(code.upper() + "_") for code in ["HKU", "HKUST", "CUHK"])):
-            return Response({'error': 'Invalid User ID format. Please use format like HKU_12345678.'}, template_name='accommodation/view_reservations.html')
+        try:
+            _check_user_id(user_id)
+        except ValueError as error:
+            return Response({'error': str(error)}, template_name='accommodation/view_reservations.html')
         
         # Query reservations through ReservationPeriod instead of using the userID field of accommodation
         reservation_periods = ReservationPeriod.objects.filter(user_id=user_id).select_related('accommodation')
@@ -1733,6 +1986,330 @@ def check_availability(request):
             'available': False
         }, status=status.HTTP_400_BAD_REQUEST)
 
+#------------------------------------------------------------------------------
+# Data Export
+#------------------------------------------------------------------------------
+EXPORT_PARAMETERS = [
+    OpenApiParameter(name="format", description="Export format", type=str, required=False, enum=["csv", "ndjson"]),
+] + API_KEY_PARAMETER
+
+def _export_response(request, filename, fields, rows):
+    """Build a streaming CSV or NDJSON response for the negotiated format"""
+    if request.accepted_renderer.format == 'ndjson':
+        response = StreamingHttpResponse(stream_ndjson(fields, rows), content_type='application/x-ndjson')
+        filename = f"{filename}.ndjson"
+    else:
+        response = StreamingHttpResponse(stream_csv(fields, rows), content_type='text/csv; charset=utf-8')
+        filename = f"{filename}.csv"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@extend_schema(
+    summary="Export Accommodations",
+    description="Stream all accommodations affiliated with the caller's university as CSV or NDJSON. Requires API key authentication.",
+    parameters=EXPORT_PARAMETERS,
+    responses={
+        (200, 'text/csv'): OpenApiTypes.STR,
+        (200, 'application/x-ndjson'): OpenApiTypes.STR,
+        401: OpenApiResponse(description="API key authentication failed")
+    }
+)
+@api_view(['GET'])
+@authentication_classes([UniversityAPIKeyAuthentication])
+@renderer_classes([CSVRenderer, NDJSONRenderer])
+def export_accommodations(request):
+    """
+    Stream the university's accommodations.
+
+    Rows are fetched with a chunked iterator and encoded one at a time,
+    so memory use stays flat regardless of the number of listings.
+    """
+    if not request.auth:
+        return Response(
+            {"success": False, "message": "API key is required for exporting accommodations"},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    university = request.user
+    return _export_response(
+        request, f"{university.code}_accommodations",
+        ACCOMMODATION_EXPORT_FIELDS, accommodation_export_rows(university)
+    )
+
+@extend_schema(
+    summary="Export Reservations",
+    description="Stream all reservations on accommodations affiliated with the caller's university as CSV or NDJSON. Requires API key authentication.",
+    parameters=EXPORT_PARAMETERS,
+    responses={
+        (200, 'text/csv'): OpenApiTypes.STR,
+        (200, 'application/x-ndjson'): OpenApiTypes.STR,
+        401: OpenApiResponse(description="API key authentication failed")
+    }
+)
+@api_view(['GET'])
+@authentication_classes([UniversityAPIKeyAuthentication])
+@renderer_classes([CSVRenderer, NDJSONRenderer])
+def export_reservations(request):
+    """
+    Stream the reservations on the university's accommodations for contract processing.
+    """
+    if not request.auth:
+        return Response(
+            {"success": False, "message": "API key is required for exporting reservations"},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    university = request.user
+    return _export_response(
+        request, f"{university.code}_reservations",
+        RESERVATION_EXPORT_FIELDS, reservation_export_rows(university)
+    )
+
+#------------------------------------------------------------------------------
+# Change Feed
+#------------------------------------------------------------------------------
+CHANGE_FEED_DEFAULT_LIMIT = 500
+CHANGE_FEED_MAX_LIMIT = 1000
+
+@extend_schema(
+    summary="Change Feed",
+    description=(
+        "Incremental feed of create/update/delete events for accommodations, reservations and "
+        "university affiliations visible to the caller's university. Pass the returned next_cursor "
+        "as `since` to resume; no event committed later sorts before it. "
+        "A listing enters the feed through an 'affiliation' 'create' event."
+    ),
+    parameters=[
+        OpenApiParameter(name="since", description="Cursor returned by the previous call (0 to start from the beginning)", type=str, required=False),
+        OpenApiParameter(name="limit", description=f"Maximum events to return (default {CHANGE_FEED_DEFAULT_LIMIT}, max {CHANGE_FEED_MAX_LIMIT})", type=int, required=False),
+    ] + API_KEY_PARAMETER,
+    responses={
+        200: ChangeFeedResponseSerializer,
+        400: ErrorResponseSerializer,
+        401: OpenApiResponse(description="API key authentication failed")
+    }
+)
+@api_view(['GET'])
+@authentication_classes([UniversityAPIKeyAuthentication])
+@renderer_classes([FastJSONRenderer])
+def changes_feed(request):
+    """
+    Return the university's change events after the `since` cursor, in order (see change_feed.py).
+    """
+    if not request.auth:
+        return Response(
+            {"success": False, "message": "API key is required for the change feed"},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    try:
+        limit = int(request.query_params.get('limit', CHANGE_FEED_DEFAULT_LIMIT))
+        limit = max(1, min(limit, CHANGE_FEED_MAX_LIMIT))
+        events, next_cursor, has_more = feed_page(
+            ChangeEvent.objects.filter(university=request.user), request.query_params.get('since', '0'), limit
+        )
+    except ValueError:
+        return Response(
+            {"success": False, "message": "since must be a cursor from a previous call and limit an integer"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response({
+        "events": ChangeEventSerializer(events, many=True).data,
+        "next_cursor": next_cursor,
+        "has_more": has_more
+    })
+
+#------------------------------------------------------------------------------
+# Webhooks
+#------------------------------------------------------------------------------
+class WebhookListView(GenericAPIView):
+    """
+    Register and list the reservation webhooks of the university identified by the API key.
+
+    Registered URLs receive signed POSTs with batches of reservation.created and
+    reservation.cancelled events, delivered by the deliver_webhooks command.
+    """
+    serializer_class = WebhookEndpointSerializer
+    authentication_classes = [UniversityAPIKeyAuthentication]
+
+    def _unauthorized(self):
+        return Response(
+            {"success": False, "message": "API key is required for managing webhooks"},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    @extend_schema(
+        summary="List Webhooks",
+        parameters=API_KEY_PARAMETER,
+        responses={200: WebhookEndpointSerializer(many=True), 401: OpenApiResponse(description="API key authentication failed")}
+    )
+    def get(self, request):
+        if not request.auth:
+            return self._unauthorized()
+        endpoints = WebhookEndpoint.objects.filter(university=request.user).order_by('id')
+        return Response(self.serializer_class(endpoints, many=True).data)
+
+    @extend_schema(
+        summary="Register Webhook",
+        description=(
+            "Register a URL for reservation events. The response contains the secret used to sign deliveries; "
+            "it is the only one that does, later listings mask it."
+        ),
+        parameters=API_KEY_PARAMETER,
+        request=WebhookEndpointCreateSerializer,
+        responses={
+            201: WebhookEndpointCreateSerializer,
+            400: ErrorResponseSerializer,
+            401: OpenApiResponse(description="API key authentication failed")
+        }
+    )
+    def post(self, request):
+        if not request.auth:
+            return self._unauthorized()
+        serializer = WebhookEndpointCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"success": False, "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        serializer.save(university=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+class WebhookDetailView(GenericAPIView):
+    """Remove a webhook registration of the university identified by the API key"""
+    serializer_class = WebhookEndpointSerializer
+    authentication_classes = [UniversityAPIKeyAuthentication]
+
+    @extend_schema(
+        summary="Delete Webhook",
+        parameters=[
+            OpenApiParameter(name="id", location=OpenApiParameter.PATH, description="Webhook ID", type=int, required=True)
+        ] + API_KEY_PARAMETER,
+        responses={
+            200: SuccessResponseSerializer,
+            401: OpenApiResponse(description="API key authentication failed"),
+            404: ErrorResponseSerializer
+        }
+    )
+    def delete(self, request, id):
+        if not request.auth:
+            return Response(
+                {"success": False, "message": "API key is required for managing webhooks"},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        deleted, _ = WebhookEndpoint.objects.filter(id=id, university=request.user).delete()
+        if not deleted:
+            return Response({"success": False, "message": "Webhook not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"success": True, "message": "Webhook deleted."})
+
+webhook_list = WebhookListView.as_view()
+webhook_detail = WebhookDetailView.as_view()
+
+#------------------------------------------------------------------------------
+# Map Clusters
+#------------------------------------------------------------------------------
+MAP_MAX_ZOOM = 22
+
+@extend_schema(
+    summary="Map Clusters",
+    description=(
+        "Listings inside a bounding box grouped into geohash cells sized for the zoom level, with the "
+        "number of listings, their centroid and the lowest price in each cell. A cell holding a single "
+        "listing also gives its id. Computed with one group-by over the indexed geohash column."
+    ),
+    parameters=[
+        OpenApiParameter(name="bbox", description="Bounding box as west,south,east,north (min_lon,min_lat,max_lon,max_lat)", type=str, required=True),
+        OpenApiParameter(name="zoom", description=f"Map zoom level (0-{MAP_MAX_ZOOM})", type=int, required=True),
+        OpenApiParameter(name="type", description="Accommodation type", type=str, required=False, enum=["APARTMENT", "HOUSE", "HOSTEL"]),
+        OpenApiParameter(name="max_price", description="Maximum price", type=float, required=False),
+    ],
+    responses={
+        200: MapClustersResponseSerializer,
+        400: ErrorResponseSerializer,
+    }
+)
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def map_clusters(request):
+    """Server-side marker clusters, so the map never downloads every listing"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = [float(value) for value in request.query_params.get('bbox', '').split(',')]
+        zoom = int(request.query_params.get('zoom', ''))
+        max_price = request.query_params.get('max_price')
+        max_price = float(max_price) if max_price else None
+    except ValueError:
+        return Response({"success": False, "message": "bbox must be four numbers (west,south,east,north), zoom an integer and max_price a number."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= max_lon <= 180 and 0 <= zoom <= MAP_MAX_ZOOM):
+        return Response({"success": False, "message": f"bbox must be west,south,east,north in degrees and zoom between 0 and {MAP_MAX_ZOOM}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    accommodations = Accommodation.objects.all()
+    accommodation_type = request.query_params.get('type')
+    if accommodation_type:
+        accommodations = accommodations.filter(type=accommodation_type)
+    if max_price is not None:
+        accommodations = accommodations.filter(price__lte=max_price)
+    clusters = cluster_accommodations(accommodations, min_lat, min_lon, max_lat, max_lon, zoom)
+    return Response({"zoom": zoom, "precision": precision_for_zoom(zoom), "clusters": clusters})
+
+#------------------------------------------------------------------------------
+# Autocomplete
+#------------------------------------------------------------------------------
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+@extend_schema(
+    summary="Autocomplete",
+    description=(
+        "Building names, estate names and geo addresses of existing accommodations that start with `q` "
+        "(case-insensitive), in alphabetical order. Served from an in-memory index, so it is cheap to call "
+        "on every keystroke before falling back to the address lookup."
+    ),
+    parameters=[
+        OpenApiParameter(name="q", description="Prefix typed so far", type=str, required=True),
+        OpenApiParameter(name="field", description="Only suggest values of this field", type=str, required=False,
+                         enum=list(AUTOCOMPLETE_FIELDS)),
+        OpenApiParameter(name="limit", description=f"Maximum suggestions (default {AUTOCOMPLETE_DEFAULT_LIMIT}, max {AUTOCOMPLETE_MAX_LIMIT})", type=int, required=False),
+    ],
+    responses={
+        200: AutocompleteResponseSerializer,
+        400: ErrorResponseSerializer,
+    }
+)
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def autocomplete(request):
+    """Prefix matches over the building names, estate names and geo addresses we already hold"""
+    prefix = request.query_params.get('q', '')
+    field = request.query_params.get('field', '')
+    try:
+        limit = int(request.query_params.get('limit', AUTOCOMPLETE_DEFAULT_LIMIT))
+    except ValueError:
+        return Response({"success": False, "message": "limit must be an integer."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if field and field not in AUTOCOMPLETE_FIELDS:
+        return Response({"success": False, "message": f"field must be one of {', '.join(AUTOCOMPLETE_FIELDS)}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+    suggestions = get_autocomplete_index().search(prefix, limit, (field,) if field else AUTOCOMPLETE_FIELDS)
+    return Response({"query": prefix, "suggestions": suggestions})
+
+#------------------------------------------------------------------------------
+# Metrics
+#------------------------------------------------------------------------------
+def _may_scrape_metrics(request):
+    """Whether the request carries METRICS_TOKEN as a bearer token"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip(), token)
+
+def metrics(request):
+    """
+    Per-view request metrics of this worker process in the Prometheus text format.
+
+    Collected by RequestMetricsMiddleware. Only served to scrapers sending
+    "Authorization: Bearer <METRICS_TOKEN>"; with no token configured it is closed.
+    """
+    if not _may_scrape_metrics(request):
+        return JsonResponse({"success": False, "message": "A valid metrics token is required"},
+                            status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 # Update is_available method in Accommodation model
 def is_available(self, start_date, end_date):
     """
@@ -0,0 +1,172 @@
+"""
+Webhook delivery for reservation events.
+
+Reservation signals queue WebhookDelivery rows in the same transaction as the
+reservation change (an outbox), so no external I/O happens on the request path.
+ReservationPeriod.save() and the reservation views wrap the change in
+transaction.atomic() so the signal's writes commit or roll back with it;
+deletes are atomic through Django's deletion collector.
+The deliver_webhooks management command drains the queue: due events are
+grouped per endpoint into batches, POSTed concurrently from a bounded thread
+pool with an HMAC-SHA256 signature, retried with exponential backoff and moved
+to WebhookDeadLetter once WEBHOOK_MAX_ATTEMPTS is reached.
+
+Run a single delivery worker; claiming rows is not coordinated between workers.
+"""
+import hashlib
+import hmac
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AccommodationUniversity, WebhookDeadLetter, WebhookDelivery, WebhookEndpoint
+
+SIGNATURE_HEADER = 'X-UniHaven-Signature'
+TIMESTAMP_HEADER = 'X-UniHaven-Timestamp'
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+def reservation_payload(reservation):
+    """Event data describing a reservation"""
+    return {
+        'reservation_id': reservation.id,
+        'accommodation_id': reservation.accommodation_id,
+        'accommodation_title': reservation.accommodation.title,
+        'user_id': reservation.user_id,
+        'contact_number': reservation.contact_number,
+        'start_date': str(reservation.start_date),
+        'end_date': str(reservation.end_date),
+        'contract_status': reservation.contract_status,
+    }
+
+def enqueue_reservation_event(reservation, event_type):
+    """Queue an event for every active endpoint of the universities affiliated with the accommodation"""
+    endpoints = WebhookEndpoint.objects.filter(
+        is_active=True,
+        university__in=AccommodationUniversity.objects
+        .filter(accommodation_id=reservation.accommodation_id)
+        .values('university_id'),
+    ).values_list('id', flat=True)
+    endpoint_ids = list(endpoints)
+    if not endpoint_ids:
+        return
+    payload = reservation_payload(reservation)
+    WebhookDelivery.objects.bulk_create([
+        WebhookDelivery(endpoint_id=endpoint_id, event_type=event_type, payload=payload)
+        for endpoint_id in endpoint_ids
+    ])
+
+def sign_payload(secret, timestamp, body):
+    """HMAC-SHA256 over "<timestamp>.<body>", hex encoded"""
+    message = f"{timestamp}.".encode('utf-8') + body
+    return hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+def backoff_delay(attempts):
+    """Delay before the next attempt: doubles with every failure, capped, with up to 10% jitter"""
+    base = _setting('WEBHOOK_BACKOFF_BASE_SECONDS', 30)
+    delay = min(base * 2 ** (attempts - 1), _setting('WEBHOOK_BACKOFF_MAX_SECONDS', 3600))
+    return timedelta(seconds=delay * (1 + random.random() * 0.1))
+
+def post_batch(url, secret, deliveries, timeout):
+    """
+    POST one signed batch of events.
+
+    Runs in a worker thread, so it only does HTTP and never touches the database.
+
+    Returns:
+        str: None on a 2xx response, otherwise a description of the failure
+    """
+    body = json.dumps({'events': [
+        {
+            'id': delivery.id,
+            'type': delivery.event_type,
+            'created_at': delivery.created_at,
+            'data': delivery.payload,
+        }
+        for delivery in deliveries
+    ]}, cls=DjangoJSONEncoder).encode('utf-8')
+    timestamp = str(int(time.time()))
+    headers = {
+        'Content-Type': 'application/json',
+        TIMESTAMP_HEADER: timestamp,
+        SIGNATURE_HEADER: f"sha256={sign_payload(secret, timestamp, body)}",
+    }
+    try:
+        response = requests.post(url, data=body, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        return f"{type(e).__name__}: {e}"
+    if 200 <= response.status_code < 300:
+        return None
+    return f"HTTP {response.status_code}"
+
+def deliver_pending(limit=1000, batch_size=None, max_workers=None):
+    """
+    Deliver up to `limit` due events.
+
+    Returns:
+        dict: counts of delivered, retried and dead-lettered events
+    """
+    batch_size = batch_size or _setting('WEBHOOK_BATCH_SIZE', 100)
+    max_workers = max_workers or _setting('WEBHOOK_MAX_WORKERS', 4)
+    timeout = _setting('WEBHOOK_TIMEOUT_SECONDS', 10)
+    max_attempts = _setting('WEBHOOK_MAX_ATTEMPTS', 8)
+    now = timezone.now()
+
+    due = list(
+        WebhookDelivery.objects
+        .filter(next_attempt_at__lte=now, endpoint__is_active=True)
+        .select_related('endpoint')
+        .order_by('id')[:limit]
+    )
+    batches = []
+    by_endpoint = {}
+    for delivery in due:
+        by_endpoint.setdefault(delivery.endpoint_id, []).append(delivery)
+    for deliveries in by_endpoint.values():
+        for start in range(0, len(deliveries), batch_size):
+            batches.append(deliveries[start:start + batch_size])
+
+    stats = {'delivered': 0, 'retried': 0, 'dead_lettered': 0}
+    if not batches:
+        return stats
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        errors = list(pool.map(
+            lambda batch: post_batch(batch[0].endpoint.url, batch[0].endpoint.secret, batch, timeout),
+            batches
+        ))
+
+    delivered, retried, dead = [], [], []
+    for batch, error in zip(batches, errors):
+        if error is None:
+            delivered.extend(batch)
+            continue
+        for delivery in batch:
+            delivery.attempts += 1
+            delivery.last_error = error
+            if delivery.attempts >= max_attempts:
+                dead.append(delivery)
+            else:
+                delivery.next_attempt_at = now + backoff_delay(delivery.attempts)
+                retried.append(delivery)
+
+    with transaction.atomic():
+        WebhookDelivery.objects.filter(id__in=[d.id for d in delivered + dead]).delete()
+        WebhookDelivery.objects.bulk_update(retried, ['attempts', 'last_error', 'next_attempt_at'])
+        WebhookDeadLetter.objects.bulk_create([
+            WebhookDeadLetter(endpoint_id=d.endpoint_id, event_type=d.event_type, payload=d.payload,
+                              attempts=d.attempts, last_error=d.last_error, created_at=d.created_at)
+            for d in dead
+        ])
+
+    stats.update(delivered=len(delivered), retried=len(retried), dead_lettered=len(dead))
+    return stats